@@ -5,6 +5,7 @@ from sqlalchemy import pool
 from app.db.session import DATABASE_URL
 from app.db.base import Base
 import app.models
+from app.core.bk_partitions import is_partition_table
 
 from alembic import context
 
@@ -24,6 +25,14 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 config.set_main_option("sqlalchemy.url", DATABASE_URL)
 
+
+def include_name(name, type_, parent_names):
+    # Partitions mensuelles : creees a l'execution, pas par les migrations
+    if type_ == "table":
+        return not is_partition_table(name)
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -48,6 +57,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -69,7 +79,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,109 @@
+"""add bk calendar days
+
+Revision ID: a4d8c2e6f9b1
+Revises: f3b7d9a2c5e8
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from datetime import date, timedelta
+from typing import Any, Iterator, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a4d8c2e6f9b1"
+down_revision: Union[str, Sequence[str], None] = "f3b7d9a2c5e8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Copie figee de app.core.bk_calendar a la date de cette revision
+_START = date(2000, 1, 1)
+_END = date(2099, 12, 31)
+_COMPARABLE_DAYS = 364
+
+
+def _easter_sunday(year: int) -> date:
+    # Algorithme de Meeus/Jones/Butcher (calendrier gregorien)
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _french_holidays(year: int) -> dict[date, str]:
+    easter = _easter_sunday(year)
+    return {
+        date(year, 1, 1): "Jour de l'an",
+        easter + timedelta(days=1): "Lundi de Paques",
+        date(year, 5, 1): "Fete du travail",
+        date(year, 5, 8): "Victoire 1945",
+        easter + timedelta(days=39): "Ascension",
+        easter + timedelta(days=50): "Lundi de Pentecote",
+        date(year, 7, 14): "Fete nationale",
+        date(year, 8, 15): "Assomption",
+        date(year, 11, 1): "Toussaint",
+        date(year, 11, 11): "Armistice 1918",
+        date(year, 12, 25): "Noel",
+    }
+
+
+def _calendar_n1_date(day: date) -> date:
+    try:
+        return day.replace(year=day.year - 1)
+    except ValueError:
+        return day.replace(year=day.year - 1, day=28)
+
+
+def _calendar_rows(start: date, end: date) -> Iterator[dict[str, Any]]:
+    holidays: dict[date, str] = {}
+    for year in range(start.year, end.year + 1):
+        holidays.update(_french_holidays(year))
+
+    day = start
+    while day <= end:
+        iso_year, iso_week, iso_weekday = day.isocalendar()
+        yield {
+            "day": day,
+            "n1_date": _calendar_n1_date(day),
+            "comparable_n1_date": day - timedelta(days=_COMPARABLE_DAYS),
+            "iso_year": iso_year,
+            "iso_week": iso_week,
+            "iso_weekday": iso_weekday,
+            "week_start": day - timedelta(days=iso_weekday - 1),
+            "is_holiday": day in holidays,
+            "holiday_name": holidays.get(day),
+        }
+        day += timedelta(days=1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    table = op.create_table(
+        "bk_calendar_days",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("n1_date", sa.Date(), nullable=False),
+        sa.Column("comparable_n1_date", sa.Date(), nullable=False),
+        sa.Column("iso_year", sa.SmallInteger(), nullable=False),
+        sa.Column("iso_week", sa.SmallInteger(), nullable=False),
+        sa.Column("iso_weekday", sa.SmallInteger(), nullable=False),
+        sa.Column("week_start", sa.Date(), nullable=False),
+        sa.Column("is_holiday", sa.Boolean(), nullable=False),
+        sa.Column("holiday_name", sa.String(length=50), nullable=True),
+        sa.PrimaryKeyConstraint("day"),
+    )
+    op.bulk_insert(table, list(_calendar_rows(_START, _END)))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("bk_calendar_days")
@@ -0,0 +1,69 @@
+"""reconcile bk reports against consumption-mode ttc
+
+Revision ID: a7e3c9d2b5f8
+Revises: e4c1a8b5d2f6
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+import os
+from decimal import Decimal
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7e3c9d2b5f8"
+down_revision: Union[str, Sequence[str], None] = "e4c1a8b5d2f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Meme regle que ConsistencyCheck a la date de cette revision
+TOLERANCE = Decimal(os.getenv("BK_CONSISTENCY_TOLERANCE", "0.05"))
+
+_CHANNEL_TTC = (
+    "(SELECT COALESCE(SUM(c.ca_ttc), 0) FROM bk_channel_sales c "
+    "WHERE c.report_id = bk_daily_reports.id AND NOT c.is_total)"
+)
+_REFERENCE_TTC = (
+    "COALESCE((SELECT SUM(m.ca_ttc) FROM bk_consumption_modes m "
+    f"WHERE m.report_id = bk_daily_reports.id), {_CHANNEL_TTC})"
+)
+_TVA_TTC = (
+    "(SELECT COALESCE(SUM(t.ttc), 0) FROM bk_tva_summary t "
+    "WHERE t.report_id = bk_daily_reports.id)"
+)
+_PAYMENT_TTC = (
+    "(SELECT COALESCE(SUM(p.theorique), 0) FROM bk_payments p "
+    "WHERE p.report_id = bk_daily_reports.id)"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "bk_daily_reports", sa.Column("channel_ttc_delta", sa.Numeric(14, 6), nullable=True)
+    )
+    # Rapports deja controles contre le TTC de caparprofit : recalcul depuis
+    # les lignes stockees, reference = TTC des modes de consommation
+    op.execute(
+        f"UPDATE bk_daily_reports SET "
+        f"tva_ttc_delta = {_TVA_TTC} - {_REFERENCE_TTC}, "
+        f"payment_ttc_delta = {_PAYMENT_TTC} - {_REFERENCE_TTC}, "
+        f"channel_ttc_delta = {_CHANNEL_TTC} - {_REFERENCE_TTC} "
+        "WHERE is_consistent IS NOT NULL"
+    )
+    op.execute(
+        sa.text(
+            "UPDATE bk_daily_reports SET is_consistent = "
+            "(abs(tva_ttc_delta) <= :tolerance AND abs(payment_ttc_delta) <= :tolerance) "
+            "WHERE is_consistent IS NOT NULL"
+        ).bindparams(sa.bindparam("tolerance", TOLERANCE, type_=sa.Numeric(14, 6)))
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Les deltas recalcules restent (reference SP + AE)
+    op.drop_column("bk_daily_reports", "channel_ttc_delta")
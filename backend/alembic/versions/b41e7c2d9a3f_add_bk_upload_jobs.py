@@ -0,0 +1,57 @@
+"""add bk upload jobs
+
+Revision ID: b41e7c2d9a3f
+Revises: 9f1c2a3b4d5e
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b41e7c2d9a3f"
+down_revision: Union[str, Sequence[str], None] = "9f1c2a3b4d5e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "bk_upload_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="pending"),
+        sa.Column("progress", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("restaurant_code", sa.String(length=50), nullable=False),
+        sa.Column("report_date", sa.Date(), nullable=False),
+        sa.Column("storage_dir", sa.String(length=255), nullable=False),
+        sa.Column(
+            "report_id",
+            sa.Integer(),
+            sa.ForeignKey("bk_daily_reports.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_bk_upload_jobs_status", "bk_upload_jobs", ["status"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_bk_upload_jobs_status", table_name="bk_upload_jobs")
+    op.drop_table("bk_upload_jobs")
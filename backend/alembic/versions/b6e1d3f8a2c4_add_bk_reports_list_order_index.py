@@ -0,0 +1,32 @@
+"""add bk reports list order index
+
+Revision ID: b6e1d3f8a2c4
+Revises: a4d8c2e6f9b1
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b6e1d3f8a2c4"
+down_revision: Union[str, Sequence[str], None] = "a4d8c2e6f9b1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_bk_daily_reports_list_order",
+        "bk_daily_reports",
+        [sa.text("report_date DESC"), "restaurant_code", "id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_bk_daily_reports_list_order", table_name="bk_daily_reports")
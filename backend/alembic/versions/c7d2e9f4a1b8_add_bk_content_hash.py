@@ -0,0 +1,42 @@
+"""add content hash and idempotency key to bk uploads
+
+Revision ID: c7d2e9f4a1b8
+Revises: b41e7c2d9a3f
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d2e9f4a1b8"
+down_revision: Union[str, Sequence[str], None] = "b41e7c2d9a3f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("bk_daily_reports", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.add_column("bk_daily_reports", sa.Column("idempotency_key", sa.String(length=128), nullable=True))
+    op.create_index("ix_bk_daily_reports_content_hash", "bk_daily_reports", ["content_hash"])
+    op.create_unique_constraint(
+        "uq_bk_daily_reports_idempotency_key", "bk_daily_reports", ["idempotency_key"]
+    )
+
+    op.add_column("bk_upload_jobs", sa.Column("content_hash", sa.String(length=64), nullable=True))
+    op.add_column("bk_upload_jobs", sa.Column("idempotency_key", sa.String(length=128), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("bk_upload_jobs", "idempotency_key")
+    op.drop_column("bk_upload_jobs", "content_hash")
+
+    op.drop_constraint("uq_bk_daily_reports_idempotency_key", "bk_daily_reports", type_="unique")
+    op.drop_index("ix_bk_daily_reports_content_hash", table_name="bk_daily_reports")
+    op.drop_column("bk_daily_reports", "idempotency_key")
+    op.drop_column("bk_daily_reports", "content_hash")
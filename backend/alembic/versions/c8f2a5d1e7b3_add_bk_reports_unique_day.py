@@ -0,0 +1,91 @@
+"""add bk reports unique day and covering indexes
+
+Revision ID: c8f2a5d1e7b3
+Revises: b6e1d3f8a2c4
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c8f2a5d1e7b3"
+down_revision: Union[str, Sequence[str], None] = "b6e1d3f8a2c4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_N1_COLUMNS = [
+    "ca_real",
+    "clients",
+    "ca_delivery",
+    "client_delivery",
+    "ca_click_collect",
+    "client_click_collect",
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Les doublons existants sont a traiter a la main : pas de suppression ici
+    duplicates = op.get_bind().execute(
+        sa.text(
+            "SELECT restaurant_code, report_date, count(*) FROM bk_daily_reports "
+            "GROUP BY restaurant_code, report_date HAVING count(*) > 1 "
+            "ORDER BY report_date, restaurant_code"
+        )
+    ).fetchall()
+    if duplicates:
+        listed = ", ".join(f"{code} {day} (x{count})" for code, day, count in duplicates[:20])
+        raise RuntimeError(f"Duplicate BK reports, remove them before upgrading: {listed}")
+
+    op.create_index(
+        "uq_bk_daily_reports_restaurant_date",
+        "bk_daily_reports",
+        ["restaurant_code", "report_date"],
+        unique=True,
+        postgresql_include=["id", "content_hash"],
+    )
+    # Couverts par l'index unique et par ix_bk_daily_reports_list_order
+    op.drop_index("ix_bk_daily_reports_restaurant_code", table_name="bk_daily_reports")
+    op.drop_index("ix_bk_daily_reports_report_date", table_name="bk_daily_reports")
+
+    op.drop_index("ix_bk_daily_reports_list_order", table_name="bk_daily_reports")
+    op.create_index(
+        "ix_bk_daily_reports_list_order",
+        "bk_daily_reports",
+        [sa.text("report_date DESC"), "restaurant_code", "id"],
+        postgresql_include=["created_at", "is_consistent"],
+    )
+
+    op.create_index(
+        "ix_bk_daily_summaries_n1_lookup",
+        "bk_daily_summaries",
+        ["restaurant_code", "report_date"],
+        postgresql_include=_N1_COLUMNS,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_bk_daily_summaries_n1_lookup", table_name="bk_daily_summaries")
+
+    op.drop_index("ix_bk_daily_reports_list_order", table_name="bk_daily_reports")
+    op.create_index(
+        "ix_bk_daily_reports_list_order",
+        "bk_daily_reports",
+        [sa.text("report_date DESC"), "restaurant_code", "id"],
+    )
+
+    op.create_index(
+        "ix_bk_daily_reports_report_date", "bk_daily_reports", ["report_date"], unique=False
+    )
+    op.create_index(
+        "ix_bk_daily_reports_restaurant_code",
+        "bk_daily_reports",
+        ["restaurant_code"],
+        unique=False,
+    )
+    op.drop_index("uq_bk_daily_reports_restaurant_date", table_name="bk_daily_reports")
@@ -0,0 +1,42 @@
+"""add bk report files archive links
+
+Revision ID: d5a1f7c3e2b9
+Revises: c7d2e9f4a1b8
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5a1f7c3e2b9"
+down_revision: Union[str, Sequence[str], None] = "c7d2e9f4a1b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "bk_report_files",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("report_id", sa.Integer(), nullable=False),
+        sa.Column("section", sa.String(length=40), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["report_id"], ["bk_daily_reports.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("report_id", "section", name="uq_bk_report_files_section"),
+    )
+    op.create_index("ix_bk_report_files_report_id", "bk_report_files", ["report_id"])
+    op.create_index("ix_bk_report_files_sha256", "bk_report_files", ["sha256"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_bk_report_files_sha256", table_name="bk_report_files")
+    op.drop_index("ix_bk_report_files_report_id", table_name="bk_report_files")
+    op.drop_table("bk_report_files")
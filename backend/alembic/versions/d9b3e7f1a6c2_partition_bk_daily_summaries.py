@@ -0,0 +1,163 @@
+"""partition bk daily summaries by month
+
+Revision ID: d9b3e7f1a6c2
+Revises: c8f2a5d1e7b3
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d9b3e7f1a6c2"
+down_revision: Union[str, Sequence[str], None] = "c8f2a5d1e7b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mois crees d'avance ; l'API en ajoute ensuite a chaque demarrage
+_MONTHS_AHEAD = 3
+
+_GROUPS = ("click_collect", "comptoir", "drive", "delivery", "kiosk")
+_N1_COLUMNS = [
+    "ca_real",
+    "clients",
+    "ca_delivery",
+    "client_delivery",
+    "ca_click_collect",
+    "client_click_collect",
+]
+
+
+def _columns() -> list[sa.Column]:
+    # Colonnes de bk_daily_summaries hors id
+    return [
+        sa.Column("report_id", sa.Integer(), nullable=False),
+        sa.Column("restaurant_code", sa.String(length=50), nullable=False),
+        sa.Column("report_date", sa.Date(), nullable=False),
+        sa.Column("ca_net_total", sa.Numeric(14, 6), nullable=False),
+        sa.Column("ca_ttc_total", sa.Numeric(14, 6), nullable=False),
+        sa.Column("tac_total", sa.Integer(), nullable=False),
+        *[
+            column
+            for group in _GROUPS
+            for column in (
+                sa.Column(f"{group}_ca_net", sa.Numeric(14, 6), nullable=False),
+                sa.Column(f"{group}_tac", sa.Integer(), nullable=False),
+            )
+        ],
+        sa.Column("ca_real", sa.Numeric(14, 6), nullable=True),
+        sa.Column("clients", sa.Integer(), nullable=True),
+        sa.Column("ca_delivery", sa.Numeric(14, 6), nullable=True),
+        sa.Column("client_delivery", sa.Integer(), nullable=True),
+        sa.Column("ca_click_collect", sa.Numeric(14, 6), nullable=True),
+        sa.Column("client_click_collect", sa.Integer(), nullable=True),
+        sa.Column("n1_ht", sa.Numeric(14, 6), nullable=True),
+        sa.Column("var_n1", sa.Numeric(14, 6), nullable=True),
+        sa.Column("prev_ht", sa.Numeric(14, 6), nullable=True),
+        sa.Column("clients_n1", sa.Integer(), nullable=True),
+        sa.Column("ca_delivery_n1", sa.Numeric(14, 6), nullable=True),
+        sa.Column("client_delivery_n1", sa.Integer(), nullable=True),
+        sa.Column("cnc_n1", sa.Numeric(14, 6), nullable=True),
+        sa.Column("client_n1", sa.Integer(), nullable=True),
+        sa.Column("cash_diff", sa.Numeric(14, 6), nullable=True),
+    ]
+
+
+def _copy(source: str, target: str) -> None:
+    names = ", ".join(column.name for column in _columns())
+    op.execute(
+        f"INSERT INTO {target} ({names}) SELECT {names} FROM {source} ORDER BY report_date"
+    )
+
+
+def _create_secondary_indexes() -> None:
+    op.create_index(
+        "ix_bk_daily_summaries_date_restaurant",
+        "bk_daily_summaries",
+        ["report_date", "restaurant_code"],
+    )
+    op.create_index(
+        "ix_bk_daily_summaries_n1_lookup",
+        "bk_daily_summaries",
+        ["restaurant_code", "report_date"],
+        postgresql_include=_N1_COLUMNS,
+    )
+
+
+def _add_months(day: date, months: int) -> date:
+    year, month = divmod(day.year * 12 + day.month - 1 + months, 12)
+    return date(year, month + 1, 1)
+
+
+def _create_partition(month: date) -> None:
+    # La partition par defaut est encore vide : rien a deplacer avant
+    op.execute(
+        f"CREATE TABLE bk_daily_summaries_p{month:%Y%m} PARTITION OF bk_daily_summaries "
+        f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')"
+    )
+
+
+def _set_aside(name: str) -> None:
+    # La table courante garde ses lignes ; ses index liberent leurs noms
+    op.rename_table("bk_daily_summaries", name)
+    op.drop_index("ix_bk_daily_summaries_n1_lookup", table_name=name)
+    op.drop_index("ix_bk_daily_summaries_date_restaurant", table_name=name)
+    op.drop_constraint("bk_daily_summaries_pkey", name, type_="primary")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _set_aside("bk_daily_summaries_unpartitioned")
+    op.drop_index("ix_bk_daily_summaries_report_id", table_name="bk_daily_summaries_unpartitioned")
+
+    op.create_table(
+        "bk_daily_summaries",
+        *_columns(),
+        sa.ForeignKeyConstraint(["report_id"], ["bk_daily_reports.id"]),
+        sa.PrimaryKeyConstraint("report_id", "report_date"),
+        postgresql_partition_by="RANGE (report_date)",
+    )
+    _create_secondary_indexes()
+    op.execute("CREATE TABLE bk_daily_summaries_default PARTITION OF bk_daily_summaries DEFAULT")
+
+    # Un mois par mois deja renseigne (les trous restent dans la partition par
+    # defaut), puis le mois courant et MONTHS_AHEAD mois d'avance
+    months = op.get_bind().execute(
+        sa.text(
+            "SELECT DISTINCT CAST(date_trunc('month', report_date) AS date) "
+            "FROM bk_daily_summaries_unpartitioned"
+        )
+    ).scalars()
+    current = date.today().replace(day=1)
+    ahead = {_add_months(current, offset) for offset in range(_MONTHS_AHEAD + 1)}
+    for month in sorted(set(months) | ahead):
+        _create_partition(month)
+
+    _copy("bk_daily_summaries_unpartitioned", "bk_daily_summaries")
+    op.drop_table("bk_daily_summaries_unpartitioned")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Les partitions detachees (archives) ne sont pas reprises
+    _set_aside("bk_daily_summaries_partitioned")
+
+    op.create_table(
+        "bk_daily_summaries",
+        sa.Column("id", sa.Integer(), nullable=False),
+        *_columns(),
+        sa.ForeignKeyConstraint(["report_id"], ["bk_daily_reports.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_bk_daily_summaries_report_id", "bk_daily_summaries", ["report_id"], unique=True
+    )
+    _create_secondary_indexes()
+
+    _copy("bk_daily_summaries_partitioned", "bk_daily_summaries")
+    # Supprime aussi les partitions attachees et la partition par defaut
+    op.drop_table("bk_daily_summaries_partitioned")
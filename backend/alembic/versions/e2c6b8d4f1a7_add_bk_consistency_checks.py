@@ -0,0 +1,36 @@
+"""add cross-file consistency checks to bk reports
+
+Revision ID: e2c6b8d4f1a7
+Revises: d5a1f7c3e2b9
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e2c6b8d4f1a7"
+down_revision: Union[str, Sequence[str], None] = "d5a1f7c3e2b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("bk_daily_reports", sa.Column("tva_ttc_delta", sa.Numeric(14, 6), nullable=True))
+    op.add_column("bk_daily_reports", sa.Column("payment_ttc_delta", sa.Numeric(14, 6), nullable=True))
+    op.add_column("bk_daily_reports", sa.Column("is_consistent", sa.Boolean(), nullable=True))
+    op.create_index(
+        "ix_bk_daily_reports_consistency", "bk_daily_reports", ["is_consistent", "report_date"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_bk_daily_reports_consistency", table_name="bk_daily_reports")
+    op.drop_column("bk_daily_reports", "is_consistent")
+    op.drop_column("bk_daily_reports", "payment_ttc_delta")
+    op.drop_column("bk_daily_reports", "tva_ttc_delta")
@@ -0,0 +1,33 @@
+"""add bk upload job lease
+
+Revision ID: e4c1a8b5d2f6
+Revises: d9b3e7f1a6c2
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e4c1a8b5d2f6"
+down_revision: Union[str, Sequence[str], None] = "d9b3e7f1a6c2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Jobs "running" existants : heartbeat NULL, donc repris comme expires
+    op.add_column("bk_upload_jobs", sa.Column("worker_id", sa.String(length=64), nullable=True))
+    op.add_column(
+        "bk_upload_jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("bk_upload_jobs", "heartbeat_at")
+    op.drop_column("bk_upload_jobs", "worker_id")
@@ -0,0 +1,75 @@
+"""add bk daily summaries
+
+Revision ID: f3b7d9a2c5e8
+Revises: e2c6b8d4f1a7
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f3b7d9a2c5e8"
+down_revision: Union[str, Sequence[str], None] = "e2c6b8d4f1a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_GROUPS = ("click_collect", "comptoir", "drive", "delivery", "kiosk")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Remplie par : python -m app.cli.bk_summary_backfill --missing
+    op.create_table(
+        "bk_daily_summaries",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("report_id", sa.Integer(), nullable=False),
+        sa.Column("restaurant_code", sa.String(length=50), nullable=False),
+        sa.Column("report_date", sa.Date(), nullable=False),
+        sa.Column("ca_net_total", sa.Numeric(14, 6), nullable=False),
+        sa.Column("ca_ttc_total", sa.Numeric(14, 6), nullable=False),
+        sa.Column("tac_total", sa.Integer(), nullable=False),
+        *[
+            column
+            for group in _GROUPS
+            for column in (
+                sa.Column(f"{group}_ca_net", sa.Numeric(14, 6), nullable=False),
+                sa.Column(f"{group}_tac", sa.Integer(), nullable=False),
+            )
+        ],
+        sa.Column("ca_real", sa.Numeric(14, 6), nullable=True),
+        sa.Column("clients", sa.Integer(), nullable=True),
+        sa.Column("ca_delivery", sa.Numeric(14, 6), nullable=True),
+        sa.Column("client_delivery", sa.Integer(), nullable=True),
+        sa.Column("ca_click_collect", sa.Numeric(14, 6), nullable=True),
+        sa.Column("client_click_collect", sa.Integer(), nullable=True),
+        sa.Column("n1_ht", sa.Numeric(14, 6), nullable=True),
+        sa.Column("var_n1", sa.Numeric(14, 6), nullable=True),
+        sa.Column("prev_ht", sa.Numeric(14, 6), nullable=True),
+        sa.Column("clients_n1", sa.Integer(), nullable=True),
+        sa.Column("ca_delivery_n1", sa.Numeric(14, 6), nullable=True),
+        sa.Column("client_delivery_n1", sa.Integer(), nullable=True),
+        sa.Column("cnc_n1", sa.Numeric(14, 6), nullable=True),
+        sa.Column("client_n1", sa.Integer(), nullable=True),
+        sa.Column("cash_diff", sa.Numeric(14, 6), nullable=True),
+        sa.ForeignKeyConstraint(["report_id"], ["bk_daily_reports.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_bk_daily_summaries_report_id", "bk_daily_summaries", ["report_id"], unique=True
+    )
+    op.create_index(
+        "ix_bk_daily_summaries_date_restaurant",
+        "bk_daily_summaries",
+        ["report_date", "restaurant_code"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_bk_daily_summaries_date_restaurant", table_name="bk_daily_summaries")
+    op.drop_index("ix_bk_daily_summaries_report_id", table_name="bk_daily_summaries")
+    op.drop_table("bk_daily_summaries")
@@ -1,32 +1,74 @@
-import csv
 import calendar
+import zipfile
+from collections import deque
+from concurrent.futures import Future
 from datetime import date
 from decimal import Decimal
-from io import StringIO
-from typing import Any
-
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from io import BytesIO
+from typing import Any, BinaryIO, Literal
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+)
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
 from app.api.auth_deps import require_roles
-from app.core.roles import Role
-from app.models.bk_report import (
-    BKDailyKpi,
-    BKAnnexSale,
-    BKChannelSales,
-    BKConsumptionMode,
-    BKCorrections,
-    BKDailyReport,
-    BKDivers,
-    BKPayment,
-    BKRemises,
-    BKTvaSummary,
+from app.core.bk_archive import archive_bk_files
+from app.core.bk_ingest import (
+    BK_FILES,
+    BKReportConflict,
+    create_bk_report,
+    fingerprint_bk_blobs,
+    fingerprint_bk_files,
+    get_parse_pool,
+    parse_bk_blobs,
+    parse_bk_files,
+    replace_bk_report,
+    split_set_path,
 )
+from app.core.bk_calendar import N1_CALENDAR
+from app.core.bk_columnar import FORMAT_COLUMNAR, FORMAT_NDJSON, FORMAT_ROWS, columns_of
+from app.core.bk_consolidation import iter_consolidation, ndjson_lines
+from app.core.bk_detail import detail_load_options, detail_selection, serialize_report
+from app.core.bk_jobs import enqueue_upload_job, serialize_job
+from app.core.bk_monthly_cache import mark_report_changed, monthly_cache
+from app.core.bk_rollup import GROUP_BY_RESTAURANT, rollup_recap
+from app.core.bk_summary import RECAP_FIELDS, recap_query, stored_totals, write_daily_summary
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.roles import Role
+from app.core.serialization import FastJSONResponse, dumps
+from app.db.session import SessionLocal
+from app.models.bk_report import BKDailyKpi, BKDailyReport, BKDailySummary
+from app.models.bk_upload_job import BKUploadJob
 
 router = APIRouter(prefix="/reports/bk", tags=["reports-bk"])
 
+ResponseFormat = Literal["rows", "columnar"]
+ListFormat = Literal["rows", "columnar", "ndjson"]
+
+# Index commun des reponses columnar
+COLUMNAR_INDEX = ("id", "restaurant_code", "report_date")
+
+# Pagination par cle de GET /reports/bk (limit ou cursor)
+DEFAULT_LIST_LIMIT = 100
+MAX_LIST_LIMIT = 1000
+STREAM_CHUNK = 500
+
+# Detail en lot : une requete par table fille, quel que soit le nombre de rapports
+MAX_DETAIL_REPORTS = 200
+
 
 class BKDailyKpiUpdate(BaseModel):
     n1_ht: Decimal | None = None
@@ -40,54 +82,7 @@ class BKDailyKpiUpdate(BaseModel):
     cash_diff: Decimal | None = None
 
 
-def _decode_csv_bytes(raw: bytes) -> str:
-    for enc in ("utf-8-sig", "utf-8", "latin-1"):
-        try:
-            return raw.decode(enc)
-        except UnicodeDecodeError:
-            continue
-    return raw.decode("latin-1", errors="replace")
-
-
-def _parse_decimal(value: Any) -> Decimal | None:
-    if value is None:
-        return None
-    s = str(value).strip()
-    if s == "":
-        return None
-    s = s.replace(" ", "").replace(",", ".")
-    try:
-        return Decimal(s)
-    except Exception:
-        return None
-
-
-def _parse_int(value: Any) -> int | None:
-    if value is None:
-        return None
-    s = str(value).strip()
-    if s == "":
-        return None
-    s = s.replace(" ", "").replace(",", ".")
-    try:
-        return int(float(s))
-    except Exception:
-        return None
-
-
-def _read_csv_rows(file: UploadFile) -> list[dict[str, str]]:
-    raw = file.file.read()
-    if not raw:
-        return []
-    text = _decode_csv_bytes(raw)
-    reader = csv.DictReader(StringIO(text), delimiter=";")
-    return [row for row in reader]
-
-
-@router.post("/upload")
-def upload_bk_report(
-    report_date: date = Form(...),
-    restaurant_code: str = Form(...),
+def bk_upload_files(
     caparprofit: UploadFile = File(...),
     consommationparprofit: UploadFile = File(...),
     corrections: UploadFile = File(...),
@@ -96,12 +91,51 @@ def upload_bk_report(
     remises: UploadFile = File(...),
     tva: UploadFile = File(...),
     vente_annexes: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    _user=Depends(require_roles([Role.MANAGER, Role.ADMIN, Role.DEV])),
-):
+) -> dict[str, BinaryIO]:
+    return {
+        "caparprofit": caparprofit.file,
+        "consommationparprofit": consommationparprofit.file,
+        "corrections": corrections.file,
+        "divers": divers.file,
+        "reglement": reglement.file,
+        "remises": remises.file,
+        "tva": tva.file,
+        "vente_annexes": vente_annexes.file,
+    }
+
+
+def _find_existing_upload(
+    db: Session,
+    restaurant_code: str,
+    report_date: date,
+    content_hash: str,
+    idempotency_key: str | None,
+) -> BKDailyReport | None:
+    """Rapport deja importe avec exactement ce contenu (ou cette cle), sinon None.
+
+    Un rapport existant au contenu different reste un conflit (409).
+    """
     if report_date > date.today():
         raise HTTPException(status_code=400, detail="Report date cannot be in the future.")
 
+    if idempotency_key:
+        keyed = (
+            db.query(BKDailyReport)
+            .filter(BKDailyReport.idempotency_key == idempotency_key)
+            .first()
+        )
+        if keyed:
+            if (
+                keyed.content_hash != content_hash
+                or keyed.restaurant_code != restaurant_code
+                or keyed.report_date != report_date
+            ):
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key already used for a different upload.",
+                )
+            return keyed
+
     existing = (
         db.query(BKDailyReport)
         .filter(
@@ -111,257 +145,261 @@ def upload_bk_report(
         .first()
     )
     if existing:
+        if existing.content_hash == content_hash:
+            return existing
         raise HTTPException(
             status_code=409,
             detail="Report already exists for this restaurant and date.",
         )
+    return None
 
-    report = BKDailyReport(
-        client_code="BK",
-        restaurant_code=restaurant_code.strip().upper(),
-        report_date=report_date,
+
+@router.post("/upload")
+def upload_bk_report(
+    report_date: date = Form(...),
+    restaurant_code: str = Form(...),
+    files: dict[str, BinaryIO] = Depends(bk_upload_files),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=128),
+    db: Session = Depends(get_db),
+    _user=Depends(require_roles([Role.MANAGER, Role.ADMIN, Role.DEV])),
+):
+    restaurant_code = restaurant_code.strip().upper()
+    content_hash = fingerprint_bk_files(files)
+    existing = _find_existing_upload(
+        db, restaurant_code, report_date, content_hash, idempotency_key
     )
-    db.add(report)
-    db.flush()
-
-    # caparprofit
-    channel_rows: list[dict[str, Any]] = []
-    for row in _read_csv_rows(caparprofit):
-        channel_label = str(row.get("profit", "")).strip()
-        channel_rows.append(
-            {
-                "channel_label": channel_label,
-                "tac": _parse_int(row.get("tac")),
-                "ca_net": _parse_decimal(row.get("net")),
-                "ca_ttc": _parse_decimal(row.get("ttc")),
-                "pm_net": _parse_decimal(row.get("panierMoyenNet")),
-                "pm_ttc": _parse_decimal(row.get("panierMoyenTTC")),
-                "net_total_profit": _parse_decimal(row.get("netTotalProfit")),
-            }
-        )
+    if existing:
+        return {"report_id": existing.id, "duplicate": True}
 
-    for row in channel_rows:
-        db.add(
-            BKChannelSales(
-                report_id=report.id,
-                channel_label=row["channel_label"],
-                is_total=False,
-                tac=row["tac"],
-                ca_net=row["ca_net"],
-                ca_ttc=row["ca_ttc"],
-                pm_net=row["pm_net"],
-                pm_ttc=row["pm_ttc"],
-                net_total_profit=row["net_total_profit"],
-            )
+    try:
+        report = create_bk_report(
+            db,
+            restaurant_code,
+            report_date,
+            parse_bk_files(files),
+            content_hash=content_hash,
+            idempotency_key=idempotency_key,
         )
-
-    def _sum_decimal(values: list[Decimal | None]) -> Decimal:
-        total = Decimal("0")
-        for value in values:
-            if value is not None:
-                total += value
-        return total
-
-    def _sum_int(values: list[int | None]) -> int:
-        return sum(v or 0 for v in values)
-
-    def _total_row(label: str, rows: list[dict[str, Any]]) -> BKChannelSales | None:
-        if not rows:
-            return None
-        tac_total = _sum_int([r["tac"] for r in rows])
-        ca_net_total = _sum_decimal([r["ca_net"] for r in rows])
-        ca_ttc_total = _sum_decimal([r["ca_ttc"] for r in rows])
-        net_total_profit = _sum_decimal([r["net_total_profit"] for r in rows])
-        pm_net = (ca_net_total / tac_total) if tac_total else None
-        pm_ttc = (ca_ttc_total / tac_total) if tac_total else None
-        return BKChannelSales(
-            report_id=report.id,
-            channel_label=label,
-            is_total=True,
-            tac=tac_total,
-            ca_net=ca_net_total,
-            ca_ttc=ca_ttc_total,
-            pm_net=pm_net,
-            pm_ttc=pm_ttc,
-            net_total_profit=net_total_profit,
+    except BKReportConflict:
+        # Meme jour importe en parallele : doublon si contenu identique, sinon 409
+        existing = _find_existing_upload(
+            db, restaurant_code, report_date, content_hash, idempotency_key
         )
+        if existing:
+            return {"report_id": existing.id, "duplicate": True}
+        raise HTTPException(
+            status_code=409,
+            detail="Report already exists for this restaurant and date.",
+        )
+    archive_bk_files(db, report.id, files)
+    db.commit()
 
-    def _is_group(label: str, prefix: str) -> bool:
-        return label.upper().startswith(prefix)
-
-    groups = [
-        ("TOTAL CLICK & COLLECT", "CLICK & COLLECT"),
-        ("TOTAL COMPTOIR", "COMPTOIR"),
-        ("TOTAL DRIVE", "DRIVE"),
-        ("TOTAL HOME DELIVERY", "HOME DELIVERY"),
-        ("TOTAL KIOSK", "KIOSK"),
-    ]
-
-    for total_label, prefix in groups:
-        rows = [r for r in channel_rows if _is_group(r["channel_label"], prefix)]
-        total_row = _total_row(total_label, rows)
-        if total_row:
-            db.add(total_row)
+    return {"report_id": report.id, "duplicate": False}
 
-    total_all = _total_row("TOTAL", channel_rows)
-    if total_all:
-        db.add(total_all)
 
-    ca_real = _sum_decimal([r["ca_net"] for r in channel_rows])
-    clients = _sum_int([r["tac"] for r in channel_rows])
-    ca_delivery = _sum_decimal(
-        [r["ca_net"] for r in channel_rows if _is_group(r["channel_label"], "HOME DELIVERY")]
-    )
-    client_delivery = _sum_int(
-        [r["tac"] for r in channel_rows if _is_group(r["channel_label"], "HOME DELIVERY")]
-    )
-    ca_click_collect = _sum_decimal(
-        [r["ca_net"] for r in channel_rows if _is_group(r["channel_label"], "CLICK & COLLECT")]
-    )
-    client_click_collect = _sum_int(
-        [r["tac"] for r in channel_rows if _is_group(r["channel_label"], "CLICK & COLLECT")]
+@router.post("/jobs", status_code=202)
+def create_bk_upload_job(
+    response: Response,
+    report_date: date = Form(...),
+    restaurant_code: str = Form(...),
+    files: dict[str, BinaryIO] = Depends(bk_upload_files),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=128),
+    db: Session = Depends(get_db),
+    _user=Depends(require_roles([Role.MANAGER, Role.ADMIN, Role.DEV])),
+):
+    restaurant_code = restaurant_code.strip().upper()
+    content_hash = fingerprint_bk_files(files)
+    existing = _find_existing_upload(
+        db, restaurant_code, report_date, content_hash, idempotency_key
     )
+    if existing:
+        response.status_code = 200
+        return {"job_id": None, "status": "done", "report_id": existing.id, "duplicate": True}
 
-    db.add(
-        BKDailyKpi(
-            report_id=report.id,
-            ca_real=ca_real,
-            clients=clients,
-            ca_delivery=ca_delivery,
-            client_delivery=client_delivery,
-            ca_click_collect=ca_click_collect,
-            client_click_collect=client_click_collect,
-        )
+    job = enqueue_upload_job(
+        db, restaurant_code, report_date, files, content_hash, idempotency_key
     )
+    return {"job_id": job.id, "status": job.status}
 
-    # consommation par profit (1 ligne)
-    rows = _read_csv_rows(consommationparprofit)
-    if rows:
-        row = rows[0]
-        db.add(
-            BKConsumptionMode(
-                report_id=report.id,
-                mode="SP",
-                tac=_parse_int(row.get("SP_tac")),
-                ca_ht=_parse_decimal(row.get("SP_caht")),
-                ca_ttc=_parse_decimal(row.get("SP_cattc")),
-                pct=_parse_decimal(row.get("SP_pourcent")),
-            )
-        )
-        db.add(
-            BKConsumptionMode(
-                report_id=report.id,
-                mode="AE",
-                tac=_parse_int(row.get("AE_tac")),
-                ca_ht=_parse_decimal(row.get("AE_caht")),
-                ca_ttc=_parse_decimal(row.get("AE_cattc")),
-                pct=_parse_decimal(row.get("AE_pourcent")),
-            )
-        )
 
-    # corrections (1 ligne)
-    rows = _read_csv_rows(corrections)
-    if rows:
-        row = rows[0]
-        db.add(
-            BKCorrections(
-                report_id=report.id,
-                taux=_parse_decimal(row.get("tauxCorrection")),
-                montant=_parse_decimal(row.get("montantCorrection")),
-                nombre=_parse_int(row.get("nombreCorrection")),
-            )
-        )
+@router.get("/jobs/{job_id}")
+def get_bk_upload_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    user=Depends(require_roles([Role.MANAGER, Role.ADMIN, Role.DEV])),
+):
+    job = db.get(BKUploadJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
 
-    # divers (1 ligne)
-    rows = _read_csv_rows(divers)
-    if rows:
-        row = rows[0]
-        db.add(
-            BKDivers(
-                report_id=report.id,
-                nombre_repas_employes=_parse_int(row.get("nombreRepasEmployes")),
-                nombre_commandes_ouvertes=_parse_int(row.get("nombreCommandeOuvertes")),
-                montant_valorise_repas_employes=_parse_decimal(
-                    row.get("montantValoriseRepasEmployes")
-                ),
-                nombre_annulations=_parse_int(row.get("nombreAnnulations")),
-                montant_annulations=_parse_decimal(row.get("montantAnnulations")),
-                taux_commandes_ouvertes=_parse_decimal(row.get("tauxCommandeOuvertes")),
-                taux_repas_employes=_parse_decimal(row.get("tauxRepasEmployes")),
-                montant_commandes_ouvertes=_parse_decimal(
-                    row.get("montantCommandeOuvertes")
-                ),
-                taux_annulations=_parse_decimal(row.get("tauxAnnulations")),
-            )
-        )
+    if user.role == Role.MANAGER.value:
+        allowed = {r.code for r in user.restaurants}
+        if job.restaurant_code not in allowed:
+            raise HTTPException(status_code=403, detail="Not allowed for this restaurant")
+    return serialize_job(job)
 
-    # reglement (multi)
-    for row in _read_csv_rows(reglement):
-        db.add(
-            BKPayment(
-                report_id=report.id,
-                payment_type=str(row.get("type", "")).strip(),
-                theorique=_parse_decimal(row.get("theorique")),
-                preleve=_parse_decimal(row.get("preleve")),
-                compte=_parse_decimal(row.get("compte")),
-                ecart=_parse_decimal(row.get("ecart")),
-            )
-        )
 
-    # remises (1 ligne)
-    rows = _read_csv_rows(remises)
-    if rows:
-        row = rows[0]
-        db.add(
-            BKRemises(
-                report_id=report.id,
-                taux_remises=_parse_decimal(row.get("tauxRemises")),
-                montant_remises=_parse_decimal(row.get("montantRemises")),
-                nombre_remises=_parse_int(row.get("nombreRemises")),
-                taux_sauces_offertes=_parse_decimal(row.get("tauxSaucesOffertes")),
-                montant_sauces_offertes=_parse_decimal(row.get("montantSaucesOffertes")),
-                nbr_sauces_offertes=_parse_int(row.get("nbrSaucesOffertes")),
-            )
-        )
+BATCH_COMMIT_SIZE = 50
+# Jeux lus et parses d'avance : borne la memoire, quelle que soit la taille du ZIP
+BATCH_WINDOW = 2 * BATCH_COMMIT_SIZE
 
-    # tva (multi)
-    for row in _read_csv_rows(tva):
-        db.add(
-            BKTvaSummary(
-                report_id=report.id,
-                tva_label=str(row.get("libelle", "")).strip(),
-                ht=_parse_decimal(row.get("HT")),
-                tva=_parse_decimal(row.get("TVA")),
-                ttc=_parse_decimal(row.get("TTC")),
-            )
-        )
 
-    # ventes annexes (multi)
-    for row in _read_csv_rows(vente_annexes):
-        db.add(
-            BKAnnexSale(
-                report_id=report.id,
-                libelle=str(row.get("libelle", "")).strip(),
-                nbr=_parse_int(row.get("nbr")),
-                montant_ht=_parse_decimal(row.get("montantHT")),
-                montant_ttc=_parse_decimal(row.get("montantttc")),
+def _create_batch_report(
+    db: Session,
+    key: tuple[str, date],
+    future: Future,
+    blobs: dict[str, bytes],
+    content_hash: str,
+    result: dict[str, Any],
+) -> bool:
+    """Ecrit un jeu parse de /upload-batch dans un savepoint ; True si cree."""
+    try:
+        parsed = future.result()
+        with db.begin_nested():
+            report = create_bk_report(db, key[0], key[1], parsed, content_hash=content_hash)
+            archive_bk_files(
+                db, report.id, {name: BytesIO(data) for name, data in blobs.items()}
             )
-        )
+    except BKReportConflict as exc:
+        result.update(status="duplicate", detail=str(exc))
+        return False
+    except Exception as exc:
+        result.update(status="error", detail=str(exc) or exc.__class__.__name__)
+        return False
+    result.update(status="created", report_id=report.id)
+    return True
+
+
+@router.post("/upload-batch")
+def upload_bk_report_batch(
+    archive: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    _user=Depends(require_roles([Role.MANAGER, Role.ADMIN, Role.DEV])),
+):
+    try:
+        zf = zipfile.ZipFile(archive.file)
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Archive must be a valid ZIP file.")
+
+    with zf:
+        # Regroupe les membres par (restaurant, date) ; contenus lus plus tard
+        members: dict[tuple[str, date], dict[str, zipfile.ZipInfo]] = {}
+        # Plusieurs membres pour un meme (restaurant, date, champ) : jeu rejete
+        duplicates: dict[tuple[str, date], set[str]] = {}
+        ignored: list[str] = []
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            key = split_set_path(info.filename)
+            if key is None:
+                ignored.append(info.filename)
+                continue
+            code, day, field = key
+            files = members.setdefault((code, day), {})
+            if field in files:
+                duplicates.setdefault((code, day), set()).add(BK_FILES[field])
+            files[field] = info
+
+        if not members:
+            raise HTTPException(status_code=400, detail="No SyntheseCA file set found in archive.")
+
+        keys = sorted(members, key=lambda k: (k[1], k[0]))
+        existing = {
+            (code, day): (report_id, content_hash)
+            for report_id, code, day, content_hash in db.query(
+                BKDailyReport.id,
+                BKDailyReport.restaurant_code,
+                BKDailyReport.report_date,
+                BKDailyReport.content_hash,
+            )
+            .filter(
+                BKDailyReport.restaurant_code.in_({k[0] for k in keys}),
+                BKDailyReport.report_date.in_({k[1] for k in keys}),
+            )
+            .all()
+        }
 
+        results: dict[tuple[str, date], dict[str, Any]] = {}
+        # (cle, parse en cours, contenus, empreinte), dans l'ordre des cles
+        in_flight: deque[tuple[tuple[str, date], Future, dict[str, bytes], str]] = deque()
+        pool = get_parse_pool()
+        today = date.today()
+        pending = 0
+
+        def flush_oldest() -> None:
+            nonlocal pending
+            key, future, blobs, content_hash = in_flight.popleft()
+            if _create_batch_report(db, key, future, blobs, content_hash, results[key]):
+                pending += 1
+                if pending >= BATCH_COMMIT_SIZE:
+                    db.commit()
+                    pending = 0
+
+        for key in keys:
+            code, day = key
+            result: dict[str, Any] = {"restaurant_code": code, "report_date": day.isoformat()}
+            results[key] = result
+            missing = [name for name in BK_FILES if name not in members[key]]
+            if day > today:
+                result.update(status="error", detail="Report date cannot be in the future.")
+                continue
+            if key in duplicates:
+                names = ", ".join(sorted(duplicates[key]))
+                result.update(status="error", detail=f"Duplicate files: {names}")
+                continue
+            if missing:
+                result.update(status="error", detail=f"Missing files: {', '.join(missing)}")
+                continue
+
+            blobs = {field: zf.read(info) for field, info in members[key].items()}
+            content_hash = fingerprint_bk_blobs(blobs)
+            if key in existing:
+                report_id, existing_hash = existing[key]
+                detail = (
+                    "Identical report already imported."
+                    if existing_hash == content_hash
+                    else "Report already exists for this restaurant and date."
+                )
+                result.update(status="duplicate", report_id=report_id, detail=detail)
+                continue
+
+            in_flight.append((key, pool.submit(parse_bk_blobs, blobs), blobs, content_hash))
+            if len(in_flight) >= BATCH_WINDOW:
+                flush_oldest()
+
+        while in_flight:
+            flush_oldest()
     db.commit()
 
-    return {"report_id": report.id}
+    items = [results[key] for key in keys]
+    return {
+        "created": sum(1 for r in items if r["status"] == "created"),
+        "duplicate": sum(1 for r in items if r["status"] == "duplicate"),
+        "error": sum(1 for r in items if r["status"] == "error"),
+        "ignored": ignored,
+        "results": items,
+    }
 
 
-@router.get("")
-def list_bk_reports(
-    start_date: date | None = None,
-    end_date: date | None = None,
-    restaurant_code: str | None = None,
-    db: Session = Depends(get_db),
-    user=Depends(require_roles([Role.MANAGER, Role.ADMIN, Role.DEV, Role.READONLY])),
+def _list_query(
+    db: Session,
+    start_date: date | None,
+    end_date: date | None,
+    restaurant_code: str | None,
+    consistent: bool | None,
+    allowed_restaurants: list[str] | None,
+    after: tuple[date, str, int] | None,
 ):
-    query = db.query(BKDailyReport)
+    query = db.query(
+        BKDailyReport.id,
+        BKDailyReport.restaurant_code,
+        BKDailyReport.report_date,
+        BKDailyReport.created_at,
+        BKDailyReport.is_consistent,
+    )
+
+    if consistent is not None:
+        query = query.filter(BKDailyReport.is_consistent.is_(consistent))
 
     if start_date:
         query = query.filter(BKDailyReport.report_date >= start_date)
@@ -373,26 +411,123 @@ def list_bk_reports(
             BKDailyReport.restaurant_code == restaurant_code.strip().upper()
         )
 
-    if user.role not in (Role.ADMIN.value, Role.DEV.value):
-        allowed = [r.code for r in user.restaurants]
-        if not allowed:
-            return []
-        query = query.filter(BKDailyReport.restaurant_code.in_(allowed))
+    if allowed_restaurants is not None:
+        query = query.filter(BKDailyReport.restaurant_code.in_(allowed_restaurants))
 
-    reports = (
-        query.order_by(BKDailyReport.report_date.desc(), BKDailyReport.restaurant_code.asc())
-        .all()
+    if after is not None:
+        # Suite de (report_date desc, restaurant_code asc, id asc)
+        after_date, after_code, after_id = after
+        query = query.filter(
+            # Borne redondante : point de depart du parcours d'index
+            BKDailyReport.report_date <= after_date,
+            or_(
+                BKDailyReport.report_date < after_date,
+                and_(
+                    BKDailyReport.report_date == after_date,
+                    or_(
+                        BKDailyReport.restaurant_code > after_code,
+                        and_(
+                            BKDailyReport.restaurant_code == after_code,
+                            BKDailyReport.id > after_id,
+                        ),
+                    ),
+                ),
+            ),
+        )
+
+    return query.order_by(
+        BKDailyReport.report_date.desc(),
+        BKDailyReport.restaurant_code.asc(),
+        BKDailyReport.id.asc(),
     )
 
-    return [
-        {
-            "id": report.id,
-            "restaurant_code": report.restaurant_code,
-            "report_date": report.report_date.isoformat(),
-            "created_at": report.created_at.isoformat(),
+
+def _list_item(report: Any) -> dict[str, Any]:
+    return {
+        "id": report.id,
+        "restaurant_code": report.restaurant_code,
+        "report_date": report.report_date,
+        "created_at": report.created_at,
+        "is_consistent": report.is_consistent,
+    }
+
+
+def _decode_list_cursor(cursor: str) -> tuple[date, str, int]:
+    try:
+        report_date, code, report_id = decode_cursor(cursor, 3)
+        return date.fromisoformat(report_date), str(code), int(report_id)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("")
+def list_bk_reports(
+    start_date: date | None = None,
+    end_date: date | None = None,
+    restaurant_code: str | None = None,
+    consistent: bool | None = None,
+    response_format: ListFormat = Query(FORMAT_ROWS, alias="format"),
+    limit: int | None = Query(None, ge=1, le=MAX_LIST_LIMIT),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+    user=Depends(require_roles([Role.MANAGER, Role.ADMIN, Role.DEV, Role.READONLY])),
+):
+    """Liste des rapports, du plus recent au plus ancien.
+
+    Avec limit ou cursor : une page et son next_cursor (null en fin de liste).
+    format=ndjson diffuse toutes les lignes, une par ligne JSON.
+    """
+    allowed_restaurants: list[str] | None = None
+    if user.role not in (Role.ADMIN.value, Role.DEV.value):
+        allowed_restaurants = [r.code for r in user.restaurants]
+
+    after = _decode_list_cursor(cursor) if cursor else None
+    filters = (start_date, end_date, restaurant_code, consistent, allowed_restaurants, after)
+
+    if response_format == FORMAT_NDJSON:
+
+        def _stream():
+            # Session propre au flux : celle de get_db peut etre fermee avant l'envoi
+            stream_db = SessionLocal()
+            try:
+                query = _list_query(stream_db, *filters)
+                if limit is not None:
+                    query = query.limit(limit)
+                for report in query.yield_per(STREAM_CHUNK):
+                    yield dumps(_list_item(report)) + b"\n"
+            finally:
+                stream_db.close()
+
+        return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+    query = _list_query(db, *filters)
+    paginated = limit is not None or cursor is not None
+    next_cursor = None
+    if paginated:
+        page_size = limit or DEFAULT_LIST_LIMIT
+        reports = query.limit(page_size + 1).all()
+        if len(reports) > page_size:
+            reports = reports[:page_size]
+            last = reports[-1]
+            next_cursor = encode_cursor([last.report_date, last.restaurant_code, last.id])
+    else:
+        reports = query.all()
+
+    if response_format == FORMAT_COLUMNAR:
+        payload = {
+            "format": FORMAT_COLUMNAR,
+            "count": len(reports),
+            "index": columns_of(reports, COLUMNAR_INDEX),
+            "columns": columns_of(reports, ("created_at", "is_consistent")),
         }
-        for report in reports
-    ]
+        if paginated:
+            payload["next_cursor"] = next_cursor
+        return FastJSONResponse(payload)
+
+    items = [_list_item(report) for report in reports]
+    if paginated:
+        return FastJSONResponse({"items": items, "next_cursor": next_cursor})
+    return FastJSONResponse(items)
 
 
 @router.get("/monthly")
@@ -400,6 +535,8 @@ def list_bk_reports_monthly(
     year: int,
     month: int,
     restaurant_code: str | None = None,
+    n1_basis: Literal["weekday", "calendar"] = N1_CALENDAR,
+    response_format: ResponseFormat = Query(FORMAT_ROWS, alias="format"),
     db: Session = Depends(get_db),
     user=Depends(require_roles([Role.MANAGER, Role.ADMIN, Role.DEV, Role.READONLY])),
 ):
@@ -413,309 +550,226 @@ def list_bk_reports_monthly(
     allowed_restaurants: list[str] | None = None
     if user.role not in (Role.ADMIN.value, Role.DEV.value):
         allowed_restaurants = [r.code for r in user.restaurants]
-        if not allowed_restaurants:
-            return []
 
-    query = (
-        db.query(BKDailyReport)
-        .options(joinedload(BKDailyReport.channel_sales), joinedload(BKDailyReport.kpi))
-        .filter(
-            BKDailyReport.report_date >= start_date,
-            BKDailyReport.report_date <= end_date,
-        )
+    cache_key = monthly_cache.key(
+        year, month, restaurant_code, allowed_restaurants, n1_basis, response_format
     )
-
-    if restaurant_code:
-        query = query.filter(
-            BKDailyReport.restaurant_code == restaurant_code.strip().upper()
+    cached, generation = monthly_cache.get(cache_key)
+    if cached is None:
+        rows = (
+            recap_query(db, start_date, end_date, restaurant_code, allowed_restaurants, n1_basis)
+            .join(BKDailyReport, BKDailyReport.id == BKDailySummary.report_id)
+            .add_columns(BKDailyReport.id, BKDailyReport.created_at)
+            .order_by(BKDailySummary.report_date.asc(), BKDailySummary.restaurant_code.asc())
+            .all()
         )
+        if response_format == FORMAT_COLUMNAR:
+            payload = _monthly_columnar(rows)
+        else:
+            payload = _monthly_rows(rows)
+        # Corps deja encode : un hit ne repasse pas par le JSON
+        cached = dumps(payload)
+        monthly_cache.put(cache_key, cached, generation)
 
-    if allowed_restaurants is not None:
-        query = query.filter(BKDailyReport.restaurant_code.in_(allowed_restaurants))
+    return Response(content=cached, media_type="application/json")
 
-    reports = (
-        query.order_by(BKDailyReport.report_date.asc(), BKDailyReport.restaurant_code.asc())
-        .all()
-    )
 
-    def _safe_float(value: Any) -> float:
-        if value is None:
-            return 0.0
-        try:
-            return float(value)
-        except Exception:
-            return 0.0
+def _monthly_rows(rows: list[Any]) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": row.id,
+            "restaurant_code": row.restaurant_code,
+            "report_date": row.report_date,
+            "created_at": row.created_at,
+            "n1_date": row.n1_date,
+            "holiday": row.holiday,
+            "ca_net_total": float(row.ca_net_total),
+            "ca_ttc_total": float(row.ca_ttc_total),
+            "tac_total": row.tac_total,
+            "kpi": {field: getattr(row, field) for field in RECAP_FIELDS},
+        }
+        for row in rows
+    ]
 
-    def _is_group(label: str, prefix: str) -> bool:
-        return label.upper().startswith(prefix)
 
-    def _calc_report_values(report: BKDailyReport) -> dict[str, Any]:
-        ca_net_total = sum(
-            _safe_float(r.ca_net) for r in report.channel_sales if not r.is_total
-        )
-        ca_ttc_total = sum(
-            _safe_float(r.ca_ttc) for r in report.channel_sales if not r.is_total
-        )
-        tac_total = sum((r.tac or 0) for r in report.channel_sales if not r.is_total)
-        ca_delivery = sum(
-            _safe_float(r.ca_net)
-            for r in report.channel_sales
-            if not r.is_total and _is_group(r.channel_label, "HOME DELIVERY")
-        )
-        client_delivery = sum(
-            (r.tac or 0)
-            for r in report.channel_sales
-            if not r.is_total and _is_group(r.channel_label, "HOME DELIVERY")
-        )
-        ca_click_collect = sum(
-            _safe_float(r.ca_net)
-            for r in report.channel_sales
-            if not r.is_total and _is_group(r.channel_label, "CLICK & COLLECT")
-        )
-        client_click_collect = sum(
-            (r.tac or 0)
-            for r in report.channel_sales
-            if not r.is_total and _is_group(r.channel_label, "CLICK & COLLECT")
-        )
+def _monthly_columnar(rows: list[Any]) -> dict[str, Any]:
+    # Memes champs que _monthly_rows, un tableau par champ
+    return {
+        "format": FORMAT_COLUMNAR,
+        "count": len(rows),
+        "index": columns_of(rows, COLUMNAR_INDEX),
+        "columns": columns_of(
+            rows,
+            ("created_at", "n1_date", "holiday", "ca_net_total", "ca_ttc_total", "tac_total"),
+        ),
+        "kpi": columns_of(rows, RECAP_FIELDS),
+    }
 
-        return {
-            "ca_net_total": ca_net_total,
-            "ca_ttc_total": ca_ttc_total,
-            "tac_total": tac_total,
-            "ca_delivery": ca_delivery,
-            "client_delivery": client_delivery,
-            "ca_click_collect": ca_click_collect,
-            "client_click_collect": client_click_collect,
-        }
 
-    prev_by_key: dict[tuple[str, date], BKDailyReport] = {}
-    if reports:
-        prev_year = year - 1
-        prev_last_day = calendar.monthrange(prev_year, month)[1]
-        prev_start = date(prev_year, month, 1)
-        prev_end = date(prev_year, month, prev_last_day)
+@router.get("/monthly/cache-stats")
+def bk_monthly_cache_stats(
+    _user=Depends(require_roles([Role.ADMIN, Role.DEV])),
+):
+    return monthly_cache.stats()
 
-        prev_query = (
-            db.query(BKDailyReport)
-            .options(joinedload(BKDailyReport.channel_sales), joinedload(BKDailyReport.kpi))
-            .filter(
-                BKDailyReport.report_date >= prev_start,
-                BKDailyReport.report_date <= prev_end,
-            )
-        )
 
-        if restaurant_code:
-            prev_query = prev_query.filter(
-                BKDailyReport.restaurant_code == restaurant_code.strip().upper()
-            )
+@router.get("/rollup")
+def rollup_bk_reports(
+    year: int,
+    month: int,
+    group_by: Literal["restaurant", "network"] = GROUP_BY_RESTAURANT,
+    restaurant_code: str | None = None,
+    n1_basis: Literal["weekday", "calendar"] = N1_CALENDAR,
+    db: Session = Depends(get_db),
+    user=Depends(require_roles([Role.MANAGER, Role.ADMIN, Role.DEV, Role.READONLY])),
+):
+    if month < 1 or month > 12:
+        raise HTTPException(status_code=400, detail="Invalid month")
 
-        if allowed_restaurants is not None:
-            prev_query = prev_query.filter(BKDailyReport.restaurant_code.in_(allowed_restaurants))
-        else:
-            codes = {r.restaurant_code for r in reports}
-            if codes:
-                prev_query = prev_query.filter(BKDailyReport.restaurant_code.in_(codes))
+    allowed_restaurants: list[str] | None = None
+    if user.role not in (Role.ADMIN.value, Role.DEV.value):
+        allowed_restaurants = [r.code for r in user.restaurants]
+
+    return FastJSONResponse(
+        rollup_recap(db, year, month, group_by, restaurant_code, allowed_restaurants, n1_basis)
+    )
 
-        prev_reports = prev_query.all()
-        prev_by_key = {(r.restaurant_code, r.report_date): r for r in prev_reports}
 
-    payload = []
-    for report in reports:
-        values = _calc_report_values(report)
-        ca_net_total = values["ca_net_total"]
-        ca_ttc_total = values["ca_ttc_total"]
-        tac_total = values["tac_total"]
+@router.get("/consolidation")
+def consolidate_bk_reports(
+    start_date: date,
+    end_date: date,
+    restaurant_code: str | None = None,
+    n1_basis: Literal["weekday", "calendar"] = N1_CALENDAR,
+    user=Depends(require_roles([Role.MANAGER, Role.ADMIN, Role.DEV, Role.READONLY])),
+):
+    """Totaux de tous les restaurants visibles, une ligne NDJSON par jour puis la periode."""
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="Invalid date range")
 
-        kpi = report.kpi
-        ca_real = kpi.ca_real if kpi and kpi.ca_real is not None else ca_net_total
-        clients = kpi.clients if kpi and kpi.clients is not None else tac_total
+    allowed_restaurants: list[str] | None = None
+    if user.role not in (Role.ADMIN.value, Role.DEV.value):
+        allowed_restaurants = [r.code for r in user.restaurants]
 
-        prev_date = None
+    def _stream():
+        # Session propre au flux : celle de get_db peut etre fermee avant l'envoi
+        db = SessionLocal()
         try:
-            prev_date = date(report.report_date.year - 1, report.report_date.month, report.report_date.day)
-        except ValueError:
-            prev_date = None
-
-        prev_report = prev_by_key.get((report.restaurant_code, prev_date)) if prev_date else None
-        prev_values = _calc_report_values(prev_report) if prev_report else None
-        prev_kpi = prev_report.kpi if prev_report else None
-
-        prev_ca_real = None
-        prev_clients = None
-        prev_ca_delivery = None
-        prev_client_delivery = None
-        prev_ca_click_collect = None
-        prev_client_click_collect = None
-        if prev_report:
-            prev_ca_real = (
-                prev_kpi.ca_real
-                if prev_kpi and prev_kpi.ca_real is not None
-                else prev_values["ca_net_total"]
-            )
-            prev_clients = (
-                prev_kpi.clients
-                if prev_kpi and prev_kpi.clients is not None
-                else prev_values["tac_total"]
-            )
-            prev_ca_delivery = (
-                prev_kpi.ca_delivery
-                if prev_kpi and prev_kpi.ca_delivery is not None
-                else prev_values["ca_delivery"]
-            )
-            prev_client_delivery = (
-                prev_kpi.client_delivery
-                if prev_kpi and prev_kpi.client_delivery is not None
-                else prev_values["client_delivery"]
-            )
-            prev_ca_click_collect = (
-                prev_kpi.ca_click_collect
-                if prev_kpi and prev_kpi.ca_click_collect is not None
-                else prev_values["ca_click_collect"]
-            )
-            prev_client_click_collect = (
-                prev_kpi.client_click_collect
-                if prev_kpi and prev_kpi.client_click_collect is not None
-                else prev_values["client_click_collect"]
+            yield from ndjson_lines(
+                iter_consolidation(
+                    db, start_date, end_date, restaurant_code, allowed_restaurants, n1_basis
+                )
             )
+        finally:
+            db.close()
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
 
-        payload.append(
-            {
-                "id": report.id,
-                "restaurant_code": report.restaurant_code,
-                "report_date": report.report_date.isoformat(),
-                "created_at": report.created_at.isoformat(),
-                "ca_net_total": ca_net_total,
-                "ca_ttc_total": ca_ttc_total,
-                "tac_total": tac_total,
-                "kpi": {
-                    "n1_ht": kpi.n1_ht if kpi and kpi.n1_ht is not None else prev_ca_real,
-                    "var_n1": kpi.var_n1 if kpi else None,
-                    "prev_ht": kpi.prev_ht if kpi else None,
-                    "ca_real": ca_real,
-                    "clients": clients,
-                    "clients_n1": kpi.clients_n1 if kpi and kpi.clients_n1 is not None else prev_clients,
-                    "ca_delivery": kpi.ca_delivery if kpi and kpi.ca_delivery is not None else values["ca_delivery"],
-                    "ca_delivery_n1": kpi.ca_delivery_n1 if kpi and kpi.ca_delivery_n1 is not None else prev_ca_delivery,
-                    "client_delivery": kpi.client_delivery if kpi and kpi.client_delivery is not None else values["client_delivery"],
-                    "client_delivery_n1": kpi.client_delivery_n1 if kpi and kpi.client_delivery_n1 is not None else prev_client_delivery,
-                    "ca_click_collect": kpi.ca_click_collect if kpi and kpi.ca_click_collect is not None else values["ca_click_collect"],
-                    "cnc_n1": kpi.cnc_n1 if kpi and kpi.cnc_n1 is not None else prev_ca_click_collect,
-                    "client_click_collect": kpi.client_click_collect if kpi and kpi.client_click_collect is not None else values["client_click_collect"],
-                    "client_n1": kpi.client_n1 if kpi and kpi.client_n1 is not None else prev_client_click_collect,
-                    "cash_diff": kpi.cash_diff if kpi else None,
-                },
-            }
+
+@router.get("/details")
+def get_bk_reports_details(
+    ids: list[int] | None = Query(None),
+    start_date: date | None = None,
+    end_date: date | None = None,
+    restaurant_code: str | None = None,
+    sections: str | None = None,
+    fields: str | None = None,
+    db: Session = Depends(get_db),
+    user=Depends(require_roles([Role.MANAGER, Role.ADMIN, Role.DEV, Role.READONLY])),
+):
+    """Detail de plusieurs rapports (ids et/ou periode), tables filles chargees par lot."""
+    selection = _detail_selection_or_400(sections, fields)
+    if not ids and not (start_date and end_date):
+        raise HTTPException(status_code=400, detail="ids or start_date and end_date required")
+    if ids and len(ids) > MAX_DETAIL_REPORTS:
+        raise HTTPException(status_code=400, detail="Too many reports requested")
+
+    query = db.query(BKDailyReport).options(*detail_load_options(selection))
+    if ids:
+        query = query.filter(BKDailyReport.id.in_(ids))
+    if start_date:
+        query = query.filter(BKDailyReport.report_date >= start_date)
+    if end_date:
+        query = query.filter(BKDailyReport.report_date <= end_date)
+    if restaurant_code:
+        query = query.filter(
+            BKDailyReport.restaurant_code == restaurant_code.strip().upper()
         )
+    if user.role not in (Role.ADMIN.value, Role.DEV.value):
+        allowed = [r.code for r in user.restaurants]
+        query = query.filter(BKDailyReport.restaurant_code.in_(allowed))
 
-    return payload
+    reports = (
+        query.order_by(BKDailyReport.report_date.asc(), BKDailyReport.restaurant_code.asc())
+        .limit(MAX_DETAIL_REPORTS + 1)
+        .all()
+    )
+    if len(reports) > MAX_DETAIL_REPORTS:
+        raise HTTPException(status_code=400, detail="Too many reports requested")
+
+    return FastJSONResponse([serialize_report(report, selection) for report in reports])
 
 
 @router.get("/{report_id}")
 def get_bk_report(
     report_id: int,
+    sections: str | None = None,
+    fields: str | None = None,
     db: Session = Depends(get_db),
     _user=Depends(require_roles([Role.MANAGER, Role.ADMIN, Role.DEV, Role.READONLY])),
 ):
-    report = db.query(BKDailyReport).filter(BKDailyReport.id == report_id).first()
+    selection = _detail_selection_or_400(sections, fields)
+    report = (
+        db.query(BKDailyReport)
+        .options(*detail_load_options(selection))
+        .filter(BKDailyReport.id == report_id)
+        .first()
+    )
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
 
-    return {
-        "id": report.id,
-        "client_code": report.client_code,
-        "restaurant_code": report.restaurant_code,
-        "report_date": report.report_date.isoformat(),
-        "created_at": report.created_at.isoformat(),
-        "kpi": None
-        if not report.kpi
-        else {
-            "n1_ht": report.kpi.n1_ht,
-            "var_n1": report.kpi.var_n1,
-            "prev_ht": report.kpi.prev_ht,
-            "ca_real": report.kpi.ca_real,
-            "clients": report.kpi.clients,
-            "clients_n1": report.kpi.clients_n1,
-            "ca_delivery": report.kpi.ca_delivery,
-            "ca_delivery_n1": report.kpi.ca_delivery_n1,
-            "client_delivery": report.kpi.client_delivery,
-            "client_delivery_n1": report.kpi.client_delivery_n1,
-            "ca_click_collect": report.kpi.ca_click_collect,
-            "cnc_n1": report.kpi.cnc_n1,
-            "client_click_collect": report.kpi.client_click_collect,
-            "client_n1": report.kpi.client_n1,
-            "cash_diff": report.kpi.cash_diff,
-        },
-        "channel_sales": [
-            {
-                "channel_label": r.channel_label,
-                "is_total": r.is_total,
-                "tac": r.tac,
-                "ca_net": r.ca_net,
-                "ca_ttc": r.ca_ttc,
-                "pm_net": r.pm_net,
-                "pm_ttc": r.pm_ttc,
-                "net_total_profit": r.net_total_profit,
-            }
-            for r in report.channel_sales
-        ],
-        "consumption_modes": [
-            {
-                "mode": r.mode,
-                "tac": r.tac,
-                "ca_ht": r.ca_ht,
-                "ca_ttc": r.ca_ttc,
-                "pct": r.pct,
-            }
-            for r in report.consumption_modes
-        ],
-        "corrections": [
-            {"taux": r.taux, "montant": r.montant, "nombre": r.nombre}
-            for r in report.corrections
-        ],
-        "divers": [
-            {
-                "nombre_repas_employes": r.nombre_repas_employes,
-                "nombre_commandes_ouvertes": r.nombre_commandes_ouvertes,
-                "montant_valorise_repas_employes": r.montant_valorise_repas_employes,
-                "nombre_annulations": r.nombre_annulations,
-                "montant_annulations": r.montant_annulations,
-                "taux_commandes_ouvertes": r.taux_commandes_ouvertes,
-                "taux_repas_employes": r.taux_repas_employes,
-                "montant_commandes_ouvertes": r.montant_commandes_ouvertes,
-                "taux_annulations": r.taux_annulations,
-            }
-            for r in report.divers
-        ],
-        "payments": [
-            {
-                "payment_type": r.payment_type,
-                "theorique": r.theorique,
-                "preleve": r.preleve,
-                "compte": r.compte,
-                "ecart": r.ecart,
-            }
-            for r in report.payments
-        ],
-        "remises": [
-            {
-                "taux_remises": r.taux_remises,
-                "montant_remises": r.montant_remises,
-                "nombre_remises": r.nombre_remises,
-                "taux_sauces_offertes": r.taux_sauces_offertes,
-                "montant_sauces_offertes": r.montant_sauces_offertes,
-                "nbr_sauces_offertes": r.nbr_sauces_offertes,
-            }
-            for r in report.remises
-        ],
-        "tva_summary": [
-            {"tva_label": r.tva_label, "ht": r.ht, "tva": r.tva, "ttc": r.ttc}
-            for r in report.tva_summary
-        ],
-        "annex_sales": [
-            {"libelle": r.libelle, "nbr": r.nbr, "montant_ht": r.montant_ht, "montant_ttc": r.montant_ttc}
-            for r in report.annex_sales
-        ],
-    }
+    return FastJSONResponse(serialize_report(report, selection))
+
+
+def _detail_selection_or_400(
+    sections: str | None, fields: str | None
+) -> dict[str, tuple[str, ...]]:
+    try:
+        return detail_selection(sections, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.put("/{report_id}")
+def replace_bk_report_files(
+    report_id: int,
+    files: dict[str, BinaryIO] = Depends(bk_upload_files),
+    db: Session = Depends(get_db),
+    user=Depends(require_roles([Role.MANAGER, Role.ADMIN, Role.DEV])),
+):
+    report = (
+        db.query(BKDailyReport)
+        .filter(BKDailyReport.id == report_id)
+        .with_for_update()
+        .first()
+    )
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+
+    if user.role == Role.MANAGER.value:
+        allowed = {r.code for r in user.restaurants}
+        if report.restaurant_code not in allowed:
+            raise HTTPException(status_code=403, detail="Not allowed for this restaurant")
+
+    content_hash = fingerprint_bk_files(files)
+    if report.content_hash == content_hash:
+        db.rollback()
+        return {"report_id": report_id, "unchanged": True, "changes": {}}
+
+    changes = replace_bk_report(db, report, parse_bk_files(files), content_hash)
+    archive_bk_files(db, report_id, files)
+    db.commit()
+    return {"report_id": report_id, "unchanged": False, "changes": changes}
 
 
 @router.put("/{report_id}/kpi")
@@ -743,6 +797,7 @@ def update_bk_report_kpi(
     report.kpi.cash_diff = payload.cash_diff
 
     db.add(report)
+    write_daily_summary(db, report, stored_totals(db, report), report.kpi)
     db.commit()
 
     return {"status": "ok"}
@@ -763,6 +818,7 @@ def delete_bk_report(
         if report.restaurant_code not in allowed:
             raise HTTPException(status_code=403, detail="Not allowed for this restaurant")
 
+    mark_report_changed(db, report.restaurant_code, report.report_date)
     db.delete(report)
     db.commit()
     return {"status": "deleted"}
@@ -0,0 +1,59 @@
+"""Partitions mensuelles de bk_daily_summaries (PostgreSQL).
+
+    python -m app.cli.bk_partitions ensure [--from 2023-01-01] [--to 2026-12-31]
+    python -m app.cli.bk_partitions detach --before 2022-01-01
+
+detach refuse les mois qui ont encore des rapports dans bk_daily_reports (non
+partitionnee) : leurs syntheses disparaitraient de /monthly, /rollup,
+/consolidation et des N-1 alors que les rapports restent listes.
+"""
+import argparse
+import logging
+from datetime import date
+
+from app.core.bk_partitions import (
+    MONTHS_AHEAD,
+    add_months,
+    detach_partitions,
+    ensure_partitions,
+    is_partitioned,
+    month_start,
+)
+from app.db.session import engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="cree les mois manquants")
+    ensure.add_argument("--from", dest="date_from", type=date.fromisoformat)
+    ensure.add_argument("--to", dest="date_to", type=date.fromisoformat)
+    detach = commands.add_parser(
+        "detach",
+        help="detache les mois anterieurs a --before (refuse si des rapports y restent)",
+    )
+    detach.add_argument("--before", type=date.fromisoformat, required=True)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [PARTITIONS] %(message)s")
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            parser.exit(1, "bk_daily_summaries n'est pas partitionnee (PostgreSQL migre requis)\n")
+        if args.command == "ensure":
+            current = month_start(date.today())
+            names = ensure_partitions(
+                conn,
+                args.date_from or current,
+                args.date_to or add_months(current, MONTHS_AHEAD),
+            )
+            logging.info("%d partitions created: %s", len(names), ", ".join(names) or "-")
+        else:
+            try:
+                names = detach_partitions(conn, args.before)
+            except ValueError as exc:
+                parser.exit(1, f"{exc}\n")
+            logging.info("%d partitions detached: %s", len(names), ", ".join(names) or "-")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Reconstruit les tables filles des rapports BK depuis l'archive des CSV bruts.
+
+    python -m app.cli.bk_reparse --from 2026-01-01 --to 2026-01-31 [--restaurant R1] [--workers 4]
+"""
+import argparse
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+from app.core.bk_archive import load_blobs
+from app.core.bk_ingest import BK_FILES, fingerprint_bk_blobs, parse_bk_blobs, replace_bk_report
+from app.db.session import SessionLocal, dispose_inherited_pool
+from app.models.bk_report import BKDailyReport, BKReportFile
+
+logger = logging.getLogger(__name__)
+
+
+def find_report_ids(
+    date_from: date, date_to: date, restaurant_codes: list[str] | None = None
+) -> list[int]:
+    db = SessionLocal()
+    try:
+        q = db.query(BKDailyReport.id).filter(
+            BKDailyReport.report_date >= date_from,
+            BKDailyReport.report_date <= date_to,
+            BKDailyReport.files.any(),
+        )
+        if restaurant_codes:
+            q = q.filter(BKDailyReport.restaurant_code.in_(restaurant_codes))
+        return [
+            report_id
+            for (report_id,) in q.order_by(
+                BKDailyReport.report_date.asc(), BKDailyReport.restaurant_code.asc()
+            ).all()
+        ]
+    finally:
+        db.close()
+
+
+def reparse_report(report_id: int) -> dict:
+    """Re-parse un rapport depuis ses CSV archives ; execute dans un process du pool."""
+    db = SessionLocal()
+    try:
+        report = (
+            db.query(BKDailyReport)
+            .filter(BKDailyReport.id == report_id)
+            .with_for_update()
+            .first()
+        )
+        if not report:
+            return {"report_id": report_id, "status": "error", "detail": "Report not found"}
+
+        links = db.query(BKReportFile).filter(BKReportFile.report_id == report_id).all()
+        missing = [name for name in BK_FILES if name not in {link.section for link in links}]
+        if missing:
+            return {
+                "report_id": report_id,
+                "status": "error",
+                "detail": f"Missing archived files: {', '.join(missing)}",
+            }
+
+        blobs = load_blobs(links)
+        content_hash = fingerprint_bk_blobs(blobs)
+        if report.content_hash and report.content_hash != content_hash:
+            return {
+                "report_id": report_id,
+                "status": "error",
+                "detail": "Archived files do not match the report fingerprint.",
+            }
+
+        changes = replace_bk_report(db, report, parse_bk_blobs(blobs), content_hash)
+        db.commit()
+        return {"report_id": report_id, "status": "ok", "changes": changes}
+    except Exception as exc:
+        db.rollback()
+        return {"report_id": report_id, "status": "error", "detail": str(exc) or exc.__class__.__name__}
+    finally:
+        db.close()
+
+
+def reparse_reports(report_ids: list[int], workers: int) -> dict[str, int]:
+    counts = {"ok": 0, "error": 0}
+    with ProcessPoolExecutor(max_workers=workers, initializer=dispose_inherited_pool) as pool:
+        futures = [pool.submit(reparse_report, report_id) for report_id in report_ids]
+        for future in as_completed(futures):
+            result = future.result()
+            counts[result["status"]] += 1
+            if result["status"] == "error":
+                logger.warning("Report %s: %s", result["report_id"], result["detail"])
+            else:
+                touched = {
+                    section: c
+                    for section, c in result["changes"].items()
+                    if any(c.values())
+                }
+                logger.info("Report %s: %s", result["report_id"], touched or "unchanged")
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, required=True)
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, required=True)
+    parser.add_argument("--restaurant", action="append", type=str.upper)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [REPARSE] %(message)s")
+    report_ids = find_report_ids(args.date_from, args.date_to, args.restaurant)
+    logging.info("%d reports to re-parse", len(report_ids))
+    if report_ids:
+        counts = reparse_reports(report_ids, max(1, args.workers))
+        logging.info("Done: %s", counts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Reconstruit bk_daily_summaries depuis les tables filles des rapports BK.
+
+    python -m app.cli.bk_summary_backfill [--from 2025-01-01] [--to 2025-12-31] [--missing]
+"""
+import argparse
+import logging
+from datetime import date
+
+from app.core.bk_summary import rebuild_daily_summaries
+from app.db.session import SessionLocal
+from app.models.bk_report import BKDailyReport, BKDailySummary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat)
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat)
+    parser.add_argument(
+        "--missing", action="store_true", help="seulement les rapports sans synthese"
+    )
+    parser.add_argument("--chunk", type=int, default=500)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [SUMMARY] %(message)s")
+    db = SessionLocal()
+    try:
+        q = db.query(BKDailyReport.id)
+        if args.date_from:
+            q = q.filter(BKDailyReport.report_date >= args.date_from)
+        if args.date_to:
+            q = q.filter(BKDailyReport.report_date <= args.date_to)
+        if args.missing:
+            q = q.filter(~BKDailyReport.summary.has())
+        report_ids = [report_id for (report_id,) in q.order_by(BKDailyReport.id.asc()).all()]
+
+        done = 0
+        for i in range(0, len(report_ids), args.chunk):
+            done += rebuild_daily_summaries(db, report_ids[i : i + args.chunk])
+            db.commit()
+            db.expunge_all()
+        logging.info("%d summaries rebuilt (%d in table)", done, db.query(BKDailySummary).count())
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
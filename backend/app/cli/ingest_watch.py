@@ -0,0 +1,37 @@
+"""Service d'import des exports BK deposes sous STORAGE_PATH/bk_watch/inbox.
+
+    python -m app.cli.ingest_watch [--workers 4] [--once]
+"""
+import argparse
+import logging
+import os
+
+from app.core.bk_watcher import WatchDirs, run_watcher
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=int(os.getenv("BK_WATCH_WORKERS", "2")))
+    parser.add_argument("--interval", type=float, default=float(os.getenv("BK_WATCH_INTERVAL", "5")))
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=float(os.getenv("BK_WATCH_SETTLE", "10")),
+        help="secondes sans modification avant de prendre un jeu",
+    )
+    parser.add_argument("--once", action="store_true", help="vide le depot puis s'arrete")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [INGEST] %(message)s")
+    counts = run_watcher(
+        WatchDirs(),
+        workers=max(1, args.workers),
+        interval=args.interval,
+        settle_seconds=args.settle,
+        once=args.once,
+    )
+    logging.info("Done: %s", counts)
+
+
+if __name__ == "__main__":
+    main()
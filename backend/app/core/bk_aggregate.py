@@ -0,0 +1,143 @@
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Iterable
+
+# (libelle de la ligne total, prefixe des canaux du groupe)
+CHANNEL_GROUPS = [
+    ("TOTAL CLICK & COLLECT", "CLICK & COLLECT"),
+    ("TOTAL COMPTOIR", "COMPTOIR"),
+    ("TOTAL DRIVE", "DRIVE"),
+    ("TOTAL HOME DELIVERY", "HOME DELIVERY"),
+    ("TOTAL KIOSK", "KIOSK"),
+]
+
+DELIVERY = "HOME DELIVERY"
+CLICK_COLLECT = "CLICK & COLLECT"
+
+# Prefixe du groupe -> nom des colonnes de bk_daily_summaries
+GROUP_COLUMNS = {
+    "CLICK & COLLECT": "click_collect",
+    "COMPTOIR": "comptoir",
+    "DRIVE": "drive",
+    "HOME DELIVERY": "delivery",
+    "KIOSK": "kiosk",
+}
+
+_ZERO = Decimal("0")
+
+
+@lru_cache(maxsize=1024)
+def channel_group(label: str) -> str | None:
+    # Quelques dizaines de libelles distincts : classes une fois par process
+    upper = label.upper()
+    for _, prefix in CHANNEL_GROUPS:
+        if upper.startswith(prefix):
+            return prefix
+    return None
+
+
+class _Totals:
+    __slots__ = ("rows", "tac", "ca_net", "ca_ttc", "net_total_profit")
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self.tac = 0
+        self.ca_net = _ZERO
+        self.ca_ttc = _ZERO
+        self.net_total_profit = _ZERO
+
+    def add(self, tac, ca_net, ca_ttc, net_total_profit) -> None:
+        self.rows += 1
+        if tac:
+            self.tac += tac
+        if ca_net is not None:
+            self.ca_net += ca_net
+        if ca_ttc is not None:
+            self.ca_ttc += ca_ttc
+        if net_total_profit is not None:
+            self.net_total_profit += net_total_profit
+
+    def as_row(self, label: str) -> dict[str, Any]:
+        return {
+            "channel_label": label,
+            "is_total": True,
+            "tac": self.tac,
+            "ca_net": self.ca_net,
+            "ca_ttc": self.ca_ttc,
+            "pm_net": (self.ca_net / self.tac) if self.tac else None,
+            "pm_ttc": (self.ca_ttc / self.tac) if self.tac else None,
+            "net_total_profit": self.net_total_profit,
+        }
+
+
+class ChannelAggregate:
+    """Totaux par groupe de canaux et KPI d'une journee, en un seul passage.
+
+    Chaque ligne caparprofit est classee une fois (prefixe du libelle) puis
+    cumulee dans son groupe et dans le total general. Les lignes ``is_total``
+    deja stockees en base sont ignorees.
+    """
+
+    __slots__ = ("all", "groups")
+
+    def __init__(self) -> None:
+        self.all = _Totals()
+        self.groups = {prefix: _Totals() for _, prefix in CHANNEL_GROUPS}
+
+    def add(self, label: str, tac, ca_net, ca_ttc, net_total_profit=None) -> None:
+        self.all.add(tac, ca_net, ca_ttc, net_total_profit)
+        group = channel_group(label)
+        if group is not None:
+            self.groups[group].add(tac, ca_net, ca_ttc, net_total_profit)
+
+    def add_row(self, row: dict[str, Any]) -> None:
+        if not row.get("is_total"):
+            self.add(
+                row["channel_label"],
+                row["tac"],
+                row["ca_net"],
+                row["ca_ttc"],
+                row.get("net_total_profit"),
+            )
+
+    @classmethod
+    def from_channel_sales(cls, rows: Iterable[Any]) -> "ChannelAggregate":
+        aggregate = cls()
+        for r in rows:
+            if not r.is_total:
+                aggregate.add(r.channel_label, r.tac, r.ca_net, r.ca_ttc, r.net_total_profit)
+        return aggregate
+
+    def total_rows(self) -> list[dict[str, Any]]:
+        rows = [
+            self.groups[prefix].as_row(label)
+            for label, prefix in CHANNEL_GROUPS
+            if self.groups[prefix].rows
+        ]
+        if self.all.rows:
+            rows.append(self.all.as_row("TOTAL"))
+        return rows
+
+    def kpi(self) -> dict[str, Any]:
+        delivery = self.groups[DELIVERY]
+        click_collect = self.groups[CLICK_COLLECT]
+        return {
+            "ca_real": self.all.ca_net,
+            "clients": self.all.tac,
+            "ca_delivery": delivery.ca_net,
+            "client_delivery": delivery.tac,
+            "ca_click_collect": click_collect.ca_net,
+            "client_click_collect": click_collect.tac,
+        }
+
+    def summary(self) -> dict[str, Any]:
+        # Colonnes "canaux" de bk_daily_summaries (Decimal exacts)
+        values: dict[str, Any] = {
+            "ca_net_total": self.all.ca_net,
+            "ca_ttc_total": self.all.ca_ttc,
+            "tac_total": self.all.tac,
+        }
+        for prefix, name in GROUP_COLUMNS.items():
+            values[f"{name}_ca_net"] = self.groups[prefix].ca_net
+            values[f"{name}_tac"] = self.groups[prefix].tac
+        return values
@@ -0,0 +1,76 @@
+import gzip
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, Iterable, Mapping
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.core.storage import STORAGE_PATH
+from app.models.bk_report import BKReportFile
+
+# CSV bruts compresses, adresses par leur sha256 : bk_archive/ab/abcdef....csv.gz
+ARCHIVE_ROOT = Path(os.getenv("BK_ARCHIVE_DIR", str(STORAGE_PATH / "bk_archive")))
+
+_CHUNK_SIZE = 64 * 1024
+
+
+def archive_path(sha256: str) -> Path:
+    return ARCHIVE_ROOT / sha256[:2] / f"{sha256}.csv.gz"
+
+
+def store_blob(fileobj: BinaryIO) -> tuple[str, int]:
+    """Archive un fichier s'il n'est pas deja present ; retourne (sha256, taille brute).
+
+    Le hash est calcule avant compression : un fichier deja archive n'est
+    ni recompresse ni reecrit.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fileobj.seek(0)
+    while chunk := fileobj.read(_CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    sha256 = digest.hexdigest()
+
+    target = archive_path(sha256)
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        try:
+            fileobj.seek(0)
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(
+                fileobj=raw, mode="wb", mtime=0
+            ) as gz:
+                while chunk := fileobj.read(_CHUNK_SIZE):
+                    gz.write(chunk)
+            # Ecriture complete puis renommage : jamais d'archive tronquee
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+    fileobj.seek(0)
+    return sha256, size
+
+
+def archive_bk_files(db: Session, report_id: int, files: Mapping[str, BinaryIO]) -> None:
+    """Archive les CSV d'un rapport et remplace ses liens bk_report_files."""
+    rows = []
+    for section, fileobj in files.items():
+        sha256, size = store_blob(fileobj)
+        rows.append({"report_id": report_id, "section": section, "sha256": sha256, "size": size})
+
+    db.execute(delete(BKReportFile).where(BKReportFile.report_id == report_id))
+    if rows:
+        db.execute(insert(BKReportFile), rows)
+
+
+def load_blobs(links: Iterable[BKReportFile]) -> dict[str, bytes]:
+    blobs = {}
+    for link in links:
+        with gzip.open(archive_path(link.sha256), "rb") as gz:
+            blobs[link.section] = gz.read()
+    return blobs
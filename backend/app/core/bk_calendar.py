@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+from typing import Any, Iterator
+
+from sqlalchemy import event, insert
+
+from app.models.bk_calendar import BKCalendarDay
+
+N1_CALENDAR = "calendar"
+N1_WEEKDAY = "weekday"
+
+# Plage remplie a la creation de la table
+CALENDAR_START = date(2000, 1, 1)
+CALENDAR_END = date(2099, 12, 31)
+
+COMPARABLE_DAYS = 364
+
+
+def easter_sunday(year: int) -> date:
+    # Algorithme de Meeus/Jones/Butcher (calendrier gregorien)
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def french_holidays(year: int) -> dict[date, str]:
+    easter = easter_sunday(year)
+    return {
+        date(year, 1, 1): "Jour de l'an",
+        easter + timedelta(days=1): "Lundi de Paques",
+        date(year, 5, 1): "Fete du travail",
+        date(year, 5, 8): "Victoire 1945",
+        easter + timedelta(days=39): "Ascension",
+        easter + timedelta(days=50): "Lundi de Pentecote",
+        date(year, 7, 14): "Fete nationale",
+        date(year, 8, 15): "Assomption",
+        date(year, 11, 1): "Toussaint",
+        date(year, 11, 11): "Armistice 1918",
+        date(year, 12, 25): "Noel",
+    }
+
+
+def calendar_n1_date(day: date) -> date:
+    try:
+        return day.replace(year=day.year - 1)
+    except ValueError:
+        return day.replace(year=day.year - 1, day=28)
+
+
+def comparable_n1_date(day: date) -> date:
+    return day - timedelta(days=COMPARABLE_DAYS)
+
+
+def calendar_rows(start: date, end: date) -> Iterator[dict[str, Any]]:
+    holidays: dict[date, str] = {}
+    for year in range(start.year, end.year + 1):
+        holidays.update(french_holidays(year))
+
+    day = start
+    while day <= end:
+        iso_year, iso_week, iso_weekday = day.isocalendar()
+        yield {
+            "day": day,
+            "n1_date": calendar_n1_date(day),
+            "comparable_n1_date": comparable_n1_date(day),
+            "iso_year": iso_year,
+            "iso_week": iso_week,
+            "iso_weekday": iso_weekday,
+            "week_start": day - timedelta(days=iso_weekday - 1),
+            "is_holiday": day in holidays,
+            "holiday_name": holidays.get(day),
+        }
+        day += timedelta(days=1)
+
+
+@event.listens_for(BKCalendarDay.__table__, "after_create")
+def _fill_calendar(target, connection, **kw) -> None:
+    # create_all (bases jetables, benchmarks) ; la migration remplit elle-meme
+    connection.execute(insert(target), list(calendar_rows(CALENDAR_START, CALENDAR_END)))
@@ -0,0 +1,21 @@
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy.engine import Row
+
+FORMAT_ROWS = "rows"
+FORMAT_COLUMNAR = "columnar"
+FORMAT_NDJSON = "ndjson"
+
+
+def columns_of(rows: Sequence[Row], fields: Iterable[str]) -> dict[str, list[Any]]:
+    """Transpose des lignes de requete : un tableau JSON par champ, sans dict par ligne.
+
+    Les valeurs restent brutes (Decimal, date) : a rendre avec FastJSONResponse.
+    """
+    fields = list(fields)
+    if not rows:
+        return {field: [] for field in fields}
+
+    positions = {name: i for i, name in enumerate(rows[0]._fields)}
+    transposed = list(zip(*rows))
+    return {field: list(transposed[positions[field]]) for field in fields}
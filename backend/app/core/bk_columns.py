@@ -0,0 +1,76 @@
+from decimal import Decimal
+from typing import Any, Sequence
+
+# Separateur interne pour traiter une colonne comme une seule chaine
+_SEP = "\x1f"
+
+
+def parse_decimal(value: Any) -> Decimal | None:
+    if value is None:
+        return None
+    s = str(value).strip()
+    if s == "":
+        return None
+    s = s.replace(" ", "").replace(",", ".")
+    try:
+        return Decimal(s)
+    except Exception:
+        return None
+
+
+def parse_int(value: Any) -> int | None:
+    if value is None:
+        return None
+    s = str(value).strip()
+    if s == "":
+        return None
+    s = s.replace(" ", "").replace(",", ".")
+    try:
+        return int(float(s))
+    except Exception:
+        return None
+
+
+def _normalize(values: Sequence[Any]) -> list[str] | None:
+    """Normalise toute la colonne en une passe : join, replace, split.
+
+    Les espaces de bord sont laisses tels quels : Decimal() et float() les
+    ignorent deja. Retourne None si la colonne ne se prete pas au chemin rapide.
+    """
+    if None in values:
+        values = ["" if v is None else v for v in values]
+    try:
+        joined = _SEP.join(values)
+    except TypeError:
+        return None
+    parts = joined.replace(" ", "").replace(",", ".").split(_SEP)
+    return parts if len(parts) == len(values) else None
+
+
+def parse_decimal_column(values: Sequence[Any]) -> list[Decimal | None]:
+    parts = _normalize(values)
+    if parts is not None:
+        try:
+            if "" not in parts:
+                return list(map(Decimal, parts))
+            return [Decimal(s) if s else None for s in parts]
+        except Exception:
+            pass
+    # Cellule atypique (texte, blanc seul...) : on garde la semantique exacte
+    return [parse_decimal(v) for v in values]
+
+
+def parse_int_column(values: Sequence[Any]) -> list[int | None]:
+    parts = _normalize(values)
+    if parts is not None:
+        try:
+            if "" not in parts:
+                return list(map(int, map(float, parts)))
+            return [int(float(s)) if s else None for s in parts]
+        except Exception:
+            pass
+    return [parse_int(v) for v in values]
+
+
+def parse_text_column(values: Sequence[Any]) -> list[str]:
+    return [str(v).strip() for v in values]
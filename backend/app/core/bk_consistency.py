@@ -0,0 +1,51 @@
+import os
+from decimal import Decimal
+from typing import Any, Iterable, Iterator
+
+# Ecart tolere (en euros) entre deux totaux TTC d'une meme journee
+TOLERANCE = Decimal(os.getenv("BK_CONSISTENCY_TOLERANCE", "0.05"))
+
+_ZERO = Decimal("0")
+
+
+class ConsistencyCheck:
+    """Rapprochements entre les fichiers d'une journee, cumules pendant le parse.
+
+    La reference est le CA TTC des modes de consommation (SP + AE), a defaut
+    celui des canaux. Sur les exports reels, caparprofit n'a pas tous les
+    canaux : son ecart a la reference est garde a part (channel_ttc_delta),
+    sans entrer dans is_consistent. Les lignes TVA et reglement sont
+    additionnees au passage, pendant que leurs generateurs sont consommes par
+    l'insertion : ni passe ni requete supplementaire.
+    """
+
+    __slots__ = ("reference_ttc", "channel_ttc", "tva_ttc", "payment_theorique")
+
+    def __init__(self, channel_ttc: Decimal, consumption_ttc: Decimal | None = None) -> None:
+        self.channel_ttc = channel_ttc
+        self.reference_ttc = channel_ttc if consumption_ttc is None else consumption_ttc
+        self.tva_ttc = _ZERO
+        self.payment_theorique = _ZERO
+
+    def tap_tva(self, rows: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        for row in rows:
+            if row["ttc"] is not None:
+                self.tva_ttc += row["ttc"]
+            yield row
+
+    def tap_payments(self, rows: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        for row in rows:
+            if row["theorique"] is not None:
+                self.payment_theorique += row["theorique"]
+            yield row
+
+    def result(self) -> dict[str, Any]:
+        # A lire une fois les lignes TVA et reglement consommees
+        tva_delta = self.tva_ttc - self.reference_ttc
+        payment_delta = self.payment_theorique - self.reference_ttc
+        return {
+            "tva_ttc_delta": tva_delta,
+            "payment_ttc_delta": payment_delta,
+            "channel_ttc_delta": self.channel_ttc - self.reference_ttc,
+            "is_consistent": abs(tva_delta) <= TOLERANCE and abs(payment_delta) <= TOLERANCE,
+        }
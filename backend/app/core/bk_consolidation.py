@@ -0,0 +1,165 @@
+from datetime import date
+from itertools import groupby
+from typing import Any, Iterable, Iterator
+
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session
+
+from app.core.bk_calendar import N1_CALENDAR
+from app.core.bk_summary import CHANNEL_COLUMNS, RECAP_FIELDS, recap_query
+from app.core.serialization import dumps
+from app.models.bk_report import BKDailyReport, BKPayment, BKTvaSummary
+
+PAYMENT_FIELDS = ("theorique", "preleve", "compte", "ecart")
+TVA_FIELDS = ("ht", "tva", "ttc")
+
+# Lignes lues par aller-retour (curseur serveur sur PostgreSQL)
+STREAM_CHUNK = 500
+
+
+def _add(totals: dict[str, Any], values: dict[str, Any]) -> None:
+    # Somme en Decimal ; None si aucune valeur renseignee
+    for field, value in values.items():
+        if value is not None:
+            totals[field] = (totals.get(field) or 0) + value
+        else:
+            totals.setdefault(field, None)
+
+
+class _DayGroups:
+    """Lignes (report_date, libelle, sommes...) triees par jour, lues a la demande."""
+
+    def __init__(self, rows: Iterable[Any], label: str, fields: tuple[str, ...]) -> None:
+        self._groups = groupby(rows, key=lambda row: row.report_date)
+        self._label = label
+        self._fields = fields
+        self._pending: tuple[date, list[Any]] | None = None
+
+    def take(self, day: date) -> dict[str, dict[str, Any]]:
+        while True:
+            if self._pending is None:
+                group = next(self._groups, None)
+                if group is None:
+                    return {}
+                self._pending = (group[0], list(group[1]))
+            pending_day, rows = self._pending
+            if pending_day > day:
+                return {}
+            self._pending = None
+            # Jour sans synthese (rapport non rattrape) : ignore
+            if pending_day == day:
+                return {
+                    getattr(row, self._label): {f: getattr(row, f) for f in self._fields}
+                    for row in rows
+                }
+
+
+def _scope_reports(
+    query: Query,
+    start_date: date,
+    end_date: date,
+    restaurant_code: str | None,
+    allowed_restaurants: list[str] | None,
+) -> Query:
+    query = query.filter(
+        BKDailyReport.report_date >= start_date, BKDailyReport.report_date <= end_date
+    )
+    if restaurant_code:
+        query = query.filter(BKDailyReport.restaurant_code == restaurant_code.strip().upper())
+    if allowed_restaurants is not None:
+        query = query.filter(BKDailyReport.restaurant_code.in_(allowed_restaurants))
+    return query
+
+
+def _detail_query(
+    db: Session, model: Any, label: str, fields: tuple[str, ...], scope: tuple
+) -> Query:
+    label_column = getattr(model, label)
+    query = (
+        db.query(
+            BKDailyReport.report_date,
+            label_column,
+            *[func.sum(getattr(model, field)).label(field) for field in fields],
+        )
+        .join(BKDailyReport, BKDailyReport.id == model.report_id)
+    )
+    return (
+        _scope_reports(query, *scope)
+        .group_by(BKDailyReport.report_date, label_column)
+        .order_by(BKDailyReport.report_date, label_column)
+        .yield_per(STREAM_CHUNK)
+    )
+
+
+def iter_consolidation(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    restaurant_code: str | None = None,
+    allowed_restaurants: list[str] | None = None,
+    n1_basis: str = N1_CALENDAR,
+) -> Iterator[dict[str, Any]]:
+    """Totaux reseau par jour puis sur la periode, en Decimal.
+
+    Canaux et KPI viennent du recap journalier (bk_daily_summaries), reglements
+    et TVA de requetes groupees par jour et libelle ; les trois flux, tries par
+    date, sont fusionnes au fil de la lecture.
+    """
+    scope = (start_date, end_date, restaurant_code, allowed_restaurants)
+    fields = (*CHANNEL_COLUMNS, *RECAP_FIELDS)
+    days = recap_query(db, *scope, n1_basis).subquery()
+    day_rows = (
+        db.query(
+            days.c.report_date,
+            func.count().label("reports"),
+            *[func.sum(days.c[field]).label(field) for field in fields],
+        )
+        .group_by(days.c.report_date)
+        .order_by(days.c.report_date)
+        .yield_per(STREAM_CHUNK)
+    )
+    payments = _DayGroups(
+        _detail_query(db, BKPayment, "payment_type", PAYMENT_FIELDS, scope),
+        "payment_type",
+        PAYMENT_FIELDS,
+    )
+    tva = _DayGroups(
+        _detail_query(db, BKTvaSummary, "tva_label", TVA_FIELDS, scope), "tva_label", TVA_FIELDS
+    )
+
+    period: dict[str, Any] = {
+        "type": "period",
+        "start_date": start_date,
+        "end_date": end_date,
+        "days": 0,
+        "reports": 0,
+        "channels": {},
+        "kpi": {},
+        "payments": {},
+        "tva": {},
+    }
+    for row in day_rows:
+        line = {
+            "type": "day",
+            "report_date": row.report_date,
+            "reports": row.reports,
+            "channels": {field: getattr(row, field) for field in CHANNEL_COLUMNS},
+            "kpi": {field: getattr(row, field) for field in RECAP_FIELDS},
+            "payments": payments.take(row.report_date),
+            "tva": tva.take(row.report_date),
+        }
+        yield line
+
+        period["days"] += 1
+        period["reports"] += row.reports
+        _add(period["channels"], line["channels"])
+        _add(period["kpi"], line["kpi"])
+        for group in ("payments", "tva"):
+            for label, values in line[group].items():
+                _add(period[group].setdefault(label, {}), values)
+    yield period
+
+
+def ndjson_lines(items: Iterable[dict[str, Any]]) -> Iterator[bytes]:
+    for item in items:
+        yield dumps(item) + b"\n"
@@ -0,0 +1,125 @@
+from typing import Any
+
+from sqlalchemy.orm import Load, raiseload, selectinload
+
+from app.core.bk_summary import RECAP_FIELDS
+from app.models.bk_report import BKDailyReport
+
+# Section du detail -> champs serialises, dans l'ordre de la reponse
+CONSISTENCY_FIELDS = ("tva_ttc_delta", "payment_ttc_delta", "channel_ttc_delta", "is_consistent")
+LIST_SECTIONS = {
+    "channel_sales": (
+        "channel_label",
+        "is_total",
+        "tac",
+        "ca_net",
+        "ca_ttc",
+        "pm_net",
+        "pm_ttc",
+        "net_total_profit",
+    ),
+    "consumption_modes": ("mode", "tac", "ca_ht", "ca_ttc", "pct"),
+    "corrections": ("taux", "montant", "nombre"),
+    "divers": (
+        "nombre_repas_employes",
+        "nombre_commandes_ouvertes",
+        "montant_valorise_repas_employes",
+        "nombre_annulations",
+        "montant_annulations",
+        "taux_commandes_ouvertes",
+        "taux_repas_employes",
+        "montant_commandes_ouvertes",
+        "taux_annulations",
+    ),
+    "payments": ("payment_type", "theorique", "preleve", "compte", "ecart"),
+    "remises": (
+        "taux_remises",
+        "montant_remises",
+        "nombre_remises",
+        "taux_sauces_offertes",
+        "montant_sauces_offertes",
+        "nbr_sauces_offertes",
+    ),
+    "tva_summary": ("tva_label", "ht", "tva", "ttc"),
+    "annex_sales": ("libelle", "nbr", "montant_ht", "montant_ttc"),
+}
+DETAIL_SECTIONS = {
+    "consistency": CONSISTENCY_FIELDS,
+    "kpi": RECAP_FIELDS,
+    **LIST_SECTIONS,
+}
+
+# Sections lues sur le rapport lui-meme (pas de relation a charger)
+_INLINE_SECTIONS = {"consistency"}
+
+
+def _split(value: str | None) -> list[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def detail_selection(sections: str | None, fields: str | None) -> dict[str, tuple[str, ...]]:
+    """Sections et champs demandes (``sections=kpi,payments``, ``fields=kpi.ca_real``).
+
+    Sans parametre : tout le detail. Un champ ``section.champ`` ajoute sa
+    section et la restreint aux champs cites. Leve ValueError si inconnu.
+    """
+    names = _split(sections)
+    field_names = _split(fields)
+    if not names and not field_names:
+        return dict(DETAIL_SECTIONS)
+
+    selection: dict[str, tuple[str, ...]] = {}
+    for name in names:
+        if name not in DETAIL_SECTIONS:
+            raise ValueError(f"Unknown section: {name}")
+        selection[name] = DETAIL_SECTIONS[name]
+
+    restricted: dict[str, list[str]] = {}
+    for item in field_names:
+        section, _, field = item.partition(".")
+        if section not in DETAIL_SECTIONS or field not in DETAIL_SECTIONS[section]:
+            raise ValueError(f"Unknown field: {item}")
+        restricted.setdefault(section, []).append(field)
+    for section, chosen in restricted.items():
+        # Ordre de la reponse complete, pas celui de la requete
+        selection[section] = tuple(f for f in DETAIL_SECTIONS[section] if f in chosen)
+    return selection
+
+
+def detail_load_options(selection: dict[str, tuple[str, ...]]) -> list[Load]:
+    """selectinload des sections demandees (colonnes limitees), raiseload pour le reste."""
+    options = []
+    for section, fields in selection.items():
+        if section in _INLINE_SECTIONS:
+            continue
+        relationship = getattr(BKDailyReport, section)
+        model = relationship.property.mapper.class_
+        options.append(
+            selectinload(relationship).load_only(*[getattr(model, f) for f in fields])
+        )
+    options.append(raiseload("*"))
+    return options
+
+
+def serialize_report(
+    report: BKDailyReport, selection: dict[str, tuple[str, ...]] = DETAIL_SECTIONS
+) -> dict[str, Any]:
+    # Valeurs brutes (Decimal, date) : encodees par FastJSONResponse
+    payload: dict[str, Any] = {
+        "id": report.id,
+        "client_code": report.client_code,
+        "restaurant_code": report.restaurant_code,
+        "report_date": report.report_date,
+        "created_at": report.created_at,
+    }
+    for section, fields in selection.items():
+        if section in _INLINE_SECTIONS:
+            payload[section] = {f: getattr(report, f) for f in fields}
+        elif section == "kpi":
+            kpi = report.kpi
+            payload[section] = None if not kpi else {f: getattr(kpi, f) for f in fields}
+        else:
+            payload[section] = [
+                {f: getattr(row, f) for f in fields} for row in getattr(report, section)
+            ]
+    return payload
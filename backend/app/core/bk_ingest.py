@@ -0,0 +1,654 @@
+import codecs
+import csv
+import hashlib
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from io import BytesIO
+from itertools import islice
+from typing import Any, BinaryIO, Iterable, Iterator, Mapping
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.bk_aggregate import ChannelAggregate
+from app.core.bk_archive import archive_bk_files
+from app.core.bk_columns import (
+    parse_decimal,
+    parse_decimal_column,
+    parse_int,
+    parse_int_column,
+    parse_text_column,
+)
+from app.core.bk_consistency import ConsistencyCheck
+from app.core.bk_summary import write_daily_summary
+from app.models.bk_report import (
+    BKDailyKpi,
+    BKAnnexSale,
+    BKChannelSales,
+    BKConsumptionMode,
+    BKCorrections,
+    BKDailyReport,
+    BKDivers,
+    BKPayment,
+    BKRemises,
+    BKTvaSummary,
+)
+
+# Nom du champ d'upload -> nom du fichier exporte par la caisse BK
+BK_FILES: dict[str, str] = {
+    "caparprofit": "SyntheseCA_caparprofit.csv",
+    "consommationparprofit": "SyntheseCA_consommationparprofit.csv",
+    "corrections": "SyntheseCA_corrections.csv",
+    "divers": "SyntheseCA_divers.csv",
+    "reglement": "SyntheseCA_reglement.csv",
+    "remises": "SyntheseCA_remises.csv",
+    "tva": "SyntheseCA_tva.csv",
+    "vente_annexes": "SyntheseCA_venteAnnexes.csv",
+}
+
+READ_CHUNK_SIZE = 64 * 1024
+PARSE_CHUNK_SIZE = 5000
+INSERT_CHUNK_SIZE = 5000
+
+_DATE_TOKEN = re.compile(r"^(\d{4})-?(\d{2})-?(\d{2})$")
+
+_parse_pool: ProcessPoolExecutor | None = None
+
+
+def _iter_text_lines(fileobj: BinaryIO) -> Iterator[str]:
+    """Decode le fichier par blocs et rend les lignes une a une.
+
+    UTF-8 (avec ou sans BOM) par defaut ; au premier octet invalide on bascule
+    en latin-1 pour la suite du fichier, sans relire ce qui a deja ete decode.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    fallback = False
+    pending = ""
+    while True:
+        chunk = fileobj.read(READ_CHUNK_SIZE)
+        if not fallback:
+            try:
+                text = decoder.decode(chunk, final=not chunk)
+            except UnicodeDecodeError:
+                buffered, _ = decoder.getstate()
+                text = (buffered + chunk).decode("latin-1")
+                fallback = True
+        else:
+            text = chunk.decode("latin-1")
+
+        if text:
+            lines = (pending + text).split("\n")
+            pending = lines.pop()
+            for line in lines:
+                yield line + "\n"
+        if not chunk:
+            break
+    if pending:
+        yield pending
+
+
+def _normalized_chunks(fileobj: BinaryIO) -> Iterator[bytes]:
+    # BOM retire, fins de ligne CRLF -> LF, sauts de ligne finaux ignores
+    first = True
+    carry_cr = False
+    trailing = b""
+    while True:
+        chunk = fileobj.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        if first:
+            chunk = chunk.removeprefix(codecs.BOM_UTF8)
+            first = False
+        if carry_cr:
+            chunk = b"\r" + chunk
+        carry_cr = chunk.endswith(b"\r")
+        if carry_cr:
+            chunk = chunk[:-1]
+        chunk = chunk.replace(b"\r\n", b"\n")
+        body = chunk.rstrip(b"\n")
+        if body:
+            yield trailing + body
+            trailing = chunk[len(body):]
+        else:
+            trailing += chunk
+    if carry_cr:
+        yield trailing + b"\r"
+
+
+def fingerprint_bk_files(files: Mapping[str, BinaryIO]) -> str:
+    """Empreinte SHA-256 du contenu normalise des 8 CSV (fichiers rembobines)."""
+    digest = hashlib.sha256()
+    for name in BK_FILES:
+        fileobj = files[name]
+        digest.update(name.encode() + b"\0")
+        for piece in _normalized_chunks(fileobj):
+            digest.update(piece)
+        digest.update(b"\0")
+        fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def _iter_csv_rows(fileobj: BinaryIO) -> Iterator[dict[str, str]]:
+    yield from csv.DictReader(_iter_text_lines(fileobj), delimiter=";")
+
+
+def _iter_typed_rows(
+    fileobj: BinaryIO, columns: list[tuple[str, str, str]]
+) -> Iterator[dict[str, Any]]:
+    """Lit un CSV multi-lignes par paquets et type chaque colonne d'un coup.
+
+    ``columns`` : (champ de sortie, colonne CSV, "text" | "decimal" | "int").
+    """
+    rows = _iter_csv_rows(fileobj)
+    while True:
+        chunk = list(islice(rows, PARSE_CHUNK_SIZE))
+        if not chunk:
+            return
+        typed: dict[str, list[Any]] = {}
+        for name, column, kind in columns:
+            if kind == "text":
+                typed[name] = parse_text_column([row.get(column, "") for row in chunk])
+            elif kind == "decimal":
+                typed[name] = parse_decimal_column([row.get(column) for row in chunk])
+            else:
+                typed[name] = parse_int_column([row.get(column) for row in chunk])
+        for i in range(len(chunk)):
+            yield {name: values[i] for name, values in typed.items()}
+
+
+def _first_row(fileobj: BinaryIO) -> dict[str, str] | None:
+    return next(_iter_csv_rows(fileobj), None)
+
+
+def parse_bk_files(files: Mapping[str, BinaryIO]) -> dict[str, Any]:
+    """Parse les 8 CSV d'une journee BK en lignes typees, sans toucher a la DB.
+
+    Les sections multi-lignes (reglement, tva, ventes annexes) sont des
+    generateurs : les lignes sont lues et typees au fil de l'insertion.
+    ``consistency`` n'est complet qu'une fois ces generateurs consommes.
+    """
+    parsed: dict[str, Any] = {}
+
+    # caparprofit
+    channel_rows = [
+        {"is_total": False, **row}
+        for row in _iter_typed_rows(
+            files["caparprofit"],
+            [
+                ("channel_label", "profit", "text"),
+                ("tac", "tac", "int"),
+                ("ca_net", "net", "decimal"),
+                ("ca_ttc", "ttc", "decimal"),
+                ("pm_net", "panierMoyenNet", "decimal"),
+                ("pm_ttc", "panierMoyenTTC", "decimal"),
+                ("net_total_profit", "netTotalProfit", "decimal"),
+            ],
+        )
+    ]
+
+    aggregate = ChannelAggregate()
+    for row in channel_rows:
+        aggregate.add_row(row)
+    parsed["channel_sales"] = channel_rows + aggregate.total_rows()
+    parsed["kpi"] = aggregate.kpi()
+    parsed["summary"] = aggregate.summary()
+
+    # consommation par profit (1 ligne)
+    row = _first_row(files["consommationparprofit"])
+    parsed["consumption_modes"] = (
+        []
+        if row is None
+        else [
+            {
+                "mode": mode,
+                "tac": parse_int(row.get(f"{mode}_tac")),
+                "ca_ht": parse_decimal(row.get(f"{mode}_caht")),
+                "ca_ttc": parse_decimal(row.get(f"{mode}_cattc")),
+                "pct": parse_decimal(row.get(f"{mode}_pourcent")),
+            }
+            for mode in ("SP", "AE")
+        ]
+    )
+    # Reference des rapprochements : CA TTC SP + AE (cf. ConsistencyCheck)
+    consumption_ttc = [m["ca_ttc"] for m in parsed["consumption_modes"] if m["ca_ttc"] is not None]
+    check = ConsistencyCheck(
+        aggregate.all.ca_ttc, sum(consumption_ttc) if consumption_ttc else None
+    )
+    parsed["consistency"] = check
+
+    # corrections (1 ligne)
+    row = _first_row(files["corrections"])
+    parsed["corrections"] = (
+        []
+        if row is None
+        else [
+            {
+                "taux": parse_decimal(row.get("tauxCorrection")),
+                "montant": parse_decimal(row.get("montantCorrection")),
+                "nombre": parse_int(row.get("nombreCorrection")),
+            }
+        ]
+    )
+
+    # divers (1 ligne)
+    row = _first_row(files["divers"])
+    parsed["divers"] = (
+        []
+        if row is None
+        else [
+            {
+                "nombre_repas_employes": parse_int(row.get("nombreRepasEmployes")),
+                "nombre_commandes_ouvertes": parse_int(row.get("nombreCommandeOuvertes")),
+                "montant_valorise_repas_employes": parse_decimal(
+                    row.get("montantValoriseRepasEmployes")
+                ),
+                "nombre_annulations": parse_int(row.get("nombreAnnulations")),
+                "montant_annulations": parse_decimal(row.get("montantAnnulations")),
+                "taux_commandes_ouvertes": parse_decimal(row.get("tauxCommandeOuvertes")),
+                "taux_repas_employes": parse_decimal(row.get("tauxRepasEmployes")),
+                "montant_commandes_ouvertes": parse_decimal(row.get("montantCommandeOuvertes")),
+                "taux_annulations": parse_decimal(row.get("tauxAnnulations")),
+            }
+        ]
+    )
+
+    # reglement (multi)
+    parsed["payments"] = check.tap_payments(
+        _iter_typed_rows(
+            files["reglement"],
+            [
+                ("payment_type", "type", "text"),
+                ("theorique", "theorique", "decimal"),
+                ("preleve", "preleve", "decimal"),
+                ("compte", "compte", "decimal"),
+                ("ecart", "ecart", "decimal"),
+            ],
+        )
+    )
+
+    # remises (1 ligne)
+    row = _first_row(files["remises"])
+    parsed["remises"] = (
+        []
+        if row is None
+        else [
+            {
+                "taux_remises": parse_decimal(row.get("tauxRemises")),
+                "montant_remises": parse_decimal(row.get("montantRemises")),
+                "nombre_remises": parse_int(row.get("nombreRemises")),
+                "taux_sauces_offertes": parse_decimal(row.get("tauxSaucesOffertes")),
+                "montant_sauces_offertes": parse_decimal(row.get("montantSaucesOffertes")),
+                "nbr_sauces_offertes": parse_int(row.get("nbrSaucesOffertes")),
+            }
+        ]
+    )
+
+    # tva (multi)
+    parsed["tva_summary"] = check.tap_tva(
+        _iter_typed_rows(
+            files["tva"],
+            [
+                ("tva_label", "libelle", "text"),
+                ("ht", "HT", "decimal"),
+                ("tva", "TVA", "decimal"),
+                ("ttc", "TTC", "decimal"),
+            ],
+        )
+    )
+
+    # ventes annexes (multi)
+    parsed["annex_sales"] = _iter_typed_rows(
+        files["vente_annexes"],
+        [
+            ("libelle", "libelle", "text"),
+            ("nbr", "nbr", "int"),
+            ("montant_ht", "montantHT", "decimal"),
+            ("montant_ttc", "montantttc", "decimal"),
+        ],
+    )
+
+    return parsed
+
+
+def fingerprint_bk_blobs(blobs: Mapping[str, bytes]) -> str:
+    return fingerprint_bk_files({name: BytesIO(raw) for name, raw in blobs.items()})
+
+
+def parse_bk_blobs(blobs: Mapping[str, bytes]) -> dict[str, Any]:
+    # Point d'entree des workers : des bytes en entree, picklable en sortie
+    parsed = parse_bk_files({name: BytesIO(raw) for name, raw in blobs.items()})
+    return {
+        section: list(rows) if isinstance(rows, Iterator) else rows
+        for section, rows in parsed.items()
+    }
+
+
+_CHILD_MODELS = {
+    "channel_sales": BKChannelSales,
+    "consumption_modes": BKConsumptionMode,
+    "corrections": BKCorrections,
+    "divers": BKDivers,
+    "payments": BKPayment,
+    "remises": BKRemises,
+    "tva_summary": BKTvaSummary,
+    "annex_sales": BKAnnexSale,
+}
+
+# INSERT ... ON CONFLICT DO NOTHING par dialecte ; ailleurs l'index unique leve IntegrityError
+_CONFLICT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def create_bk_report(
+    db: Session,
+    restaurant_code: str,
+    report_date: date,
+    parsed: Mapping[str, Any],
+    content_hash: str | None = None,
+    idempotency_key: str | None = None,
+) -> BKDailyReport:
+    """Insere le rapport et ses lignes (flush, pas de commit).
+
+    Le rapport passe par INSERT ... ON CONFLICT DO NOTHING sur l'index unique
+    (restaurant_code, report_date) : un import concurrent du meme jour leve
+    BKReportConflict sans rien ecrire. Les lignes filles sont ecrites en
+    ensemble : COPY sur PostgreSQL/psycopg, executemany ailleurs. Elles ne
+    passent pas par l'unit of work de l'ORM.
+    """
+    report_id = _insert_report(
+        db,
+        {
+            "client_code": "BK",
+            "restaurant_code": restaurant_code.strip().upper(),
+            "report_date": report_date,
+            "content_hash": content_hash,
+            "idempotency_key": idempotency_key,
+        },
+    )
+    if report_id is None:
+        raise BKReportConflict("Report already exists for this restaurant and date.")
+    report = db.get(BKDailyReport, report_id)
+
+    bulk_insert_rows(db, BKDailyKpi, [{"report_id": report.id, **parsed["kpi"]}])
+    write_daily_summary(db, report, parsed["summary"], parsed["kpi"])
+    for section, model in _CHILD_MODELS.items():
+        bulk_insert_rows(
+            db, model, ({"report_id": report.id, **row} for row in parsed[section])
+        )
+    _apply_consistency(report, parsed)
+    return report
+
+
+def _insert_report(db: Session, values: dict[str, Any]) -> int | None:
+    # None si (restaurant_code, report_date) existe deja
+    dialect_insert = _CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        stmt = insert(BKDailyReport)
+    else:
+        stmt = dialect_insert(BKDailyReport).on_conflict_do_nothing(
+            index_elements=["restaurant_code", "report_date"]
+        )
+    return db.execute(stmt.values(**values).returning(BKDailyReport.id)).scalar()
+
+
+def _apply_consistency(report: BKDailyReport, parsed: Mapping[str, Any]) -> None:
+    for field, value in parsed["consistency"].result().items():
+        setattr(report, field, value)
+
+
+class BKReportConflict(Exception):
+    pass
+
+
+def ingest_bk_files(
+    db: Session,
+    restaurant_code: str,
+    report_date: date,
+    files: Mapping[str, BinaryIO],
+    content_hash: str | None = None,
+    idempotency_key: str | None = None,
+) -> tuple[int, bool]:
+    """Pipeline d'import hors HTTP (jobs, depot de fichiers).
+
+    Retourne (report_id, cree). Un rapport deja present avec le meme contenu
+    est renvoye tel quel ; un contenu different leve BKReportConflict.
+    """
+    restaurant_code = restaurant_code.strip().upper()
+    if report_date > date.today():
+        raise ValueError("Report date cannot be in the future.")
+
+    content_hash = content_hash or fingerprint_bk_files(files)
+    existing_id = _existing_report_id(db, restaurant_code, report_date, content_hash)
+    if existing_id is not None:
+        return existing_id, False
+
+    try:
+        report = create_bk_report(
+            db,
+            restaurant_code,
+            report_date,
+            parse_bk_files(files),
+            content_hash=content_hash,
+            idempotency_key=idempotency_key,
+        )
+    except BKReportConflict:
+        # Import concurrent du meme jour, commite entre-temps
+        existing_id = _existing_report_id(db, restaurant_code, report_date, content_hash)
+        if existing_id is None:
+            raise
+        return existing_id, False
+    archive_bk_files(db, report.id, files)
+    return report.id, True
+
+
+def _existing_report_id(
+    db: Session, restaurant_code: str, report_date: date, content_hash: str
+) -> int | None:
+    """Id du rapport deja importe avec ce contenu ; BKReportConflict si contenu different."""
+    existing = (
+        db.query(BKDailyReport.id, BKDailyReport.content_hash)
+        .filter(
+            BKDailyReport.restaurant_code == restaurant_code,
+            BKDailyReport.report_date == report_date,
+        )
+        .first()
+    )
+    if existing is None:
+        return None
+    if existing.content_hash == content_hash:
+        return existing.id
+    raise BKReportConflict("Report already exists for this restaurant and date.")
+
+
+def replace_bk_report(
+    db: Session,
+    report: BKDailyReport,
+    parsed: Mapping[str, Any],
+    content_hash: str | None = None,
+) -> dict[str, dict[str, int]]:
+    """Remplace le contenu d'un rapport en place, en gardant son id.
+
+    Chaque table fille est comparee ligne a ligne avec le nouveau parse :
+    les lignes identiques ne sont pas touchees, les lignes modifiees sont
+    mises a jour, seuls les surplus sont inseres ou supprimes. Cote KPI, seuls
+    les champs calcules depuis caparprofit sont reecrits ; la saisie manuelle
+    (N-1, prev, ecart caisse...) est conservee. Flush, pas de commit.
+    """
+    changes = {
+        section: _sync_child_rows(db, model, report.id, parsed[section])
+        for section, model in _CHILD_MODELS.items()
+    }
+
+    updated = db.execute(
+        update(BKDailyKpi).where(BKDailyKpi.report_id == report.id).values(**parsed["kpi"])
+    ).rowcount
+    if not updated:
+        bulk_insert_rows(db, BKDailyKpi, [{"report_id": report.id, **parsed["kpi"]}])
+    kpi = db.query(BKDailyKpi).filter(BKDailyKpi.report_id == report.id).one()
+    write_daily_summary(db, report, parsed["summary"], kpi)
+
+    report.content_hash = content_hash
+    _apply_consistency(report, parsed)
+    db.flush()
+    return changes
+
+
+def _comparable_columns(model: type) -> list[tuple[str, int | None]]:
+    return [
+        (column.name, getattr(column.type, "scale", None))
+        for column in model.__table__.columns
+        if column.name not in ("id", "report_id")
+    ]
+
+
+def _comparable(values: Iterable[Any], columns: list[tuple[str, int | None]]) -> tuple:
+    # Meme arrondi que la colonne Numeric, sinon une valeur a 16 decimales
+    # serait toujours vue comme "modifiee" face a la valeur stockee.
+    out = []
+    for value, (_, scale) in zip(values, columns):
+        if isinstance(value, Decimal) and scale is not None:
+            try:
+                value = value.quantize(Decimal(1).scaleb(-scale), rounding=ROUND_HALF_UP)
+            except InvalidOperation:
+                pass
+        out.append(value)
+    return tuple(out)
+
+
+def _sync_child_rows(
+    db: Session, model: type, report_id: int, rows: Iterable[dict[str, Any]]
+) -> dict[str, int]:
+    columns = _comparable_columns(model)
+    names = [name for name, _ in columns]
+
+    stored: dict[tuple, list[int]] = {}
+    for row in db.execute(
+        select(model.id, *[getattr(model, name) for name in names])
+        .where(model.report_id == report_id)
+        .order_by(model.id)
+    ):
+        stored.setdefault(_comparable(row[1:], columns), []).append(row[0])
+
+    changed: list[dict[str, Any]] = []
+    for row in rows:
+        ids = stored.get(_comparable((row[name] for name in names), columns))
+        if ids:
+            ids.pop(0)
+        else:
+            changed.append(row)
+
+    # Les lignes stockees restantes sont recyclees (UPDATE) avant tout INSERT
+    leftovers = sorted(row_id for ids in stored.values() for row_id in ids)
+    updates = [{"id": row_id, **row} for row_id, row in zip(leftovers, changed)]
+    inserts = changed[len(updates):]
+    deletes = leftovers[len(updates):]
+
+    if updates:
+        db.execute(update(model), updates)
+    if inserts:
+        bulk_insert_rows(db, model, ({"report_id": report_id, **row} for row in inserts))
+    if deletes:
+        db.execute(delete(model).where(model.id.in_(deletes)))
+    return {"inserted": len(inserts), "updated": len(updates), "deleted": len(deletes)}
+
+
+def bulk_insert_rows(db: Session, model: type, rows: Iterable[dict[str, Any]]) -> int:
+    use_copy = db.get_bind().dialect.driver == "psycopg"
+    count = 0
+    batch: list[dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_CHUNK_SIZE:
+            _write_batch(db, model, batch, use_copy)
+            count += len(batch)
+            batch = []
+    if batch:
+        _write_batch(db, model, batch, use_copy)
+        count += len(batch)
+    return count
+
+
+def _write_batch(db: Session, model: type, batch: list[dict[str, Any]], use_copy: bool) -> None:
+    if not use_copy:
+        db.execute(insert(model), batch)
+        return
+
+    columns = list(batch[0])
+    table = model.__table__.name
+    cursor = db.connection().connection.driver_connection.cursor()
+    with cursor, cursor.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+        for row in batch:
+            copy.write_row([row[c] for c in columns])
+
+
+def split_set_path(path: str) -> tuple[str, date, str] | None:
+    """Retrouve (restaurant, date, champ) a partir du chemin d'un CSV.
+
+    Formats acceptes : ``RESTO/2026-01-28/SyntheseCA_tva.csv``,
+    ``RESTO_2026-01-28/SyntheseCA_tva.csv`` ou
+    ``RESTO_20260128_SyntheseCA_tva.csv``.
+    """
+    parts = [p for p in path.replace("\\", "/").split("/") if p]
+    if not parts:
+        return None
+    basename = parts[-1]
+
+    field = None
+    prefix = ""
+    for name, filename in BK_FILES.items():
+        if basename.lower().endswith(filename.lower()):
+            field = name
+            prefix = basename[: -len(filename)]
+            break
+    if field is None:
+        return None
+
+    # On lit les segments du plus proche au plus lointain du fichier
+    tokens: list[str] = []
+    for component in [*parts[:-1], prefix]:
+        tokens.extend(t for t in re.split(r"[_\s]+", component) if t)
+    tokens.reverse()
+
+    report_date: date | None = None
+    restaurant_code: str | None = None
+    for token in tokens:
+        match = _DATE_TOKEN.match(token)
+        if match and report_date is None:
+            try:
+                report_date = date(int(match[1]), int(match[2]), int(match[3]))
+                continue
+            except ValueError:
+                pass
+        if restaurant_code is None and not match:
+            restaurant_code = token.strip().upper()
+        if report_date and restaurant_code:
+            break
+
+    if report_date is None or restaurant_code is None:
+        return None
+    return restaurant_code, report_date, field
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    if _parse_pool is None:
+        workers = int(os.getenv("BK_PARSE_WORKERS", "0")) or os.cpu_count() or 1
+        # spawn : un fork du process uvicorn (multi-thread) heriterait de
+        # verrous tenus par d'autres threads
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _parse_pool
+
+
+def shutdown_parse_pool() -> None:
+    """A l'arret de l'API : termine les workers de parse."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(cancel_futures=True)
+        _parse_pool = None
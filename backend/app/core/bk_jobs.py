@@ -0,0 +1,261 @@
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import BinaryIO, Iterator, Mapping
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import Session
+
+from app.core.bk_ingest import BK_FILES, ingest_bk_files
+from app.core.storage import storage_dir
+from app.db.session import SessionLocal
+from app.models.bk_upload_job import BKUploadJob
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_ERROR = "error"
+
+# Un job "running" appartient a un worker tant que son bail est rafraichi ;
+# au-dela de LEASE_SECONDS sans battement, un autre process peut le reprendre
+LEASE_SECONDS = float(os.getenv("BK_JOB_LEASE_SECONDS", "60"))
+HEARTBEAT_SECONDS = LEASE_SECONDS / 3
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+logger = logging.getLogger(__name__)
+
+_sweeper: threading.Thread | None = None
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("BK_JOB_WORKERS", "2")),
+    thread_name_prefix="bk-job",
+)
+
+
+def enqueue_upload_job(
+    db: Session,
+    restaurant_code: str,
+    report_date: date,
+    files: Mapping[str, BinaryIO],
+    content_hash: str | None = None,
+    idempotency_key: str | None = None,
+) -> BKUploadJob:
+    """Copie les CSV sous STORAGE_PATH, cree le job et le soumet aux workers."""
+    job = BKUploadJob(
+        status=JOB_PENDING,
+        progress=0,
+        restaurant_code=restaurant_code.strip().upper(),
+        report_date=report_date,
+        content_hash=content_hash,
+        idempotency_key=idempotency_key,
+        storage_dir="",
+    )
+    db.add(job)
+    db.flush()
+
+    target = storage_dir("bk_jobs", str(job.id))
+    for name, filename in BK_FILES.items():
+        with open(target / filename, "wb") as out:
+            shutil.copyfileobj(files[name], out)
+    job.storage_dir = str(target)
+    db.commit()
+
+    submit_job(job.id)
+    return job
+
+
+def submit_job(job_id: int) -> None:
+    _executor.submit(run_job, job_id)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def claim_job(db: Session, job_id: int) -> bool:
+    """Passe le job de pending a running pour ce worker ; False si deja pris."""
+    claimed = db.execute(
+        update(BKUploadJob)
+        .where(BKUploadJob.id == job_id, BKUploadJob.status == JOB_PENDING)
+        .values(status=JOB_RUNNING, progress=10, worker_id=WORKER_ID, heartbeat_at=_now())
+        .returning(BKUploadJob.id)
+    ).scalar()
+    db.commit()
+    return claimed is not None
+
+
+def _beat(job_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(BKUploadJob)
+            .where(
+                BKUploadJob.id == job_id,
+                BKUploadJob.status == JOB_RUNNING,
+                BKUploadJob.worker_id == WORKER_ID,
+            )
+            .values(heartbeat_at=_now())
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+@contextmanager
+def _heartbeat(job_id: int) -> Iterator[None]:
+    # Rafraichit le bail depuis une autre session pendant l'import
+    stop = threading.Event()
+
+    def loop() -> None:
+        while not stop.wait(HEARTBEAT_SECONDS):
+            try:
+                _beat(job_id)
+            except Exception as exc:
+                # SQLite : ecriture concurrente refusee pendant l'import, on retente
+                logger.warning("BK job %s: heartbeat failed: %s", job_id, exc)
+
+    thread = threading.Thread(target=loop, name=f"bk-job-{job_id}-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job_id: int) -> None:
+    db = SessionLocal()
+    try:
+        # Reclamation atomique : un seul worker passe un job en "running"
+        if not claim_job(db, job_id):
+            return
+
+        job = db.get(BKUploadJob, job_id)
+        try:
+            with _heartbeat(job_id):
+                report_id = _process_job(db, job)
+        except Exception as exc:
+            db.rollback()
+            job = db.get(BKUploadJob, job_id)
+            job.status = JOB_ERROR
+            job.error = str(exc) or exc.__class__.__name__
+            job.worker_id = None
+            db.commit()
+            return
+
+        # Rapport et statut du job commites ensemble
+        job.status = JOB_DONE
+        job.progress = 100
+        job.report_id = report_id
+        job.error = None
+        job.worker_id = None
+        db.commit()
+        shutil.rmtree(job.storage_dir, ignore_errors=True)
+    finally:
+        db.close()
+
+
+def _process_job(db: Session, job: BKUploadJob) -> int:
+    with ExitStack() as stack:
+        files = {
+            name: stack.enter_context(open(os.path.join(job.storage_dir, filename), "rb"))
+            for name, filename in BK_FILES.items()
+        }
+        # Meme contenu deja importe (retry du terminal) : le rapport existant est repris
+        report_id, _ = ingest_bk_files(
+            db,
+            job.restaurant_code,
+            job.report_date,
+            files,
+            content_hash=job.content_hash,
+            idempotency_key=job.idempotency_key,
+        )
+        db.flush()
+    return report_id
+
+
+def reclaim_expired_jobs(db: Session) -> list[int]:
+    """Remet en attente les jobs "running" dont le bail a expire (worker arrete)."""
+    reclaimed = db.execute(
+        update(BKUploadJob)
+        .where(
+            BKUploadJob.status == JOB_RUNNING,
+            or_(
+                BKUploadJob.heartbeat_at.is_(None),
+                BKUploadJob.heartbeat_at < _now() - timedelta(seconds=LEASE_SECONDS),
+            ),
+        )
+        .values(status=JOB_PENDING, progress=0, worker_id=None, heartbeat_at=None)
+        .returning(BKUploadJob.id)
+    ).scalars().all()
+    db.commit()
+    return list(reclaimed)
+
+
+def resume_pending_jobs(waiting_seconds: float = 0) -> int:
+    """Reprend les jobs abandonnes et soumet les jobs en attente.
+
+    Un job "running" dont le worker bat encore n'est pas touche ; un job
+    soumis par plusieurs process n'est execute qu'une fois (claim_job).
+    waiting_seconds : ne soumet que les jobs en attente depuis au moins ce delai.
+    """
+    db = SessionLocal()
+    try:
+        # Transaction de l'import non commitee : on rejoue depuis les fichiers stockes
+        reclaimed = reclaim_expired_jobs(db)
+        query = db.query(BKUploadJob.id).filter(BKUploadJob.status == JOB_PENDING)
+        if waiting_seconds:
+            query = query.filter(
+                or_(
+                    BKUploadJob.id.in_(reclaimed),
+                    BKUploadJob.updated_at < _now() - timedelta(seconds=waiting_seconds),
+                )
+            )
+        job_ids = [job_id for (job_id,) in query.order_by(BKUploadJob.id.asc()).all()]
+    finally:
+        db.close()
+
+    for job_id in job_ids:
+        submit_job(job_id)
+    return len(job_ids)
+
+
+def start_job_sweeper() -> None:
+    """Reprise periodique des jobs d'un worker arrete pendant que les autres tournent."""
+    global _sweeper
+    if _sweeper is not None:
+        return
+
+    def loop() -> None:
+        while True:
+            time.sleep(LEASE_SECONDS)
+            try:
+                # Les jobs recents sont encore dans la file de leur process
+                resume_pending_jobs(waiting_seconds=LEASE_SECONDS)
+            except Exception:
+                logger.exception("BK jobs: sweep failed")
+
+    _sweeper = threading.Thread(target=loop, name="bk-job-sweeper", daemon=True)
+    _sweeper.start()
+
+
+def serialize_job(job: BKUploadJob) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "progress": job.progress,
+        "restaurant_code": job.restaurant_code,
+        "report_date": job.report_date.isoformat(),
+        "report_id": job.report_id,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
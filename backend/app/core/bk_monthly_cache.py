@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.bk_calendar import COMPARABLE_DAYS
+
+# 0 desactive le cache
+CACHE_SIZE = int(os.getenv("BK_MONTHLY_CACHE_SIZE", "256"))
+# Filet de securite pour les ecritures faites hors de ce process (watcher, CLI)
+CACHE_TTL = float(os.getenv("BK_MONTHLY_CACHE_TTL", "300"))
+
+_DIRTY_KEY = "bk_monthly_dirty"
+
+
+class MonthlyCache:
+    """Cache LRU/TTL des reponses de /reports/bk/monthly, en memoire du process.
+
+    Cle : (annee, mois, filtre restaurant, restaurants autorises, base N-1,
+    format de reponse).
+    Une ecriture sur (restaurant, jour) invalide les entrees de ce mois et des
+    mois dont le N-1 reprend ce jour, pour les cles qui couvrent le restaurant.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(
+        year: int,
+        month: int,
+        restaurant_code: str | None,
+        allowed: list[str] | None,
+        n1_basis: str,
+        response_format: str,
+    ) -> tuple:
+        code = restaurant_code.strip().upper() if restaurant_code else None
+        allowed_key = frozenset(allowed) if allowed is not None else None
+        return (year, month, code, allowed_key, n1_basis, response_format)
+
+    def get(self, key: tuple) -> tuple[Any, int]:
+        """(payload ou None, generation a repasser a put)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], self._generation
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None, self._generation
+
+    def put(self, key: tuple, value: Any, generation: int) -> None:
+        with self._lock:
+            # Une invalidation pendant le calcul : resultat possiblement perime
+            if self.maxsize <= 0 or generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, changes: set[tuple[str, int, int]]) -> None:
+        with self._lock:
+            self._generation += 1
+            stale = [
+                key
+                for key in self._entries
+                if any(
+                    key[:2] == (year, month)
+                    and key[2] in (None, code)
+                    and (key[3] is None or code in key[3])
+                    for code, year, month in changes
+                )
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+                "invalidations": self.invalidations,
+            }
+
+
+monthly_cache = MonthlyCache(CACHE_SIZE, CACHE_TTL)
+
+
+def mark_report_changed(db: Session, restaurant_code: str, report_date: date) -> None:
+    """A appeler pour toute ecriture d'un rapport ; invalide au commit."""
+    dirty = db.info.setdefault(_DIRTY_KEY, set())
+    # Jour lui-meme, puis ses lecteurs N-1 : meme date et meme jour de semaine
+    for day in (
+        report_date,
+        date(report_date.year + 1, report_date.month, 1),
+        report_date + timedelta(days=COMPARABLE_DAYS),
+    ):
+        dirty.add((restaurant_code, day.year, day.month))
+
+
+# Les savepoints (begin_nested) declenchent aussi ces evenements : seule la
+# transaction englobante publie ou abandonne les marques. Un savepoint annule
+# garde les siennes (invalidation en trop, jamais de lecture perimee).
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    dirty = session.info.pop(_DIRTY_KEY, None)
+    if dirty:
+        monthly_cache.invalidate(dirty)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    session.info.pop(_DIRTY_KEY, None)
@@ -0,0 +1,205 @@
+import os
+import re
+from datetime import date
+from typing import Iterator
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db.session import engine
+from app.models.bk_report import BKDailySummary
+
+# Table partitionnee par mois sur report_date (PostgreSQL) ; les requetes du
+# recap filtrent toutes sur report_date et n'ouvrent que les mois concernes.
+# bk_daily_reports et ses tables filles ne sont pas (encore) partitionnees.
+PARTITIONED_TABLE = BKDailySummary.__tablename__
+DEFAULT_PARTITION = f"{PARTITIONED_TABLE}_default"
+
+# Mois crees d'avance au demarrage de l'API et par la CLI
+MONTHS_AHEAD = int(os.getenv("BK_PARTITION_MONTHS_AHEAD", "3"))
+
+_NAME_RE = re.compile(rf"^{PARTITIONED_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(day: date, months: int) -> date:
+    year, month = divmod(day.year * 12 + day.month - 1 + months, 12)
+    return date(year, month + 1, 1)
+
+
+def iter_months(start: date, end: date) -> Iterator[date]:
+    """Premiers jours des mois de [start, end]."""
+    month = month_start(start)
+    while month <= end:
+        yield month
+        month = add_months(month, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITIONED_TABLE}_p{month:%Y%m}"
+
+
+def is_partition_table(name: str) -> bool:
+    """Partition (ou archive detachee) de la table, hors metadata des modeles."""
+    return name == DEFAULT_PARTITION or _NAME_RE.match(name) is not None
+
+
+def is_partitioned(conn: Connection) -> bool:
+    # Faux sur SQLite et sur une base PostgreSQL pas encore migree
+    if conn.dialect.name != "postgresql":
+        return False
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:name)"),
+        {"name": PARTITIONED_TABLE},
+    ).scalar()
+    return relkind == "p"
+
+
+def monthly_partitions(conn: Connection) -> dict[date, str]:
+    """Partitions mensuelles attachees : premier jour du mois -> nom."""
+    names = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:name)"
+        ),
+        {"name": PARTITIONED_TABLE},
+    ).scalars()
+    partitions = {}
+    for name in names:
+        match = _NAME_RE.match(name)
+        if match:
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+def archived_partitions(conn: Connection) -> dict[date, str]:
+    """Partitions mensuelles detachees (archives) : premier jour du mois -> nom."""
+    names = conn.execute(
+        text(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND NOT relispartition "
+            "AND relnamespace = to_regnamespace(current_schema())"
+        )
+    ).scalars()
+    archived = {}
+    for name in names:
+        match = _NAME_RE.match(name)
+        if match:
+            archived[date(int(match[1]), int(match[2]), 1)] = name
+    return archived
+
+
+def _create_partition(conn: Connection, month: date) -> str:
+    name = partition_name(month)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    # Les lignes du mois deja tombees dans la partition par defaut y sont
+    # deplacees avant l'ATTACH (qui refuserait sinon de creer le mois)
+    conn.execute(
+        text(
+            f"CREATE TABLE {name} "
+            f"(LIKE {PARTITIONED_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE report_date >= :start AND report_date < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds,
+    )
+    conn.execute(
+        text(
+            f"ALTER TABLE {PARTITIONED_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+        )
+    )
+    return name
+
+
+def ensure_partitions(conn: Connection, start: date, end: date) -> list[str]:
+    """Cree les partitions manquantes des mois de [start, end] ; noms crees.
+
+    Sans effet si la table n'est pas partitionnee (SQLite, base non migree).
+    Les mois detaches ne sont pas recrees : leur table d'archive garde le nom.
+    """
+    if not is_partitioned(conn):
+        return []
+    # Plusieurs workers demarrent ensemble : un seul cree les mois manquants
+    conn.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:name))"), {"name": PARTITIONED_TABLE}
+    )
+    existing = monthly_partitions(conn) | archived_partitions(conn)
+    return [
+        _create_partition(conn, month)
+        for month in iter_months(start, end)
+        if month not in existing
+    ]
+
+
+def ensure_future_partitions(
+    conn: Connection, months_ahead: int = MONTHS_AHEAD, today: date | None = None
+) -> list[str]:
+    """Mois courant et months_ahead mois suivants."""
+    current = month_start(today or date.today())
+    return ensure_partitions(conn, current, add_months(current, months_ahead))
+
+
+def detach_partitions(conn: Connection, before: date) -> list[str]:
+    """Detache les partitions des mois entierement anterieurs a before.
+
+    Seuls bk_daily_summaries est partitionnee : detacher un mois dont les
+    rapports sont encore en base retirerait leurs syntheses du recap, du
+    rollup, de la consolidation et des N-1 sans rien signaler. ValueError si
+    un des mois a encore des rapports ; rien n'est alors detache.
+
+    Les tables detachees restent en base (archive, pg_dump, DROP), sans cle
+    etrangere vers bk_daily_reports. Un rapport reimporte sur un mois detache
+    retombe dans la partition par defaut.
+    """
+    if not is_partitioned(conn):
+        return []
+    months = {
+        month: name
+        for month, name in monthly_partitions(conn).items()
+        if add_months(month, 1) <= before
+    }
+    with_reports = [
+        month
+        for month in sorted(months)
+        if conn.execute(
+            text(
+                "SELECT 1 FROM bk_daily_reports "
+                "WHERE report_date >= :start AND report_date < :end LIMIT 1"
+            ),
+            {"start": month, "end": add_months(month, 1)},
+        ).first()
+    ]
+    if with_reports:
+        raise ValueError(
+            "Months still have reports: " + ", ".join(f"{m:%Y-%m}" for m in with_reports)
+        )
+
+    detached = []
+    for month, name in sorted(months.items()):
+        conn.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name}"))
+        # La FK heritee du parent reste sur la table detachee
+        foreign_keys = conn.execute(
+            text(
+                "SELECT conname FROM pg_constraint "
+                "WHERE conrelid = to_regclass(:name) AND contype = 'f'"
+            ),
+            {"name": name},
+        ).scalars().all()
+        for constraint in foreign_keys:
+            conn.execute(text(f'ALTER TABLE {name} DROP CONSTRAINT "{constraint}"'))
+        detached.append(name)
+    return detached
+
+
+def ensure_upcoming_partitions() -> list[str]:
+    """Au demarrage de l'API : mois courant et MONTHS_AHEAD mois suivants."""
+    with engine.begin() as conn:
+        return ensure_future_partitions(conn)
@@ -0,0 +1,119 @@
+import calendar
+from datetime import date
+from typing import Any
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.core.bk_calendar import N1_CALENDAR
+from app.core.bk_summary import RECAP_FIELDS, recap_query
+from app.models.bk_calendar import BKCalendarDay
+
+GROUP_BY_RESTAURANT = "restaurant"
+GROUP_BY_NETWORK = "network"
+
+# Champs additionnes ; SUM ignore les NULL et reste NULL si aucun jour n'est renseigne
+ROLLUP_FIELDS = ("ca_net_total", "ca_ttc_total", "tac_total", *RECAP_FIELDS)
+
+
+def _sums(columns: Any, when: Any = None) -> list[Any]:
+    return [
+        func.sum(columns[field] if when is None else case((when, columns[field]))).label(field)
+        for field in ROLLUP_FIELDS
+    ]
+
+
+def _totals(row: Any, keys: list[str]) -> dict[str, Any]:
+    return {
+        "restaurant_code": row.restaurant_code if "restaurant_code" in keys else None,
+        **{field: getattr(row, field) for field in ("days", *ROLLUP_FIELDS)},
+    }
+
+
+def rollup_recap(
+    db: Session,
+    year: int,
+    month: int,
+    group_by: str = GROUP_BY_RESTAURANT,
+    restaurant_code: str | None = None,
+    allowed_restaurants: list[str] | None = None,
+    n1_basis: str = N1_CALENDAR,
+) -> dict[str, Any]:
+    """Totaux semaine ISO, mois et cumul annuel du recap, calcules en SQL.
+
+    Les semaines sont limitees aux jours du mois, comme dans BkMonthlyRecap.
+    Les champs N-1 sont ceux du recap journalier (saisie ou jour N-1 selon
+    n1_basis) ; les semaines ISO viennent de bk_calendar_days.
+    """
+    month_start = date(year, month, 1)
+    month_end = date(year, month, calendar.monthrange(year, month)[1])
+    ytd_start = date(year, 1, 1)
+
+    days = recap_query(
+        db, ytd_start, month_end, restaurant_code, allowed_restaurants, n1_basis
+    ).subquery()
+    c = days.c
+    in_month = c.report_date >= month_start
+    keys = [c.restaurant_code] if group_by == GROUP_BY_RESTAURANT else []
+    key_names = [key.name for key in keys]
+
+    cal = BKCalendarDay
+    week = (cal.week_start, cal.iso_year, cal.iso_week)
+    week_rows = (
+        db.query(*keys, *week, func.count().label("days"), *_sums(c))
+        .join(cal, cal.day == c.report_date)
+        .filter(in_month)
+        .group_by(*keys, *week)
+        .order_by(*keys, cal.week_start)
+        .all()
+    )
+
+    # Mois et cumul annuel en une seule passe (agregats conditionnels)
+    period_rows = (
+        db.query(
+            *keys,
+            func.count(case((in_month, 1))).label("days"),
+            *_sums(c, in_month),
+            func.count().label("ytd_days"),
+            *[func.sum(c[field]).label(f"ytd_{field}") for field in ROLLUP_FIELDS],
+        )
+        .group_by(*keys)
+        .order_by(*keys)
+        .all()
+    )
+
+    weeks = []
+    for row in week_rows:
+        weeks.append(
+            {
+                "week_start": row.week_start.isoformat(),
+                "iso_year": row.iso_year,
+                "iso_week": row.iso_week,
+                **_totals(row, key_names),
+            }
+        )
+
+    months = []
+    ytd = []
+    for row in period_rows:
+        if row.days:
+            months.append(_totals(row, key_names))
+        ytd.append(
+            {
+                "restaurant_code": row.restaurant_code if key_names else None,
+                "days": row.ytd_days,
+                **{field: getattr(row, f"ytd_{field}") for field in ROLLUP_FIELDS},
+            }
+        )
+
+    return {
+        "year": year,
+        "month": month,
+        "group_by": group_by,
+        "n1_basis": n1_basis,
+        "ytd_start": ytd_start.isoformat(),
+        "ytd_end": month_end.isoformat(),
+        "weeks": weeks,
+        "month_totals": months,
+        "ytd": ytd,
+    }
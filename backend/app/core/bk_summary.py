@@ -0,0 +1,232 @@
+from datetime import date, timedelta
+from typing import Any, Iterable, Mapping
+
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.orm import Query, Session, aliased
+
+from app.core.bk_aggregate import GROUP_COLUMNS, ChannelAggregate
+from app.core.bk_calendar import COMPARABLE_DAYS, N1_CALENDAR, N1_WEEKDAY
+from app.core.bk_monthly_cache import mark_report_changed
+from app.models.bk_calendar import BKCalendarDay
+from app.models.bk_report import BKChannelSales, BKDailyKpi, BKDailyReport, BKDailySummary
+
+CHANNEL_COLUMNS = (
+    "ca_net_total",
+    "ca_ttc_total",
+    "tac_total",
+    *[f"{name}_{suffix}" for name in GROUP_COLUMNS.values() for suffix in ("ca_net", "tac")],
+)
+
+# KPI calcule -> total des canaux utilise quand il n'est pas renseigne
+KPI_FALLBACKS = {
+    "ca_real": "ca_net_total",
+    "clients": "tac_total",
+    "ca_delivery": "delivery_ca_net",
+    "client_delivery": "delivery_tac",
+    "ca_click_collect": "click_collect_ca_net",
+    "client_click_collect": "click_collect_tac",
+}
+
+# Champ N-1 -> champ du meme jour l'an dernier, si la saisie manuelle manque
+N1_FALLBACKS = {
+    "n1_ht": "ca_real",
+    "clients_n1": "clients",
+    "ca_delivery_n1": "ca_delivery",
+    "client_delivery_n1": "client_delivery",
+    "cnc_n1": "ca_click_collect",
+    "client_n1": "client_click_collect",
+}
+
+# Champs "kpi" du recap, dans l'ordre des reponses
+RECAP_FIELDS = (
+    "n1_ht",
+    "var_n1",
+    "prev_ht",
+    "ca_real",
+    "clients",
+    "clients_n1",
+    "ca_delivery",
+    "ca_delivery_n1",
+    "client_delivery",
+    "client_delivery_n1",
+    "ca_click_collect",
+    "cnc_n1",
+    "client_click_collect",
+    "client_n1",
+    "cash_diff",
+)
+
+# Saisie manuelle, recopiee telle quelle
+KPI_MANUAL_FIELDS = (
+    "n1_ht",
+    "var_n1",
+    "prev_ht",
+    "clients_n1",
+    "ca_delivery_n1",
+    "client_delivery_n1",
+    "cnc_n1",
+    "client_n1",
+    "cash_diff",
+)
+
+
+def _kpi_value(kpi: Any, field: str) -> Any:
+    if kpi is None:
+        return None
+    if isinstance(kpi, Mapping):
+        return kpi.get(field)
+    return getattr(kpi, field)
+
+
+def summary_values(totals: Mapping[str, Any], kpi: Any) -> dict[str, Any]:
+    """Ligne de synthese a partir des totaux canaux et du KPI (dict ou BKDailyKpi)."""
+    values = {name: totals[name] for name in CHANNEL_COLUMNS}
+    for field, fallback in KPI_FALLBACKS.items():
+        value = _kpi_value(kpi, field)
+        values[field] = value if value is not None else totals[fallback]
+    for field in KPI_MANUAL_FIELDS:
+        values[field] = _kpi_value(kpi, field)
+    return values
+
+
+def write_daily_summary(
+    db: Session, report: BKDailyReport, totals: Mapping[str, Any], kpi: Any
+) -> None:
+    """Remplace la synthese du rapport, dans la transaction de l'appelant."""
+    mark_report_changed(db, report.restaurant_code, report.report_date)
+    db.execute(
+        delete(BKDailySummary).where(
+            BKDailySummary.report_id == report.id,
+            # Limite le DELETE a la partition du mois
+            BKDailySummary.report_date == report.report_date,
+        )
+    )
+    db.execute(
+        insert(BKDailySummary).values(
+            report_id=report.id,
+            restaurant_code=report.restaurant_code,
+            report_date=report.report_date,
+            **summary_values(totals, kpi),
+        )
+    )
+
+
+def stored_totals(db: Session, report: BKDailyReport) -> dict[str, Any]:
+    # Totaux canaux deja en synthese ; sinon recalcules depuis les lignes
+    row = (
+        db.query(*[getattr(BKDailySummary, name) for name in CHANNEL_COLUMNS])
+        .filter(BKDailySummary.report_id == report.id)
+        .first()
+    )
+    if row is not None:
+        return dict(row._mapping)
+    return ChannelAggregate.from_channel_sales(report.channel_sales).summary()
+
+
+def recap_query(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    restaurant_code: str | None = None,
+    allowed_restaurants: list[str] | None = None,
+    n1_basis: str = N1_CALENDAR,
+) -> Query:
+    """Une ligne par rapport de [start_date, end_date], champs du recap nommes.
+
+    Les champs N-1 non saisis reprennent le jour correspondant de l'an dernier
+    lu dans bk_calendar_days : meme jour de semaine (364 jours) ou meme date.
+    """
+    cur = BKDailySummary
+    prev = aliased(BKDailySummary)
+    cal = BKCalendarDay
+    n1_date = cal.comparable_n1_date if n1_basis == N1_WEEKDAY else cal.n1_date
+
+    columns = [
+        cur.report_id,
+        cur.restaurant_code,
+        cur.report_date,
+        n1_date.label("n1_date"),
+        cal.holiday_name.label("holiday"),
+        *[getattr(cur, name) for name in CHANNEL_COLUMNS],
+    ]
+    for field in RECAP_FIELDS:
+        column = getattr(cur, field)
+        if field in N1_FALLBACKS:
+            column = func.coalesce(column, getattr(prev, N1_FALLBACKS[field]))
+        columns.append(column.label(field))
+
+    query = (
+        db.query(*columns)
+        .outerjoin(cal, cal.day == cur.report_date)
+        .outerjoin(
+            prev,
+            and_(
+                prev.restaurant_code == cur.restaurant_code,
+                prev.report_date == n1_date,
+                # Bornes redondantes (N-1 = 364 a 366 jours avant) : parcours d'index borne
+                prev.report_date >= start_date - timedelta(days=366),
+                prev.report_date <= end_date - timedelta(days=COMPARABLE_DAYS),
+            ),
+        )
+        .filter(cur.report_date >= start_date, cur.report_date <= end_date)
+    )
+    if restaurant_code:
+        query = query.filter(cur.restaurant_code == restaurant_code.strip().upper())
+    if allowed_restaurants is not None:
+        query = query.filter(cur.restaurant_code.in_(allowed_restaurants))
+    return query
+
+
+def _channel_sum(column: Any, prefix: str | None = None) -> Any:
+    if prefix is not None:
+        column = case((func.upper(BKChannelSales.channel_label).like(f"{prefix}%"), column))
+    return func.coalesce(func.sum(column), 0)
+
+
+def rebuild_daily_summaries(db: Session, report_ids: Iterable[int]) -> int:
+    """Recalcule les syntheses d'un lot de rapports en un INSERT ... SELECT.
+
+    Les totaux par groupe sont des agregats conditionnels sur bk_channel_sales
+    (prefixe du libelle, comme channel_group) ; rien ne remonte en Python.
+    """
+    report_ids = list(report_ids)
+    if not report_ids:
+        return 0
+
+    totals = {
+        "ca_net_total": _channel_sum(BKChannelSales.ca_net),
+        "ca_ttc_total": _channel_sum(BKChannelSales.ca_ttc),
+        "tac_total": _channel_sum(BKChannelSales.tac),
+    }
+    for prefix, name in GROUP_COLUMNS.items():
+        totals[f"{name}_ca_net"] = _channel_sum(BKChannelSales.ca_net, prefix)
+        totals[f"{name}_tac"] = _channel_sum(BKChannelSales.tac, prefix)
+
+    columns = {
+        "report_id": BKDailyReport.id,
+        "restaurant_code": BKDailyReport.restaurant_code,
+        "report_date": BKDailyReport.report_date,
+        **totals,
+        **{
+            field: func.coalesce(getattr(BKDailyKpi, field), totals[fallback])
+            for field, fallback in KPI_FALLBACKS.items()
+        },
+        **{field: getattr(BKDailyKpi, field) for field in KPI_MANUAL_FIELDS},
+    }
+    source = (
+        select(*columns.values())
+        .select_from(BKDailyReport)
+        .outerjoin(
+            BKChannelSales,
+            and_(
+                BKChannelSales.report_id == BKDailyReport.id,
+                BKChannelSales.is_total.is_(False),
+            ),
+        )
+        .outerjoin(BKDailyKpi, BKDailyKpi.report_id == BKDailyReport.id)
+        .where(BKDailyReport.id.in_(report_ids))
+        .group_by(BKDailyReport.id, BKDailyKpi.id)
+    )
+
+    db.execute(delete(BKDailySummary).where(BKDailySummary.report_id.in_(report_ids)))
+    return db.execute(insert(BKDailySummary).from_select(list(columns), source)).rowcount
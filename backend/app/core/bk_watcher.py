@@ -0,0 +1,238 @@
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import ExitStack
+from datetime import date, datetime
+from pathlib import Path
+from uuid import uuid4
+
+from app.core.bk_ingest import BK_FILES, BKReportConflict, ingest_bk_files, split_set_path
+from app.core.storage import STORAGE_PATH
+from app.db.session import SessionLocal, dispose_inherited_pool
+
+logger = logging.getLogger(__name__)
+
+# Arborescence sous STORAGE_PATH/bk_watch :
+#   inbox/       depot des exports caisse (a plat ou en sous-dossiers)
+#   processing/  jeux reclames, un dossier par jeu (+ set.json)
+#   processed/   jeux importes ou deja presents
+#   failed/      jeux rejetes, avec error.txt
+#   ledger.jsonl une ligne par jeu traite
+WATCH_ROOT = Path(os.getenv("BK_WATCH_DIR", str(STORAGE_PATH / "bk_watch")))
+
+STATUS_CREATED = "created"
+STATUS_DUPLICATE = "duplicate"
+STATUS_ERROR = "error"
+
+_CLAIM_SUFFIX = ".claim"
+_SET_FILE = "set.json"
+
+
+class WatchDirs:
+    def __init__(self, root: Path = WATCH_ROOT) -> None:
+        self.root = root
+        self.inbox = root / "inbox"
+        self.processing = root / "processing"
+        self.processed = root / "processed"
+        self.failed = root / "failed"
+        self.ledger = root / "ledger.jsonl"
+
+    def ensure(self) -> None:
+        for path in (self.inbox, self.processing, self.processed, self.failed):
+            path.mkdir(parents=True, exist_ok=True)
+
+
+def scan_ready_sets(
+    inbox: Path, settle_seconds: float
+) -> dict[tuple[str, date], dict[str, Path]]:
+    """Jeux complets (8 fichiers) dont aucun fichier n'est encore en cours d'ecriture."""
+    now = time.time()
+    sets: dict[tuple[str, date], dict[str, Path]] = {}
+    fresh: set[tuple[str, date]] = set()
+    for path in inbox.rglob("*"):
+        if not path.is_file():
+            continue
+        key = split_set_path(path.relative_to(inbox).as_posix())
+        if key is None:
+            continue
+        code, report_date, field = key
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        if now - mtime < settle_seconds:
+            fresh.add((code, report_date))
+        sets.setdefault((code, report_date), {})[field] = path
+    return {
+        key: paths
+        for key, paths in sets.items()
+        if key not in fresh and len(paths) == len(BK_FILES)
+    }
+
+
+def claim_set(
+    dirs: WatchDirs, restaurant_code: str, report_date: date, paths: dict[str, Path]
+) -> Path:
+    """Deplace le jeu dans processing/ ; le renommage final du dossier vaut reclamation."""
+    name = f"{restaurant_code}_{report_date.isoformat()}_{uuid4().hex[:8]}"
+    staging = dirs.processing / f"{name}{_CLAIM_SUFFIX}"
+    staging.mkdir()
+    (staging / _SET_FILE).write_text(
+        json.dumps({"restaurant_code": restaurant_code, "report_date": report_date.isoformat()})
+    )
+    for field, path in paths.items():
+        os.replace(path, staging / BK_FILES[field])
+    target = dirs.processing / name
+    os.replace(staging, target)
+    _prune_empty_dirs(dirs.inbox, {p.parent for p in paths.values()})
+    return target
+
+
+def recover(dirs: WatchDirs) -> list[Path]:
+    """Remet en etat apres un arret brutal ; retourne les jeux reclames a reprendre.
+
+    Une reclamation interrompue (.claim) est rendue a inbox/ pour etre regroupee
+    au prochain scan. Un jeu deja reclame est rejoue : l'empreinte du contenu
+    rend l'import idempotent si le commit avait eu lieu.
+    """
+    claimed = []
+    for path in sorted(dirs.processing.iterdir()):
+        if not path.is_dir():
+            continue
+        if path.name.endswith(_CLAIM_SUFFIX):
+            try:
+                meta = json.loads((path / _SET_FILE).read_text())
+                back = dirs.inbox / meta["restaurant_code"] / meta["report_date"]
+            except (OSError, ValueError, KeyError):
+                back = dirs.inbox / "recovered" / path.name
+            back.mkdir(parents=True, exist_ok=True)
+            for item in path.iterdir():
+                if item.name != _SET_FILE:
+                    os.replace(item, back / item.name)
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            claimed.append(path)
+    return claimed
+
+
+def process_claimed_set(set_dir: str) -> dict:
+    """Importe un jeu reclame ; execute dans un process du pool."""
+    meta = json.loads((Path(set_dir) / _SET_FILE).read_text())
+    restaurant_code = meta["restaurant_code"]
+    report_date = date.fromisoformat(meta["report_date"])
+    result = {"restaurant_code": restaurant_code, "report_date": meta["report_date"]}
+
+    db = SessionLocal()
+    try:
+        with ExitStack() as stack:
+            files = {
+                name: stack.enter_context(open(Path(set_dir) / filename, "rb"))
+                for name, filename in BK_FILES.items()
+            }
+            report_id, created = ingest_bk_files(db, restaurant_code, report_date, files)
+        db.commit()
+        result.update(
+            status=STATUS_CREATED if created else STATUS_DUPLICATE,
+            report_id=report_id,
+        )
+    except (BKReportConflict, ValueError) as exc:
+        db.rollback()
+        result.update(status=STATUS_ERROR, detail=str(exc))
+    except Exception as exc:
+        db.rollback()
+        logger.exception("BK set %s failed", set_dir)
+        result.update(status=STATUS_ERROR, detail=str(exc) or exc.__class__.__name__)
+    finally:
+        db.close()
+    return result
+
+
+def finalize_set(dirs: WatchDirs, set_dir: Path, result: dict) -> Path:
+    if result["status"] == STATUS_ERROR:
+        target = dirs.failed / set_dir.name
+        (set_dir / "error.txt").write_text(result.get("detail") or "")
+    else:
+        target = dirs.processed / result["report_date"][:7] / set_dir.name
+        target.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(set_dir, target)
+
+    entry = {"at": datetime.now().isoformat(timespec="seconds"), "set": set_dir.name, **result}
+    with open(dirs.ledger, "a", encoding="utf-8") as ledger:
+        ledger.write(json.dumps(entry) + "\n")
+    return target
+
+
+def _prune_empty_dirs(inbox: Path, parents: set[Path]) -> None:
+    for parent in sorted(parents, key=lambda p: len(p.parts), reverse=True):
+        while parent != inbox and inbox in parent.parents:
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+            parent = parent.parent
+
+
+def run_watcher(
+    dirs: WatchDirs | None = None,
+    workers: int = 2,
+    interval: float = 5.0,
+    settle_seconds: float = 10.0,
+    once: bool = False,
+) -> dict[str, int]:
+    """Boucle de surveillance du depot ; ``once`` s'arrete quand il n'y a plus rien a faire."""
+    dirs = dirs or WatchDirs()
+    dirs.ensure()
+    counts = {STATUS_CREATED: 0, STATUS_DUPLICATE: 0, STATUS_ERROR: 0}
+    backlog = recover(dirs)
+    if backlog:
+        logger.info("Resuming %d claimed BK sets", len(backlog))
+
+    # Au plus 2 jeux par worker reclames a la fois : le reste attend dans inbox/
+    capacity = workers * 2
+    inflight: dict[Future, Path] = {}
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=dispose_inherited_pool
+    ) as pool:
+        while True:
+            if len(inflight) + len(backlog) < capacity:
+                ready = scan_ready_sets(dirs.inbox, settle_seconds)
+                for (code, report_date), paths in sorted(ready.items()):
+                    if len(inflight) + len(backlog) >= capacity:
+                        break
+                    try:
+                        backlog.append(claim_set(dirs, code, report_date, paths))
+                    except OSError as exc:
+                        logger.warning("Could not claim %s %s: %s", code, report_date, exc)
+
+            while backlog and len(inflight) < capacity:
+                set_dir = backlog.pop(0)
+                inflight[pool.submit(process_claimed_set, str(set_dir))] = set_dir
+
+            if not inflight:
+                if once:
+                    break
+                time.sleep(interval)
+                continue
+
+            done, _ = wait(inflight, timeout=interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                set_dir = inflight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    result = {"status": STATUS_ERROR, "detail": str(exc) or exc.__class__.__name__}
+                    result.update(json.loads((set_dir / _SET_FILE).read_text()))
+                finalize_set(dirs, set_dir, result)
+                counts[result["status"]] += 1
+                logger.info(
+                    "BK %s %s: %s%s",
+                    result["restaurant_code"],
+                    result["report_date"],
+                    result["status"],
+                    f" ({result['detail']})" if result.get("detail") else "",
+                )
+    return counts
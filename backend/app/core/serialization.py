@@ -0,0 +1,36 @@
+import os
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+# Decimal en nombre ("float", comme jsonable_encoder) ou en chaine exacte ("str").
+# Ne s'applique qu'aux corps encodes par dumps : endpoints de lecture BK
+# (liste, detail, details, rollup, monthly, consolidation). Les autres routes
+# passent par jsonable_encoder, qui rend toujours un nombre.
+DECIMAL_MODE = os.getenv("API_JSON_DECIMAL", "float")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return format(value, "f") if DECIMAL_MODE == "str" else float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """JSON via orjson : date, datetime et Decimal sans passe jsonable_encoder."""
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(JSONResponse):
+    """Reponse par defaut de l'API (main.py).
+
+    Les endpoints charges la renvoient directement avec des valeurs brutes ;
+    sinon FastAPI passe encore le retour par jsonable_encoder avant render
+    (Decimal deja converti, DECIMAL_MODE sans effet). Une route qui expose des
+    Decimal doit donc renvoyer FastJSONResponse elle-meme.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
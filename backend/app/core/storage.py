@@ -0,0 +1,10 @@
+import os
+from pathlib import Path
+
+STORAGE_PATH = Path(os.getenv("STORAGE_PATH", "storage"))
+
+
+def storage_dir(*parts: str) -> Path:
+    path = STORAGE_PATH.joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -17,3 +17,8 @@ SessionLocal = sessionmaker(
     autoflush=False,
     bind=engine,
 )
+
+
+def dispose_inherited_pool() -> None:
+    # Process enfant (fork) : ne pas reutiliser les connexions du parent
+    engine.dispose(close=False)
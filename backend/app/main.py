@@ -1,7 +1,13 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 from app.core.seed import seed_dev_user_if_needed
+from app.core.bk_ingest import shutdown_parse_pool
+from app.core.bk_jobs import resume_pending_jobs, start_job_sweeper
+from app.core.bk_partitions import ensure_upcoming_partitions
+from app.core.serialization import FastJSONResponse
 from app.db.session import engine
 from app.api.auth import router as auth_router
 from app.api.admin import router as admin_router
@@ -13,7 +19,23 @@ import os
 
 import app.models
 
-app = FastAPI(title="Projet Restau API", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    seed_dev_user_if_needed()
+    ensure_upcoming_partitions()
+    resume_pending_jobs()
+    start_job_sweeper()
+    yield
+    shutdown_parse_pool()
+
+
+app = FastAPI(
+    title="Projet Restau API",
+    version="0.1.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
+)
 
 app.include_router(auth_router)
 app.include_router(admin_router)
@@ -52,7 +74,3 @@ def tables():
             ORDER BY tablename;
         """)).fetchall()
         return {"tables": [r[0] for r in rows]}
-    
-@app.on_event("startup")
-def on_startup():
-    seed_dev_user_if_needed()
@@ -12,7 +12,11 @@ from app.models.bk_report import (
     BKTvaSummary,
     BKAnnexSale,
     BKDailyKpi,
+    BKReportFile,
+    BKDailySummary,
 )
+from app.models.bk_calendar import BKCalendarDay
+from app.models.bk_upload_job import BKUploadJob
 
 __all__ = [
     "User",
@@ -28,4 +32,8 @@ __all__ = [
     "BKTvaSummary",
     "BKAnnexSale",
     "BKDailyKpi",
+    "BKReportFile",
+    "BKDailySummary",
+    "BKCalendarDay",
+    "BKUploadJob",
 ]
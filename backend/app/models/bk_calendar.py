@@ -0,0 +1,26 @@
+from datetime import date
+
+from sqlalchemy import Boolean, Date, SmallInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class BKCalendarDay(Base):
+    """Dimension calendrier : correspondances N-1, semaine ISO et jours feries.
+
+    n1_date est le meme jour calendaire l'an dernier (29/02 -> 28/02) ;
+    comparable_n1_date est le meme jour de semaine, 364 jours plus tot.
+    """
+
+    __tablename__ = "bk_calendar_days"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    n1_date: Mapped[date] = mapped_column(Date, nullable=False)
+    comparable_n1_date: Mapped[date] = mapped_column(Date, nullable=False)
+    iso_year: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    iso_week: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    iso_weekday: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    week_start: Mapped[date] = mapped_column(Date, nullable=False)
+    is_holiday: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    holiday_name: Mapped[str | None] = mapped_column(String(50), nullable=True)
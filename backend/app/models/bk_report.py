@@ -1,5 +1,18 @@
 from datetime import date, datetime
-from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Integer, Numeric, String, func
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    UniqueConstraint,
+    event,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -7,11 +20,31 @@ from app.db.base import Base
 
 class BKDailyReport(Base):
     __tablename__ = "bk_daily_reports"
+    __table_args__ = (
+        # Un rapport par restaurant et par jour ; cible de ON CONFLICT a l'import
+        Index(
+            "uq_bk_daily_reports_restaurant_date",
+            "restaurant_code",
+            "report_date",
+            unique=True,
+            postgresql_include=["id", "content_hash"],
+        ),
+        Index("ix_bk_daily_reports_consistency", "is_consistent", "report_date"),
+        UniqueConstraint("idempotency_key", name="uq_bk_daily_reports_idempotency_key"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     client_code: Mapped[str] = mapped_column(String(10), nullable=False, default="BK")
-    restaurant_code: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
-    report_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    restaurant_code: Mapped[str] = mapped_column(String(50), nullable=False)
+    report_date: Mapped[date] = mapped_column(Date, nullable=False)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    idempotency_key: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    # Rapprochements entre fichiers (cf. core/bk_consistency) ; NULL = non calcule
+    tva_ttc_delta: Mapped[float | None] = mapped_column(Numeric(14, 6), nullable=True)
+    payment_ttc_delta: Mapped[float | None] = mapped_column(Numeric(14, 6), nullable=True)
+    # Ecart caparprofit / reference, informatif (hors is_consistent)
+    channel_ttc_delta: Mapped[float | None] = mapped_column(Numeric(14, 6), nullable=True)
+    is_consistent: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
     )
@@ -43,6 +76,22 @@ class BKDailyReport(Base):
     kpi: Mapped["BKDailyKpi"] = relationship(
         back_populates="report", cascade="all, delete-orphan", uselist=False
     )
+    files: Mapped[list["BKReportFile"]] = relationship(
+        back_populates="report", cascade="all, delete-orphan"
+    )
+    summary: Mapped["BKDailySummary"] = relationship(
+        back_populates="report", cascade="all, delete-orphan", uselist=False
+    )
+
+
+# Ordre de GET /reports/bk (pagination par cle), couvrant les colonnes de la liste
+Index(
+    "ix_bk_daily_reports_list_order",
+    BKDailyReport.report_date.desc(),
+    BKDailyReport.restaurant_code,
+    BKDailyReport.id,
+    postgresql_include=["created_at", "is_consistent"],
+)
 
 
 class BKChannelSales(Base):
@@ -186,3 +235,95 @@ class BKDailyKpi(Base):
     cash_diff: Mapped[float] = mapped_column(Numeric(14, 6), nullable=True)
 
     report: Mapped[BKDailyReport] = relationship(back_populates="kpi")
+
+
+class BKReportFile(Base):
+    """CSV brut archive (gzip, adresse par son sha256) a l'origine d'un rapport."""
+
+    __tablename__ = "bk_report_files"
+    __table_args__ = (UniqueConstraint("report_id", "section", name="uq_bk_report_files_section"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    report_id: Mapped[int] = mapped_column(ForeignKey("bk_daily_reports.id"), index=True)
+    section: Mapped[str] = mapped_column(String(40), nullable=False)
+    sha256: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    report: Mapped[BKDailyReport] = relationship(back_populates="files")
+
+
+class BKDailySummary(Base):
+    """Totaux par groupe de canaux et KPI d'un rapport, tenus a jour a l'ecriture.
+
+    Les KPI calcules (ca_real, clients, livraison, click & collect) sont
+    stockes apres repli sur les totaux des canaux, comme dans le recap mensuel.
+    Sur PostgreSQL la table est partitionnee par mois (cf. core/bk_partitions).
+    """
+
+    __tablename__ = "bk_daily_summaries"
+    __table_args__ = (
+        Index("ix_bk_daily_summaries_date_restaurant", "report_date", "restaurant_code"),
+        # Lecture N-1 du recap (restaurant, jour) sans acces a la table
+        Index(
+            "ix_bk_daily_summaries_n1_lookup",
+            "restaurant_code",
+            "report_date",
+            postgresql_include=[
+                "ca_real",
+                "clients",
+                "ca_delivery",
+                "client_delivery",
+                "ca_click_collect",
+                "client_click_collect",
+            ],
+        ),
+        {"postgresql_partition_by": "RANGE (report_date)"},
+    )
+
+    # La cle de partition fait partie de la cle primaire ; un rapport = une ligne
+    report_id: Mapped[int] = mapped_column(ForeignKey("bk_daily_reports.id"), primary_key=True)
+    restaurant_code: Mapped[str] = mapped_column(String(50), nullable=False)
+    report_date: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    ca_net_total: Mapped[float] = mapped_column(Numeric(14, 6), nullable=False, default=0)
+    ca_ttc_total: Mapped[float] = mapped_column(Numeric(14, 6), nullable=False, default=0)
+    tac_total: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    click_collect_ca_net: Mapped[float] = mapped_column(Numeric(14, 6), nullable=False, default=0)
+    click_collect_tac: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    comptoir_ca_net: Mapped[float] = mapped_column(Numeric(14, 6), nullable=False, default=0)
+    comptoir_tac: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    drive_ca_net: Mapped[float] = mapped_column(Numeric(14, 6), nullable=False, default=0)
+    drive_tac: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    delivery_ca_net: Mapped[float] = mapped_column(Numeric(14, 6), nullable=False, default=0)
+    delivery_tac: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    kiosk_ca_net: Mapped[float] = mapped_column(Numeric(14, 6), nullable=False, default=0)
+    kiosk_tac: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    ca_real: Mapped[float] = mapped_column(Numeric(14, 6), nullable=True)
+    clients: Mapped[int] = mapped_column(Integer, nullable=True)
+    ca_delivery: Mapped[float] = mapped_column(Numeric(14, 6), nullable=True)
+    client_delivery: Mapped[int] = mapped_column(Integer, nullable=True)
+    ca_click_collect: Mapped[float] = mapped_column(Numeric(14, 6), nullable=True)
+    client_click_collect: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    n1_ht: Mapped[float] = mapped_column(Numeric(14, 6), nullable=True)
+    var_n1: Mapped[float] = mapped_column(Numeric(14, 6), nullable=True)
+    prev_ht: Mapped[float] = mapped_column(Numeric(14, 6), nullable=True)
+    clients_n1: Mapped[int] = mapped_column(Integer, nullable=True)
+    ca_delivery_n1: Mapped[float] = mapped_column(Numeric(14, 6), nullable=True)
+    client_delivery_n1: Mapped[int] = mapped_column(Integer, nullable=True)
+    cnc_n1: Mapped[float] = mapped_column(Numeric(14, 6), nullable=True)
+    client_n1: Mapped[int] = mapped_column(Integer, nullable=True)
+    cash_diff: Mapped[float] = mapped_column(Numeric(14, 6), nullable=True)
+
+    report: Mapped[BKDailyReport] = relationship(back_populates="summary")
+
+
+# create_all : partition par defaut, les mois sont crees par core/bk_partitions
+event.listen(
+    BKDailySummary.__table__,
+    "after_create",
+    DDL(
+        "CREATE TABLE bk_daily_summaries_default PARTITION OF bk_daily_summaries DEFAULT"
+    ).execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,32 @@
+from datetime import date, datetime
+
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class BKUploadJob(Base):
+    __tablename__ = "bk_upload_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending", index=True)
+    progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    restaurant_code: Mapped[str] = mapped_column(String(50), nullable=False)
+    report_date: Mapped[date] = mapped_column(Date, nullable=False)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    idempotency_key: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    storage_dir: Mapped[str] = mapped_column(String(255), nullable=False)
+    report_id: Mapped[int | None] = mapped_column(
+        ForeignKey("bk_daily_reports.id", ondelete="SET NULL"), nullable=True
+    )
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Bail du worker qui traite le job ; expire, le job peut etre repris
+    worker_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
@@ -0,0 +1,125 @@
+"""Compare l'agregation multi-passes historique a ChannelAggregate.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_channel_aggregate --reports 5000
+"""
+
+import argparse
+import random
+import time
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.core.bk_aggregate import CLICK_COLLECT, DELIVERY, ChannelAggregate
+
+LABELS = [
+    "CLICK & COLLECT EMPORTÉ", "CLICK & COLLECT PARKING", "CLICK & COLLECT SALLE",
+    "COMPTOIR EMPORTÉ", "COMPTOIR SALLE", "COMPTOIR EMPORTÉ DEPUIS KIOSK",
+    "DRIVE", "DRIVE PIETON", "HOME DELIVERY DELIVEROO", "HOME DELIVERY UBER EATS",
+    "HOME DELIVERY JUST EAT", "KIOSK EMPORTÉ", "KIOSK SALLE", "AUTRE",
+]
+
+
+def _synthetic_reports(count: int, seed: int) -> list[list[SimpleNamespace]]:
+    rng = random.Random(seed)
+    reports = []
+    for _ in range(count):
+        rows = []
+        for label in LABELS:
+            tac = rng.randint(0, 120)
+            ca_net = Decimal(rng.randint(0, 500_000)) / 100
+            rows.append(
+                SimpleNamespace(
+                    channel_label=label,
+                    is_total=False,
+                    tac=tac,
+                    ca_net=ca_net,
+                    ca_ttc=ca_net * Decimal("1.1"),
+                    net_total_profit=Decimal(rng.randint(0, 1000)) / 1000,
+                )
+            )
+        rows.append(SimpleNamespace(channel_label="TOTAL", is_total=True, tac=0,
+                                    ca_net=Decimal(0), ca_ttc=Decimal(0), net_total_profit=Decimal(0)))
+        reports.append(rows)
+    return reports
+
+
+def _legacy_values(channel_sales) -> dict:
+    # Copie de l'ancien _calc_report_values (7 passes, prefixes re-testes a chaque passe)
+    def _is_group(label: str, prefix: str) -> bool:
+        return label.upper().startswith(prefix)
+
+    return {
+        "ca_net_total": sum(r.ca_net for r in channel_sales if not r.is_total),
+        "ca_ttc_total": sum(r.ca_ttc for r in channel_sales if not r.is_total),
+        "tac_total": sum((r.tac or 0) for r in channel_sales if not r.is_total),
+        "ca_delivery": sum(
+            r.ca_net for r in channel_sales
+            if not r.is_total and _is_group(r.channel_label, "HOME DELIVERY")
+        ),
+        "client_delivery": sum(
+            (r.tac or 0) for r in channel_sales
+            if not r.is_total and _is_group(r.channel_label, "HOME DELIVERY")
+        ),
+        "ca_click_collect": sum(
+            r.ca_net for r in channel_sales
+            if not r.is_total and _is_group(r.channel_label, "CLICK & COLLECT")
+        ),
+        "client_click_collect": sum(
+            (r.tac or 0) for r in channel_sales
+            if not r.is_total and _is_group(r.channel_label, "CLICK & COLLECT")
+        ),
+    }
+
+
+def report_values(aggregate: ChannelAggregate) -> dict:
+    # Valeurs de l'ancien recap (floats, comme la reponse historique)
+    delivery = aggregate.groups[DELIVERY]
+    click_collect = aggregate.groups[CLICK_COLLECT]
+    return {
+        "ca_net_total": float(aggregate.all.ca_net),
+        "ca_ttc_total": float(aggregate.all.ca_ttc),
+        "tac_total": aggregate.all.tac,
+        "ca_delivery": float(delivery.ca_net),
+        "client_delivery": delivery.tac,
+        "ca_click_collect": float(click_collect.ca_net),
+        "client_click_collect": click_collect.tac,
+    }
+
+
+def _best(fn, repeat: int) -> tuple[float, list]:
+    # Meilleur de repeat passages : le bruit de la machine ne joue qu'a la hausse
+    best, result = float("inf"), []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reports", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    reports = _synthetic_reports(args.reports, args.seed)
+
+    t_legacy, legacy = _best(lambda: [_legacy_values(rows) for rows in reports], args.repeat)
+    t_single, aggregated = _best(
+        lambda: [report_values(ChannelAggregate.from_channel_sales(rows)) for rows in reports],
+        args.repeat,
+    )
+
+    for old, new in zip(legacy, aggregated):
+        if any(float(old[k]) != new[k] for k in old):
+            raise SystemExit("resultats differents")
+
+    print(f"rapports        : {args.reports} ({len(LABELS)} canaux chacun)")
+    print(f"multi-passes    : {t_legacy * 1000:8.1f} ms (meilleur de {args.repeat})")
+    print(f"ChannelAggregate: {t_single * 1000:8.1f} ms ({t_legacy / t_single:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Benchmark de l'import BK via l'application ASGI, en process.
+
+Les jeux sont produits par benchmarks.synthetic_bk et envoyes a
+POST /reports/bk/upload (un rapport par requete) ou /upload-batch (ZIP).
+Affiche rapports/s, lignes/s, pic RSS et nombre d'ordres SQL.
+
+Le schema de DATABASE_URL est recree : a lancer sur une base jetable.
+
+Usage (depuis backend/) :
+    DATABASE_URL=postgresql+psycopg://... STORAGE_PATH=/tmp/bk-bench \\
+        python -m benchmarks.bench_ingest --mode upload --restaurants 10 --days 31
+"""
+
+import argparse
+import io
+import resource
+import time
+import zipfile
+from collections import Counter
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
+
+from app.api.auth_deps import get_current_user
+from app.core import bk_ingest
+from app.core.bk_ingest import _CHILD_MODELS, BK_FILES
+from app.core.roles import Role
+from app.db.base import Base
+from app.db.session import engine
+from app.main import app
+from app.models.bk_report import BKDailyKpi
+from benchmarks.synthetic_bk import iter_bk_sets
+
+
+class StatementCounter:
+    """Compte les ordres SQL passes par SQLAlchemy (les COPY psycopg n'y passent pas)."""
+
+    def __init__(self) -> None:
+        self.counts: Counter[str] = Counter()
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.counts[statement.lstrip().split(None, 1)[0].upper()] += 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+def _stored_rows() -> int:
+    with engine.connect() as conn:
+        return sum(
+            conn.execute(select(func.count()).select_from(model)).scalar_one()
+            for model in [*_CHILD_MODELS.values(), BKDailyKpi]
+        )
+
+
+def _run_upload(client: TestClient, sets) -> int:
+    count = 0
+    for code, day, blobs in sets:
+        response = client.post(
+            "/reports/bk/upload",
+            data={"report_date": day.isoformat(), "restaurant_code": code},
+            files={name: (BK_FILES[name], data, "text/csv") for name, data in blobs.items()},
+        )
+        response.raise_for_status()
+        count += 1
+    return count
+
+
+def _run_batch(client: TestClient, sets, batch_size: int) -> int:
+    count = 0
+    pending = []
+
+    def _flush() -> int:
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+            for code, day, blobs in pending:
+                for name, data in blobs.items():
+                    zf.writestr(f"{code}/{day.isoformat()}/{BK_FILES[name]}", data)
+        response = client.post(
+            "/reports/bk/upload-batch",
+            files={"archive": ("bk.zip", buf.getvalue(), "application/zip")},
+        )
+        response.raise_for_status()
+        pending.clear()
+        return response.json()["created"]
+
+    for item in sets:
+        pending.append(item)
+        if len(pending) >= batch_size:
+            count += _flush()
+    if pending:
+        count += _flush()
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["upload", "batch"], default="upload")
+    parser.add_argument("--restaurants", type=int, default=10)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--annex-rows", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    user = SimpleNamespace(id=0, email="bench@local", role=Role.DEV.value, restaurants=[])
+    app.dependency_overrides[get_current_user] = lambda: user
+    client = TestClient(app)
+
+    # Jeux generes a l'avance : la generation n'entre pas dans la mesure
+    sets = list(
+        iter_bk_sets(
+            restaurants=args.restaurants,
+            days=args.days,
+            seed=args.seed,
+            annex_rows=args.annex_rows,
+        )
+    )
+
+    counter = StatementCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    start = time.perf_counter()
+    if args.mode == "upload":
+        reports = _run_upload(client, sets)
+    else:
+        reports = _run_batch(client, sets, args.batch_size)
+    elapsed = time.perf_counter() - start
+    event.remove(engine, "before_cursor_execute", counter)
+
+    rows = _stored_rows()
+    # RUSAGE_CHILDREN ne couvre que les process termines : on arrete le pool de parse
+    if bk_ingest._parse_pool is not None:
+        bk_ingest._parse_pool.shutdown(wait=True)
+    rss_self = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    rss_children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    detail = ", ".join(f"{k} {v}" for k, v in counter.counts.most_common())
+
+    print(f"mode            : {args.mode} ({engine.dialect.name}/{engine.dialect.driver})")
+    print(f"rapports        : {reports} en {elapsed:.2f} s -> {reports / elapsed:.1f} rapports/s")
+    print(f"lignes          : {rows} -> {rows / elapsed:.0f} lignes/s")
+    print(f"pic RSS         : {rss_self:.0f} Mo (workers : {rss_children:.0f} Mo)")
+    print(f"ordres SQL      : {counter.total} ({counter.total / max(reports, 1):.1f}/rapport) - {detail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Cout d'encodage JSON d'une reponse : jsonable_encoder + json vs orjson.
+
+Construit les payloads du detail (GET /reports/bk/{id}) et du recap mensuel
+(GET /reports/bk/monthly) a partir de donnees synthetiques, puis mesure le
+rendu seul : chemin FastAPI par defaut (jsonable_encoder puis JSONResponse)
+contre FastJSONResponse (orjson, Decimal/date natifs).
+
+Le schema de DATABASE_URL est recree : a lancer sur une base jetable.
+
+Usage (depuis backend/) :
+    DATABASE_URL=postgresql+psycopg://... STORAGE_PATH=/tmp/bk-bench \\
+        python -m benchmarks.bench_json --restaurants 50
+"""
+
+import argparse
+import calendar
+import json
+from datetime import date
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.bk_reports import _monthly_rows
+from app.core.bk_detail import serialize_report
+from app.core.bk_ingest import create_bk_report, parse_bk_blobs
+from app.core.bk_summary import recap_query
+from app.core.serialization import DECIMAL_MODE, FastJSONResponse
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.models.bk_report import BKDailyReport, BKDailySummary
+from benchmarks.bench_monthly import _timed
+from benchmarks.synthetic_bk import iter_bk_sets
+
+
+def _seed(restaurants: int, year: int, month: int, annex_rows: int) -> None:
+    db = SessionLocal()
+    try:
+        for code, day, blobs in iter_bk_sets(
+            restaurants=restaurants,
+            days=calendar.monthrange(year, month)[1],
+            start=date(year, month, 1),
+            annex_rows=annex_rows,
+        ):
+            create_bk_report(db, code, day, parse_bk_blobs(blobs))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _compare(name: str, payload, repeat: int) -> None:
+    before = _timed(lambda: JSONResponse(jsonable_encoder(payload)).body, repeat)
+    after = _timed(lambda: FastJSONResponse(payload).body, repeat)
+    same = json.loads(JSONResponse(jsonable_encoder(payload)).body) == json.loads(
+        FastJSONResponse(payload).body
+    )
+    size = len(FastJSONResponse(payload).body) / 1024
+    print(
+        f"{name:<15} : {before:8.2f} ms -> {after:6.2f} ms"
+        f" (x{before / after:.1f}, {size:.0f} Ko, identique : {same})"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--restaurants", type=int, default=50)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--month", type=int, default=3)
+    parser.add_argument("--annex-rows", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    _seed(args.restaurants, args.year, args.month, args.annex_rows)
+
+    start = date(args.year, args.month, 1)
+    end = date(args.year, args.month, calendar.monthrange(args.year, args.month)[1])
+    db = SessionLocal()
+    try:
+        report = db.query(BKDailyReport).order_by(BKDailyReport.id).first()
+        detail = serialize_report(report)
+        rows = (
+            recap_query(db, start, end)
+            .join(BKDailyReport, BKDailyReport.id == BKDailySummary.report_id)
+            .add_columns(BKDailyReport.id, BKDailyReport.created_at)
+            .all()
+        )
+    finally:
+        db.close()
+
+    print(f"Decimal         : {DECIMAL_MODE} (API_JSON_DECIMAL)")
+    _compare("detail", detail, args.repeat)
+    _compare("monthly", _monthly_rows(rows), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Temps de reponse de GET /reports/bk/monthly sur un mois complet.
+
+Seme R restaurants sur le mois demande et le meme mois N-1, puis compare
+l'endpoint (une requete SQL sur bk_daily_summaries, format rows et columnar)
+au chargement historique (joinedload des canaux + KPI, sommes en Python).
+
+Le schema de DATABASE_URL est recree : a lancer sur une base jetable.
+
+Usage (depuis backend/) :
+    DATABASE_URL=postgresql+psycopg://... STORAGE_PATH=/tmp/bk-bench \\
+        python -m benchmarks.bench_monthly --restaurants 50
+"""
+
+import argparse
+import calendar
+import statistics
+import time
+from datetime import date
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import joinedload
+
+from app.api.auth_deps import get_current_user
+from app.api.bk_reports import list_bk_reports_monthly
+from app.core.bk_aggregate import ChannelAggregate
+from app.core.bk_calendar import N1_WEEKDAY
+from app.core.bk_columnar import FORMAT_ROWS
+from app.core.bk_ingest import create_bk_report, parse_bk_blobs
+from app.core.bk_monthly_cache import monthly_cache
+from app.core.roles import Role
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.bk_report import BKDailyReport
+from benchmarks.bench_channel_aggregate import report_values
+from benchmarks.synthetic_bk import iter_bk_sets
+
+
+def _seed(restaurants: int, year: int, month: int) -> int:
+    days = calendar.monthrange(year, month)[1]
+    db = SessionLocal()
+    count = 0
+    try:
+        for y in (year - 1, year):
+            for code, day, blobs in iter_bk_sets(
+                restaurants=restaurants, days=days, start=date(y, month, 1), seed=y
+            ):
+                create_bk_report(db, code, day, parse_bk_blobs(blobs))
+                count += 1
+            db.commit()
+    finally:
+        db.close()
+    return count
+
+
+def _legacy_monthly(year: int, month: int) -> int:
+    # Chargement d'avant bk_daily_summaries : objets ORM complets, N et N-1
+    db = SessionLocal()
+    try:
+        rows = 0
+        for y in (year, year - 1):
+            reports = (
+                db.query(BKDailyReport)
+                .options(joinedload(BKDailyReport.channel_sales), joinedload(BKDailyReport.kpi))
+                .filter(
+                    BKDailyReport.report_date >= date(y, month, 1),
+                    BKDailyReport.report_date <= date(y, month, calendar.monthrange(y, month)[1]),
+                )
+                .all()
+            )
+            for report in reports:
+                report_values(ChannelAggregate.from_channel_sales(report.channel_sales))
+            rows += len(reports)
+        return rows
+    finally:
+        db.close()
+
+
+def _timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--restaurants", type=int, default=50)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--month", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    seeded = _seed(args.restaurants, args.year, args.month)
+
+    user = SimpleNamespace(id=0, email="bench@local", role=Role.DEV.value, restaurants=[])
+    app.dependency_overrides[get_current_user] = lambda: user
+    client = TestClient(app)
+    params = {"year": args.year, "month": args.month}
+
+    columnar = {**params, "format": "columnar"}
+    response = client.get("/reports/bk/monthly", params=params)
+    rows = len(response.json())
+    size_rows = len(response.content)
+    size_columnar = len(client.get("/reports/bk/monthly", params=columnar).content)
+
+    # Cache desactive : on mesure le calcul, pas la relecture
+    monthly_cache.maxsize = 0
+    monthly_cache.clear()
+    t_endpoint = _timed(
+        lambda: client.get("/reports/bk/monthly", params=params).raise_for_status(), args.repeat
+    )
+    t_columnar = _timed(
+        lambda: client.get("/reports/bk/monthly", params=columnar).raise_for_status(),
+        args.repeat,
+    )
+    db = SessionLocal()
+    t_handler = _timed(
+        lambda: list_bk_reports_monthly(
+            args.year,
+            args.month,
+            restaurant_code=None,
+            n1_basis=N1_WEEKDAY,
+            response_format=FORMAT_ROWS,
+            db=db,
+            user=user,
+        ),
+        args.repeat,
+    )
+    db.close()
+    t_legacy = _timed(lambda: _legacy_monthly(args.year, args.month), args.repeat)
+
+    print(f"rapports seme   : {seeded} ({args.restaurants} restaurants, N et N-1)")
+    print(f"lignes du mois  : {rows}")
+    print(f"/monthly        : {t_endpoint:8.1f} ms (mediane, HTTP + JSON compris)")
+    print(f"format=columnar : {t_columnar:8.1f} ms")
+    print(f"taille JSON     : {size_rows / 1024:8.1f} Ko (rows) / {size_columnar / 1024:.1f} Ko (columnar)")
+    print(f"handler seul    : {t_handler:8.1f} ms (SQL + construction du payload)")
+    print(f"joinedload + py : {t_legacy:8.1f} ms (chargement seul, sans reponse)")
+
+
+if __name__ == "__main__":
+    main()
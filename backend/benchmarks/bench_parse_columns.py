@@ -0,0 +1,77 @@
+"""Compare le parseur par colonne aux helpers cellule par cellule.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_parse_columns --csv-dir ../csv/bk --repeat 2000
+"""
+
+import argparse
+import csv
+import os
+import time
+from pathlib import Path
+
+from app.core.bk_columns import (
+    parse_decimal,
+    parse_decimal_column,
+    parse_int,
+    parse_int_column,
+)
+
+# Colonnes entieres des exports BK ; tout le reste est decimal sauf les libelles
+INT_COLUMNS = {
+    "tac", "nbr", "SP_tac", "AE_tac", "nombreCorrection", "nombreRepasEmployes",
+    "nombreCommandeOuvertes", "nombreAnnulations", "nombreRemises", "nbrSaucesOffertes",
+}
+TEXT_COLUMNS = {"profit", "type", "libelle"}
+
+
+def _load_columns(path: Path, repeat: int) -> dict[str, list[str]]:
+    with path.open(encoding="utf-8-sig", newline="") as fh:
+        rows = list(csv.DictReader(fh, delimiter=";"))
+    columns: dict[str, list[str]] = {}
+    for name in rows[0] if rows else []:
+        if name not in TEXT_COLUMNS:
+            columns[name] = [row[name] for row in rows] * repeat
+    return columns
+
+
+def _timed(fn, values) -> tuple[float, list]:
+    start = time.perf_counter()
+    out = fn(values)
+    return time.perf_counter() - start, out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--csv-dir",
+        default=os.path.join(os.path.dirname(__file__), "..", "..", "csv", "bk"),
+    )
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'fichier':40} {'cellules':>9} {'cellule (ms)':>13} {'colonne (ms)':>13} {'gain':>6}")
+    for path in sorted(Path(args.csv_dir).glob("SyntheseCA_*.csv")):
+        cells = 0
+        per_cell = 0.0
+        per_column = 0.0
+        for name, values in _load_columns(path, args.repeat).items():
+            single, column = (parse_int, parse_int_column) if name in INT_COLUMNS else (
+                parse_decimal, parse_decimal_column
+            )
+            t_cell, expected = _timed(lambda v: [single(x) for x in v], values)
+            t_col, got = _timed(column, values)
+            if [repr(x) for x in got] != [repr(x) for x in expected]:
+                raise SystemExit(f"{path.name}:{name} : resultats differents")
+            cells += len(values)
+            per_cell += t_cell
+            per_column += t_col
+        gain = per_cell / per_column if per_column else 0.0
+        print(
+            f"{path.name:40} {cells:>9} {per_cell * 1000:>13.1f} "
+            f"{per_column * 1000:>13.1f} {gain:>5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Generateur de jeux SyntheseCA_*.csv synthetiques (format caisse BK).
+
+Les en-tetes, l'ordre des colonnes et le format decimal francais reprennent
+les exports de csv/bk/. Les montants sont coherents entre fichiers : la
+somme des canaux, la TVA et les reglements portent sur le meme CA TTC.
+
+Usage (depuis backend/) :
+    python -m benchmarks.synthetic_bk --out /tmp/bk --restaurants 20 --days 31
+"""
+
+import argparse
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+from app.core.bk_ingest import BK_FILES
+
+CHANNELS = [
+    "CLICK & COLLECT EMPORTÉ", "CLICK & COLLECT PARKING", "CLICK & COLLECT SALLE",
+    "COMPTOIR EMPORTÉ DEPUIS KIOSK", "COMPTOIR SUR PLACE", "COMPTOIR SUR PLACE DEPUIS KIOSK",
+    "DRIVE DRIVE_THROUGH", "HOME DELIVERY DELIVERY", "KIOSK EMPORTÉ", "KIOSK SUR PLACE",
+]
+PAYMENTS = [
+    ("CB", 0.62), ("ESPECES", 0.07), ("ANCV", 0.01), ("ANCV CONNECT", 0.01),
+    ("CLICK COLLECT CB", 0.05), ("DELIVEROO", 0.02), ("LIVRAISON BK", 0.03),
+    ("TRD", 0.04), ("UBER EATS", 0.1), ("CRT", 0.03), ("CRT BIMPLI", 0.02),
+]
+VAT_RATES = [("TVA 20%", 0.2, 0.03), ("TVA 5,5%", 0.055, 0.01), ("TVA 10%", 0.1, 0.96)]
+ANNEX_LABELS = ["FDL BK 3,90 Z1 UD (NE PAS DESACTIVER)", "FDL BK 3,90 Z2 UD (NE PAS DESACTIVER)"]
+
+
+def _fr(value: float, digits: int = 5) -> str:
+    # 832.5 -> "832,5", 0 -> "0,0" comme dans les exports
+    text = f"{value:.{digits}f}".rstrip("0")
+    if text.endswith("."):
+        text += "0"
+    return text.replace(".", ",")
+
+
+def _csv(header: list[str], rows: list[list[object]]) -> bytes:
+    lines = [";".join(header)]
+    lines.extend(";".join(str(v) for v in row) for row in rows)
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def generate_bk_set(rng: random.Random, annex_rows: int = 2) -> dict[str, bytes]:
+    """Un jeu complet (8 fichiers) pour une journee d'un restaurant."""
+    channels = []
+    for label in CHANNELS:
+        tac = rng.randint(0, 260)
+        basket = rng.uniform(8, 32)
+        ttc = round(tac * basket, 2)
+        channels.append((label, tac, ttc, ttc / 1.1))
+    ttc_total = sum(c[2] for c in channels) or 1.0
+    net_total = sum(c[3] for c in channels) or 1.0
+    tac_total = sum(c[1] for c in channels)
+
+    caparprofit = _csv(
+        ["ttc", "panierMoyenTTC", "tac", "netTotalProfit", "panierMoyenNet", "net", "profit"],
+        [
+            [
+                _fr(ttc, 2),
+                _fr(ttc / tac if tac else 0),
+                tac,
+                _fr(net / net_total),
+                _fr(net / tac if tac else 0),
+                _fr(net),
+                label,
+            ]
+            for label, tac, ttc, net in channels
+        ],
+    )
+
+    sp_share = rng.uniform(0.3, 0.45)
+    sp_tac = int(tac_total * sp_share)
+    consommation = _csv(
+        ["SP_tac", "SP_cattc", "SP_pourcent", "AE_caht", "AE_pourcent", "AE_cattc", "SP_caht", "AE_tac"],
+        [[
+            sp_tac,
+            _fr(ttc_total * sp_share, 2),
+            repr(sp_share),
+            _fr(net_total * (1 - sp_share)),
+            repr(1 - sp_share),
+            _fr(ttc_total * (1 - sp_share), 2),
+            _fr(net_total * sp_share),
+            tac_total - sp_tac,
+        ]],
+    )
+
+    corrections_count = rng.randint(0, 200)
+    corrections_amount = rng.uniform(0, 0.08) * ttc_total
+    corrections = _csv(
+        ["tauxCorrection", "montantCorrection", "nombreCorrection"],
+        [[repr(corrections_amount / ttc_total), _fr(corrections_amount, 2), corrections_count]],
+    )
+
+    meals = rng.randint(0, 25)
+    divers = _csv(
+        [
+            "nombreRepasEmployes", "nombreCommandeOuvertes", "montantValoriseRepasEmployes",
+            "nombreAnnulations", "montantAnnulations", "tauxCommandeOuvertes",
+            "tauxRepasEmployes", "montantCommandeOuvertes", "tauxAnnulations",
+        ],
+        [[
+            meals, rng.randint(0, 10), _fr(meals * 12.3, 2), 0, "0",
+            _fr(rng.uniform(0, 0.03), 10), _fr(rng.uniform(0, 0.03), 10),
+            _fr(rng.uniform(0, 300), 2), "0",
+        ]],
+    )
+
+    payments = []
+    for kind, share in PAYMENTS:
+        theorique = round(ttc_total * share, 2)
+        gap = round(rng.choice([0.0, 0.0, 0.0, rng.uniform(-5, 5)]), 2)
+        payments.append([_fr(gap, 2), kind, "0", _fr(theorique, 2), _fr(theorique + gap, 2)])
+    reglement = _csv(["ecart", "type", "preleve", "theorique", "compte"], payments)
+
+    remises = _csv(
+        ["tauxRemises", "montantRemises", "nbrSaucesOffertes", "nombreRemises",
+         "montantSaucesOffertes", "tauxSaucesOffertes"],
+        [[
+            _fr(rng.uniform(0, 0.06), 4), _fr(ttc_total * 0.04, 2), rng.randint(0, 1500),
+            rng.randint(0, 150), _fr(rng.uniform(0, 400), 2), _fr(rng.uniform(0, 0.04), 4),
+        ]],
+    )
+
+    tva_rows = []
+    for label, rate, share in VAT_RATES:
+        ttc = round(ttc_total * share, 2)
+        ht = ttc / (1 + rate)
+        tva_rows.append([_fr(ttc, 2), label, _fr(ht), _fr(ttc - ht)])
+    tva = _csv(["TTC", "libelle", "HT", "TVA"], tva_rows)
+
+    annex = []
+    for i in range(annex_rows):
+        nbr = rng.randint(1, 5)
+        annex.append([
+            _fr(3.5455 * nbr, 4), _fr(3.9 * nbr, 2), ANNEX_LABELS[i % len(ANNEX_LABELS)], _fr(nbr, 1)
+        ])
+    vente_annexes = _csv(["montantHT", "montantttc", "libelle", "nbr"], annex)
+
+    return {
+        "caparprofit": caparprofit,
+        "consommationparprofit": consommation,
+        "corrections": corrections,
+        "divers": divers,
+        "reglement": reglement,
+        "remises": remises,
+        "tva": tva,
+        "vente_annexes": vente_annexes,
+    }
+
+
+def iter_bk_sets(
+    restaurants: int,
+    days: int,
+    start: date = date(2025, 1, 1),
+    seed: int = 42,
+    annex_rows: int = 2,
+):
+    """(restaurant_code, date, fichiers) pour restaurants x jours, deterministe selon seed."""
+    rng = random.Random(seed)
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        for n in range(1, restaurants + 1):
+            yield f"BK{n:04d}", day, generate_bk_set(rng, annex_rows)
+
+
+def write_bk_sets(out: Path, **kwargs) -> int:
+    count = 0
+    for code, day, blobs in iter_bk_sets(**kwargs):
+        target = out / code / day.isoformat()
+        target.mkdir(parents=True, exist_ok=True)
+        for name, data in blobs.items():
+            (target / BK_FILES[name]).write_bytes(data)
+        count += 1
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--restaurants", type=int, default=10)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 1, 1))
+    parser.add_argument("--annex-rows", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    count = write_bk_sets(
+        args.out,
+        restaurants=args.restaurants,
+        days=args.days,
+        start=args.start,
+        seed=args.seed,
+        annex_rows=args.annex_rows,
+    )
+    print(f"{count} jeux ecrits sous {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Fixtures communes des tests (depuis backend/ : pytest -q).
+
+Les tests recreent le schema : ils tournent sur TEST_DATABASE_URL, jamais sur
+la DATABASE_URL de dev. Sans TEST_DATABASE_URL, une base SQLite temporaire.
+"""
+import os
+import tempfile
+from types import SimpleNamespace
+
+_TMP = tempfile.mkdtemp(prefix="bk-tests-")
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or f"sqlite:///{_TMP}/tests.sqlite"
+os.environ["STORAGE_PATH"] = os.path.join(_TMP, "storage")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.api.auth_deps import get_current_user  # noqa: E402
+from app.core.bk_monthly_cache import monthly_cache  # noqa: E402
+from app.core.roles import Role  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """Session sur un schema vide."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    monthly_cache.clear()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    """Client HTTP authentifie en DEV (sans les evenements de demarrage)."""
+    user = SimpleNamespace(id=0, email="dev@test", role=Role.DEV.value, restaurants=[])
+    app.dependency_overrides[get_current_user] = lambda: user
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
@@ -0,0 +1,77 @@
+"""ChannelAggregate rend les memes sommes que les anciennes passes par groupe."""
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.core.bk_aggregate import CHANNEL_GROUPS, ChannelAggregate
+
+
+def _row(label: str, tac: int | None, ca_net: str, is_total: bool = False) -> SimpleNamespace:
+    ca_net = Decimal(ca_net)
+    return SimpleNamespace(
+        channel_label=label,
+        is_total=is_total,
+        tac=tac,
+        ca_net=ca_net,
+        ca_ttc=ca_net * Decimal("1.1"),
+        net_total_profit=Decimal("0.1"),
+    )
+
+
+ROWS = [
+    _row("CLICK & COLLECT EMPORTÉ", 12, "220.4462"),
+    _row("click & collect parking", 10, "242.7719"),
+    _row("COMPTOIR SUR PLACE", None, "6.68181"),
+    _row("DRIVE DRIVE_THROUGH", 139, "2274.02489"),
+    _row("HOME DELIVERY DELIVERY", 34, "953.42942"),
+    _row("HOME DELIVERY UBER EATS", 20, "410.5"),
+    _row("KIOSK SUR PLACE", 254, "3033.88996"),
+    # Hors groupe : compte dans le total general seulement
+    _row("AUTRE", 3, "12.5"),
+    # Lignes total deja stockees : ignorees
+    _row("TOTAL HOME DELIVERY", 54, "1363.92942", is_total=True),
+    _row("TOTAL", 472, "7141.74", is_total=True),
+]
+
+
+def _legacy_sum(field: str, prefix: str | None = None):
+    # Une passe par somme, comme l'ancien _calc_report_values
+    return sum(
+        (getattr(r, field) or 0)
+        for r in ROWS
+        if not r.is_total and (prefix is None or r.channel_label.upper().startswith(prefix))
+    )
+
+
+def test_kpi_matches_per_group_sums():
+    kpi = ChannelAggregate.from_channel_sales(ROWS).kpi()
+
+    assert kpi == {
+        "ca_real": _legacy_sum("ca_net"),
+        "clients": _legacy_sum("tac"),
+        "ca_delivery": _legacy_sum("ca_net", "HOME DELIVERY"),
+        "client_delivery": _legacy_sum("tac", "HOME DELIVERY"),
+        "ca_click_collect": _legacy_sum("ca_net", "CLICK & COLLECT"),
+        "client_click_collect": _legacy_sum("tac", "CLICK & COLLECT"),
+    }
+
+
+def test_total_rows_match_per_group_sums():
+    rows = {r["channel_label"]: r for r in ChannelAggregate.from_channel_sales(ROWS).total_rows()}
+
+    assert list(rows) == [label for label, _ in CHANNEL_GROUPS] + ["TOTAL"]
+    for label, prefix in [*CHANNEL_GROUPS, ("TOTAL", None)]:
+        row = rows[label]
+        assert row["is_total"] is True
+        assert row["tac"] == _legacy_sum("tac", prefix)
+        assert row["ca_net"] == _legacy_sum("ca_net", prefix)
+        assert row["ca_ttc"] == _legacy_sum("ca_ttc", prefix)
+        assert row["net_total_profit"] == _legacy_sum("net_total_profit", prefix)
+    # COMPTOIR : seule ligne sans TAC, pas de panier moyen
+    assert rows["TOTAL COMPTOIR"]["pm_net"] is None
+    assert rows["TOTAL DRIVE"]["pm_net"] == _legacy_sum("ca_net", "DRIVE") / 139
+
+
+def test_empty_groups_have_no_total_row():
+    rows = ChannelAggregate.from_channel_sales([_row("DRIVE", 5, "10")]).total_rows()
+
+    assert [r["channel_label"] for r in rows] == ["TOTAL DRIVE", "TOTAL"]
@@ -0,0 +1,58 @@
+"""Rapprochements d'une journee sur l'export de reference csv/bk/."""
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+from app.core.bk_ingest import BK_FILES, create_bk_report, parse_bk_files
+
+SAMPLE_DIR = Path(__file__).resolve().parents[2] / "csv" / "bk"
+
+
+@pytest.fixture
+def sample_files():
+    files = {field: (SAMPLE_DIR / name).open("rb") for field, name in BK_FILES.items()}
+    yield files
+    for handle in files.values():
+        handle.close()
+
+
+def _consume(parsed: dict) -> dict:
+    # Les sections TVA et reglement alimentent le controle en etant lues
+    list(parsed["tva_summary"])
+    list(parsed["payments"])
+    return parsed["consistency"].result()
+
+
+def test_sample_export_is_consistent(sample_files):
+    result = _consume(parse_bk_files(sample_files))
+
+    # TVA, reglement et modes de consommation : 12256.38 ; caparprofit : 11623.38
+    assert result == {
+        "tva_ttc_delta": Decimal("0"),
+        "payment_ttc_delta": Decimal("0"),
+        "channel_ttc_delta": Decimal("-633"),
+        "is_consistent": True,
+    }
+
+
+def test_payment_gap_is_flagged(sample_files):
+    reglement = sample_files["reglement"].read().replace(b";CB;0;8683,72;", b";CB;0;8684,72;")
+    result = _consume(parse_bk_files({**sample_files, "reglement": BytesIO(reglement)}))
+
+    assert result["payment_ttc_delta"] == Decimal("1")
+    assert result["tva_ttc_delta"] == Decimal("0")
+    assert result["is_consistent"] is False
+
+
+def test_stored_flags(db, sample_files):
+    report = create_bk_report(db, "BK0001", date(2025, 1, 2), parse_bk_files(sample_files))
+    db.commit()
+    db.refresh(report)
+
+    assert report.is_consistent is True
+    assert (report.tva_ttc_delta, report.payment_ttc_delta, report.channel_ttc_delta) == (
+        0, 0, -633
+    )
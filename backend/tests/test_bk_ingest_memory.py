@@ -0,0 +1,86 @@
+"""Memoire bornee a l'import : le pic depend des paquets, pas de la taille du CSV."""
+import random
+import tracemalloc
+from datetime import date
+
+import pytest
+
+from app.core.bk_ingest import PARSE_CHUNK_SIZE, create_bk_report, parse_bk_files
+from app.models.bk_report import BKAnnexSale
+from benchmarks.synthetic_bk import generate_bk_set
+
+# Deux paquets de parse contre ~6 Mo de ventes annexes (12 fois plus de lignes)
+SMALL_ANNEX_ROWS = 2 * PARSE_CHUNK_SIZE
+LARGE_ANNEX_ROWS = 24 * PARSE_CHUNK_SIZE
+# Marge pour le bruit de l'allocateur ; un chargement complet ferait x12
+MAX_GROWTH = 1.25
+
+
+@pytest.fixture
+def bk_files(tmp_path):
+    """Ouvre les 8 CSV d'un jeu ecrits sur disque (comme un upload deborde)."""
+    opened = []
+
+    def open_set(annex_rows: int, seed: int = 0) -> dict:
+        files = {}
+        for name, data in generate_bk_set(random.Random(seed), annex_rows).items():
+            path = tmp_path / f"{seed}-{name}.csv"
+            path.write_bytes(data)
+            files[name] = path.open("rb")
+            opened.append(files[name])
+        return files
+
+    yield open_set
+    for handle in opened:
+        handle.close()
+
+
+def _peak(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _parse_peak(files: dict) -> int:
+    def parse() -> None:
+        rows = sum(1 for _ in parse_bk_files(files)["annex_sales"])
+        assert rows > 0
+
+    return _peak(parse)
+
+
+def test_large_annex_file_is_multi_megabyte(bk_files):
+    files = bk_files(LARGE_ANNEX_ROWS)
+    files["vente_annexes"].seek(0, 2)
+    assert files["vente_annexes"].tell() > 5 * 1024 * 1024
+
+
+def test_parse_peak_does_not_grow_with_annex_file(bk_files):
+    small = _parse_peak(bk_files(SMALL_ANNEX_ROWS, seed=1))
+    large = _parse_peak(bk_files(LARGE_ANNEX_ROWS, seed=2))
+
+    assert large < small * MAX_GROWTH
+
+
+def test_create_report_peak_does_not_grow_with_annex_file(db, bk_files):
+    # Premier import : caches SQLAlchemy (compilation, mappers) hors mesure
+    create_bk_report(db, "BK0001", date(2025, 1, 1), parse_bk_files(bk_files(2, seed=1)))
+    db.commit()
+
+    peaks = []
+    for day, annex_rows in ((2, SMALL_ANNEX_ROWS), (3, LARGE_ANNEX_ROWS)):
+        files = bk_files(annex_rows, seed=day)
+        peaks.append(
+            _peak(
+                lambda: create_bk_report(
+                    db, "BK0002", date(2025, 1, day), parse_bk_files(files)
+                )
+            )
+        )
+        db.commit()
+
+    assert peaks[1] < peaks[0] * MAX_GROWTH
+    assert db.query(BKAnnexSale).count() == 2 + SMALL_ANNEX_ROWS + LARGE_ANNEX_ROWS
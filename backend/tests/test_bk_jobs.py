@@ -0,0 +1,102 @@
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.auth_deps import get_current_user
+from app.core import bk_jobs
+from app.core.bk_jobs import (
+    JOB_PENDING,
+    JOB_RUNNING,
+    LEASE_SECONDS,
+    WORKER_ID,
+    claim_job,
+    reclaim_expired_jobs,
+    resume_pending_jobs,
+)
+from app.core.roles import Role
+from app.models.bk_upload_job import BKUploadJob
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    """Ids soumis aux workers, sans rien executer."""
+    ids: list[int] = []
+    monkeypatch.setattr(bk_jobs, "submit_job", ids.append)
+    return ids
+
+
+def _job(db, status: str, worker_id: str | None = None, beat_age: float | None = None) -> int:
+    heartbeat_at = (
+        None
+        if beat_age is None
+        else datetime.now(timezone.utc) - timedelta(seconds=beat_age)
+    )
+    job = BKUploadJob(
+        status=status,
+        progress=0,
+        restaurant_code="BK0001",
+        report_date=date(2025, 1, 1),
+        storage_dir="",
+        worker_id=worker_id,
+        heartbeat_at=heartbeat_at,
+    )
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def test_claim_is_exclusive(db):
+    job_id = _job(db, JOB_PENDING)
+
+    assert claim_job(db, job_id)
+    assert not claim_job(db, job_id)
+    job = db.get(BKUploadJob, job_id)
+    db.refresh(job)
+    assert (job.status, job.worker_id) == (JOB_RUNNING, WORKER_ID)
+    assert job.heartbeat_at is not None
+
+
+def test_live_lease_is_not_reclaimed(db, submitted):
+    live = _job(db, JOB_RUNNING, "other-worker", beat_age=LEASE_SECONDS / 3)
+    expired = _job(db, JOB_RUNNING, "dead-worker", beat_age=LEASE_SECONDS * 2)
+    legacy = _job(db, JOB_RUNNING)
+
+    assert sorted(reclaim_expired_jobs(db)) == [expired, legacy]
+    db.expire_all()
+    assert db.get(BKUploadJob, live).status == JOB_RUNNING
+    assert db.get(BKUploadJob, expired).status == JOB_PENDING
+    assert db.get(BKUploadJob, expired).worker_id is None
+
+
+def test_resume_submits_only_pending_and_expired_jobs(db, submitted):
+    pending = _job(db, JOB_PENDING)
+    _job(db, JOB_RUNNING, "other-worker", beat_age=1)
+    expired = _job(db, JOB_RUNNING, "dead-worker", beat_age=LEASE_SECONDS * 2)
+
+    assert resume_pending_jobs() == 2
+    assert submitted == [pending, expired]
+
+
+def test_sweep_skips_recent_pending_jobs(db, submitted):
+    # Encore dans la file du process qui l'a cree
+    _job(db, JOB_PENDING)
+    expired = _job(db, JOB_RUNNING, "dead-worker", beat_age=LEASE_SECONDS * 2)
+
+    resume_pending_jobs(waiting_seconds=LEASE_SECONDS)
+    assert submitted == [expired]
+
+
+def test_manager_reads_only_jobs_of_own_restaurants(db, client):
+    own = _job(db, JOB_PENDING)
+    other = _job(db, JOB_PENDING)
+    db.get(BKUploadJob, other).restaurant_code = "BK0002"
+    db.commit()
+    manager = SimpleNamespace(
+        id=1, email="manager@test", role=Role.MANAGER.value,
+        restaurants=[SimpleNamespace(code="BK0001")],
+    )
+    client.app.dependency_overrides[get_current_user] = lambda: manager
+
+    assert client.get(f"/reports/bk/jobs/{own}").status_code == 200
+    assert client.get(f"/reports/bk/jobs/{other}").status_code == 403
@@ -0,0 +1,90 @@
+"""Pagination par cle de GET /reports/bk et cursor opaque."""
+import base64
+from datetime import date, timedelta
+
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.bk_report import BKDailyReport
+
+DAY = date(2025, 3, 10)
+CODES = ["BK0003", "BK0001", "BK0002"]
+
+
+@pytest.fixture
+def report_ids(db) -> list[int]:
+    """Trois restaurants sur les memes jours ; ids hors de l'ordre de tri."""
+    reports = [
+        BKDailyReport(client_code="BK", restaurant_code=code, report_date=DAY - timedelta(days=d))
+        for d in range(3)
+        for code in CODES
+    ]
+    db.add_all(reports)
+    db.commit()
+    return [r.id for r in reports]
+
+
+def _pages(client, limit: int, **params) -> list[list[dict]]:
+    pages, cursor = [], None
+    while True:
+        query = {"limit": limit, **params, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/reports/bk", params=query).json()
+        pages.append(body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 4, 9, 10])
+def test_cursor_walks_every_report_once(client, report_ids, limit):
+    pages = _pages(client, limit)
+    rows = [row for page in pages for row in page]
+
+    assert [len(page) for page in pages[:-1]] == [limit] * (len(pages) - 1)
+    assert sorted(row["id"] for row in rows) == sorted(report_ids)
+    assert [(row["report_date"], row["restaurant_code"]) for row in rows] == [
+        ((DAY - timedelta(days=d)).isoformat(), code) for d in range(3) for code in sorted(CODES)
+    ]
+    # Meme ordre que la liste complete
+    assert rows == client.get("/reports/bk").json()
+
+
+def test_cursor_breaks_ties_on_id(client, report_ids):
+    first = report_ids[0]  # BK0003, DAY
+    before = encode_cursor([DAY, "BK0003", first - 1])
+    after = encode_cursor([DAY, "BK0003", first])
+
+    assert client.get("/reports/bk", params={"cursor": before}).json()["items"][0]["id"] == first
+    assert client.get("/reports/bk", params={"cursor": after}).json()["items"][0]["id"] != first
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor!",
+        _b64(b"{not json"),
+        _b64(b'{"report_date": "2025-03-10"}'),
+        _b64(b'["2025-03-10", "BK0001"]'),
+        _b64(b'["10/03/2025", "BK0001", 1]'),
+        _b64(b'["2025-03-10", "BK0001", "abc"]'),
+    ],
+)
+def test_tampered_cursor_is_rejected(client, report_ids, cursor):
+    response = client.get("/reports/bk", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor([DAY, "BK0001", 42])
+
+    assert decode_cursor(cursor, 3) == ["2025-03-10", "BK0001", 42]
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor, 2)
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor[:-3], 3)
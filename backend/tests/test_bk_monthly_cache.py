@@ -0,0 +1,53 @@
+"""Le cache du recap mensuel n'est invalide qu'au commit de la transaction englobante."""
+import random
+from concurrent.futures import Future
+from datetime import date
+
+from app.api.bk_reports import _create_batch_report
+from app.core.bk_ingest import create_bk_report, fingerprint_bk_blobs, parse_bk_blobs
+from app.core.bk_monthly_cache import monthly_cache
+from benchmarks.synthetic_bk import generate_bk_set
+
+DAY = date(2025, 3, 10)
+
+
+def _batch_set(db, code: str, seed: int) -> dict:
+    """Comme un jeu de /upload-batch : savepoint, sans commit."""
+    blobs = generate_bk_set(random.Random(seed))
+    future: Future = Future()
+    future.set_result(parse_bk_blobs(blobs))
+    result: dict = {}
+    _create_batch_report(db, (code, DAY), future, blobs, fingerprint_bk_blobs(blobs), result)
+    return result
+
+
+def _cached_entries() -> int:
+    return monthly_cache.stats()["size"]
+
+
+def test_savepoints_do_not_invalidate_before_outer_commit(db, client):
+    create_bk_report(db, "BK0001", DAY, parse_bk_blobs(generate_bk_set(random.Random(1))))
+    db.commit()
+    assert len(client.get("/reports/bk/monthly", params={"year": 2025, "month": 3}).json()) == 1
+    assert _cached_entries() == 1
+
+    # Savepoint relache : rien n'est encore visible des autres sessions
+    assert _batch_set(db, "BK0002", seed=2)["status"] == "created"
+    assert _cached_entries() == 1
+    # Savepoint annule : ne doit pas effacer les marques du precedent
+    assert _batch_set(db, "BK0001", seed=3)["status"] == "duplicate"
+    assert _cached_entries() == 1
+
+    db.commit()
+    assert _cached_entries() == 0
+    assert len(client.get("/reports/bk/monthly", params={"year": 2025, "month": 3}).json()) == 2
+
+
+def test_outer_rollback_keeps_cache(db, client):
+    client.get("/reports/bk/monthly", params={"year": 2025, "month": 3})
+    invalidations = monthly_cache.stats()["invalidations"]
+    assert _batch_set(db, "BK0002", seed=2)["status"] == "created"
+
+    db.rollback()
+    assert _cached_entries() == 1
+    assert monthly_cache.stats()["invalidations"] == invalidations
@@ -0,0 +1,53 @@
+"""Le recap mensuel compare par defaut a la meme date N-1 ; weekday sur demande."""
+import random
+from datetime import date
+
+import pytest
+
+from app.core.bk_ingest import create_bk_report, parse_bk_blobs
+from benchmarks.synthetic_bk import generate_bk_set
+
+DAY = date(2025, 3, 10)
+# Meme date et meme jour de semaine (364 jours avant)
+CALENDAR_N1 = date(2024, 3, 10)
+WEEKDAY_N1 = date(2024, 3, 11)
+
+
+@pytest.fixture
+def reports(db) -> None:
+    for seed, day in enumerate([DAY, CALENDAR_N1, WEEKDAY_N1], start=1):
+        create_bk_report(db, "BK0001", day, parse_bk_blobs(generate_bk_set(random.Random(seed))))
+    db.commit()
+
+
+def _march(client, **params):
+    response = client.get(
+        "/reports/bk/monthly",
+        params={"year": 2025, "month": 3, "restaurant_code": "BK0001", **params},
+    )
+    assert response.status_code == 200
+    return response.json()[0]
+
+
+def _ca_real(client, day: date) -> float:
+    row = client.get(
+        "/reports/bk/monthly",
+        params={"year": day.year, "month": day.month, "restaurant_code": "BK0001"},
+    ).json()
+    return next(r["kpi"]["ca_real"] for r in row if r["report_date"] == day.isoformat())
+
+
+@pytest.mark.parametrize(
+    "params, n1_date",
+    [
+        ({}, CALENDAR_N1),
+        ({"n1_basis": "calendar"}, CALENDAR_N1),
+        ({"n1_basis": "weekday"}, WEEKDAY_N1),
+    ],
+    ids=["default", "calendar", "weekday"],
+)
+def test_n1_basis(client, reports, params, n1_date):
+    row = _march(client, **params)
+
+    assert row["n1_date"] == n1_date.isoformat()
+    assert row["kpi"]["n1_ht"] == _ca_real(client, n1_date)
@@ -0,0 +1,69 @@
+"""Detachement des mois de bk_daily_summaries : refuse tant que des rapports restent.
+
+Ignore sans TEST_DATABASE_URL PostgreSQL (partitionnement).
+"""
+import random
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+from app.core.bk_ingest import create_bk_report, parse_bk_blobs
+from app.core.bk_partitions import (
+    DEFAULT_PARTITION,
+    archived_partitions,
+    detach_partitions,
+    ensure_partitions,
+    monthly_partitions,
+    partition_name,
+)
+from app.db.session import engine
+from benchmarks.synthetic_bk import generate_bk_set
+
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "postgresql", reason="TEST_DATABASE_URL PostgreSQL requis"
+)
+
+JANUARY = date(2024, 1, 1)
+MARCH = date(2024, 3, 1)
+
+
+@pytest.fixture
+def january_report(db) -> int:
+    """Rapport de janvier 2024 ; archive eventuelle supprimee a la fin."""
+    with engine.begin() as conn:
+        ensure_partitions(conn, JANUARY, MARCH)
+    report_id = create_bk_report(
+        db, "BK0001", date(2024, 1, 15), parse_bk_blobs(generate_bk_set(random.Random(1)))
+    ).id
+    # Sans transaction ouverte : le DETACH attendrait son verrou
+    db.commit()
+    yield report_id
+    db.rollback()
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {partition_name(JANUARY)}"))
+
+
+def test_detach_refuses_months_with_reports(january_report):
+    with engine.begin() as conn:
+        with pytest.raises(ValueError, match="2024-01"):
+            detach_partitions(conn, MARCH)
+        assert JANUARY in monthly_partitions(conn)
+        assert archived_partitions(conn) == {}
+
+
+def test_detach_after_reports_are_deleted(db, client, january_report):
+    assert client.delete(f"/reports/bk/{january_report}").status_code == 200
+    with engine.begin() as conn:
+        assert detach_partitions(conn, date(2024, 2, 1)) == [partition_name(JANUARY)]
+
+    # Le mois detache n'est pas recree ; un reimport tombe dans la partition par defaut
+    with engine.begin() as conn:
+        assert ensure_partitions(conn, JANUARY, MARCH) == []
+        assert archived_partitions(conn) == {JANUARY: partition_name(JANUARY)}
+    create_bk_report(
+        db, "BK0001", date(2024, 1, 15), parse_bk_blobs(generate_bk_set(random.Random(2)))
+    )
+    db.commit()
+    with engine.connect() as conn:
+        assert conn.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar() == 1
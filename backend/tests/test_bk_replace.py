@@ -0,0 +1,141 @@
+"""Remplacement en place d'un rapport : lignes filles synchronisees, synthese et KPI reecrits."""
+import copy
+import random
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.core.bk_ingest import BK_FILES, create_bk_report, parse_bk_blobs, replace_bk_report
+from app.core.bk_monthly_cache import monthly_cache
+from app.models.bk_report import (
+    BKAnnexSale,
+    BKDailyKpi,
+    BKDailyReport,
+    BKDailySummary,
+    BKDivers,
+    BKPayment,
+)
+from benchmarks.synthetic_bk import generate_bk_set
+
+DAY = date(2025, 3, 10)
+MONTHLY = {"year": 2025, "month": 3, "restaurant_code": "BK0001"}
+NO_CHANGE = {"inserted": 0, "updated": 0, "deleted": 0}
+
+
+@pytest.fixture
+def parsed() -> dict:
+    return parse_bk_blobs(generate_bk_set(random.Random(1)))
+
+
+@pytest.fixture
+def report_id(db, parsed) -> int:
+    report_id = create_bk_report(db, "BK0001", DAY, parsed).id
+    db.commit()
+    return report_id
+
+
+def _ids(db, model, report_id: int) -> list[int]:
+    return list(db.scalars(select(model.id).where(model.report_id == report_id).order_by(model.id)))
+
+
+def _changes_only(changes: dict, **expected) -> None:
+    assert changes == {section: expected.get(section, NO_CHANGE) for section in changes}
+
+
+def test_replace_changes_adds_and_removes_rows(db, parsed, report_id):
+    annex_ids = _ids(db, BKAnnexSale, report_id)
+    payment_ids = _ids(db, BKPayment, report_id)
+    new = copy.deepcopy(parsed)
+    new["annex_sales"][0].update(nbr=9, montant_ht=Decimal("31.91"), montant_ttc=Decimal("35.1"))
+    new["payments"].append(
+        {
+            "payment_type": "TR",
+            "theorique": Decimal("12.5"),
+            "preleve": Decimal("0"),
+            "compte": Decimal("12.5"),
+            "ecart": Decimal("0"),
+        }
+    )
+    new["divers"] = []
+
+    report = db.get(BKDailyReport, report_id)
+    changes = replace_bk_report(db, report, new, content_hash="v2")
+    db.commit()
+
+    _changes_only(
+        changes,
+        annex_sales={"inserted": 0, "updated": 1, "deleted": 0},
+        payments={"inserted": 1, "updated": 0, "deleted": 0},
+        divers={"inserted": 0, "updated": 0, "deleted": 1},
+    )
+    # Lignes mises a jour ou conservees en place : memes ids
+    assert _ids(db, BKAnnexSale, report_id) == annex_ids
+    assert _ids(db, BKPayment, report_id)[:-1] == payment_ids
+    assert _ids(db, BKDivers, report_id) == []
+    annex = db.get(BKAnnexSale, annex_ids[0])
+    assert (annex.nbr, annex.montant_ttc) == (9, Decimal("35.1"))
+    assert db.get(BKDailyReport, report_id).content_hash == "v2"
+
+
+def test_replace_with_same_content_touches_nothing(db, parsed, report_id):
+    ids = {model: _ids(db, model, report_id) for model in (BKAnnexSale, BKPayment, BKDivers)}
+
+    report = db.get(BKDailyReport, report_id)
+    changes = replace_bk_report(db, report, copy.deepcopy(parsed))
+    db.commit()
+
+    _changes_only(changes)
+    assert {model: _ids(db, model, report_id) for model in ids} == ids
+
+
+def _files(seed: int) -> dict:
+    return {
+        field: (BK_FILES[field], data, "text/csv")
+        for field, data in generate_bk_set(random.Random(seed)).items()
+    }
+
+
+def _cached_entries() -> int:
+    return monthly_cache.stats()["size"]
+
+
+def test_put_rewrites_summary_and_kpi(db, client, report_id):
+    manual = {"n1_ht": "1234.5", "cash_diff": "-2.5"}
+    assert client.put(f"/reports/bk/{report_id}/kpi", json=manual).status_code == 200
+    before = client.get("/reports/bk/monthly", params=MONTHLY).json()[0]
+    assert _cached_entries() == 1
+
+    response = client.put(f"/reports/bk/{report_id}", files=_files(seed=2))
+
+    assert response.status_code == 200
+    assert response.json()["unchanged"] is False
+    # Commit du remplacement : le recap du mois est recalcule
+    assert _cached_entries() == 0
+    expected = parse_bk_blobs(generate_bk_set(random.Random(2)))
+    db.expire_all()
+    summaries = db.query(BKDailySummary).filter(BKDailySummary.report_id == report_id).all()
+    assert len(summaries) == 1
+    assert summaries[0].tac_total == expected["summary"]["tac_total"]
+    kpi = db.query(BKDailyKpi).filter(BKDailyKpi.report_id == report_id).one()
+    assert kpi.clients == expected["kpi"]["clients"]
+    # Saisie manuelle conservee
+    assert (kpi.n1_ht, kpi.cash_diff) == (Decimal("1234.5"), Decimal("-2.5"))
+
+    after = client.get("/reports/bk/monthly", params=MONTHLY).json()[0]
+    assert after["id"] == report_id
+    assert after["tac_total"] == expected["summary"]["tac_total"] != before["tac_total"]
+    assert after["kpi"]["n1_ht"] == before["kpi"]["n1_ht"]
+
+
+def test_put_same_files_is_unchanged(client, report_id):
+    # Premier PUT : enregistre l'empreinte des fichiers
+    assert client.put(f"/reports/bk/{report_id}", files=_files(seed=1)).status_code == 200
+    client.get("/reports/bk/monthly", params=MONTHLY)
+    assert _cached_entries() == 1
+
+    response = client.put(f"/reports/bk/{report_id}", files=_files(seed=1))
+
+    assert response.json() == {"report_id": report_id, "unchanged": True, "changes": {}}
+    assert _cached_entries() == 1
@@ -0,0 +1,85 @@
+"""POST /reports/bk/upload-batch sur une archive melant jeux valides et invalides."""
+import io
+import random
+import zipfile
+from datetime import date, timedelta
+
+import pytest
+
+from app.core.bk_ingest import BK_FILES, shutdown_parse_pool
+from app.models.bk_report import BKDailyReport
+from benchmarks.synthetic_bk import generate_bk_set
+
+DAY = "2025-03-10"
+
+
+@pytest.fixture(autouse=True)
+def parse_pool():
+    # Workers spawn demarres par l'endpoint : arretes apres chaque test
+    yield
+    shutdown_parse_pool()
+
+
+def _zip(entries: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for path, data in entries.items():
+            zf.writestr(path, data)
+    return buffer.getvalue()
+
+
+def _set(prefix: str, seed: int, skip: str | None = None) -> dict[str, bytes]:
+    blobs = generate_bk_set(random.Random(seed))
+    return {f"{prefix}/{BK_FILES[f]}": data for f, data in blobs.items() if f != skip}
+
+
+def _upload(client, archive: bytes):
+    return client.post(
+        "/reports/bk/upload-batch",
+        files={"archive": ("batch.zip", archive, "application/zip")},
+    )
+
+
+def test_mixed_archive(db, client):
+    future = (date.today() + timedelta(days=2)).isoformat()
+    archive = _zip(
+        {
+            **_set(f"BK0001/{DAY}", seed=1),
+            **_set(f"BK0002/{DAY}", seed=2, skip="tva"),
+            **_set(f"BK0003/{DAY}", seed=3),
+            # Meme (restaurant, date, champ) sous un autre format de chemin
+            f"BK0003_{DAY}/SyntheseCA_tva.csv": b"TTC;libelle;HT;TVA\n",
+            **_set(f"BK0004/{future}", seed=4),
+            "notes/readme.txt": b"hors jeu",
+        }
+    )
+
+    response = _upload(client, archive)
+
+    assert response.status_code == 200
+    body = response.json()
+    results = {r["restaurant_code"]: r for r in body["results"]}
+    assert (body["created"], body["duplicate"], body["error"]) == (1, 0, 3)
+    assert body["ignored"] == ["notes/readme.txt"]
+    assert results["BK0001"]["status"] == "created"
+    assert results["BK0002"] == {
+        "restaurant_code": "BK0002",
+        "report_date": DAY,
+        "status": "error",
+        "detail": "Missing files: tva",
+    }
+    assert results["BK0003"]["detail"] == "Duplicate files: SyntheseCA_tva.csv"
+    assert results["BK0004"]["detail"] == "Report date cannot be in the future."
+    assert [code for (code,) in db.query(BKDailyReport.restaurant_code)] == ["BK0001"]
+
+    # Reimport : meme contenu -> doublon, rien de recree
+    again = _upload(client, _zip(_set(f"BK0001/{DAY}", seed=1))).json()
+    assert (again["created"], again["duplicate"]) == (0, 1)
+    assert again["results"][0]["detail"] == "Identical report already imported."
+
+
+def test_archive_without_sets(client):
+    response = _upload(client, _zip({"readme.txt": b"rien"}))
+
+    assert response.status_code == 400
+    assert _upload(client, b"not a zip").status_code == 400
@@ -0,0 +1,151 @@
+"""Les requetes chaudes restent en parcours d'index seul (EXPLAIN, PostgreSQL).
+
+Seme un jeu de donnees en SQL (generate_series), VACUUM ANALYZE, puis controle
+le plan de la liste, du controle d'existence de l'import, de la lecture N-1 du
+recap mensuel et l'elagage des partitions du recap du reseau.
+Ignore sans TEST_DATABASE_URL PostgreSQL (INCLUDE, Index Only Scan).
+"""
+import json
+from datetime import date, timedelta
+from typing import Any, Iterator
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from app.api.bk_reports import DEFAULT_LIST_LIMIT, _list_query
+from app.core.bk_partitions import ensure_partitions, iter_months, partition_name
+from app.core.bk_summary import CHANNEL_COLUMNS, KPI_FALLBACKS, recap_query
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.models.bk_report import BKDailyReport
+
+pytestmark = pytest.mark.skipif(
+    engine.dialect.name != "postgresql", reason="TEST_DATABASE_URL PostgreSQL requis"
+)
+
+RESTAURANTS = 100
+DAYS = 730
+END = date(2025, 12, 31)
+MONTH = END.replace(day=1)
+CODE = "R0001"
+
+
+def _seed() -> None:
+    start = END - timedelta(days=DAYS - 1)
+    summary_columns = [*CHANNEL_COLUMNS, *KPI_FALLBACKS]
+    with engine.begin() as conn:
+        ensure_partitions(conn, start, END)
+        conn.execute(
+            text(
+                "INSERT INTO bk_daily_reports "
+                "(client_code, restaurant_code, report_date, content_hash, is_consistent, created_at) "
+                "SELECT 'BK', 'R' || lpad(r::text, 4, '0'), d::date, md5(r || '-' || d), "
+                "r % 7 <> 0, d + interval '23 hours' "
+                "FROM generate_series(1, :restaurants) r, "
+                "generate_series(CAST(:start AS date), CAST(:end AS date), interval '1 day') d"
+            ),
+            {"restaurants": RESTAURANTS, "start": start, "end": END},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO bk_daily_summaries "
+                f"(report_id, restaurant_code, report_date, {', '.join(summary_columns)}) "
+                "SELECT id, restaurant_code, report_date, "
+                + ", ".join("(id % 1000) + 0.5" for _ in summary_columns)
+                + " FROM bk_daily_reports"
+            )
+        )
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE bk_daily_reports"))
+        conn.execute(text("VACUUM ANALYZE bk_daily_summaries"))
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    """Session sur le jeu seme, partage par les tests du module."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    _seed()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _plan(db: Any, query: Any) -> dict[str, Any]:
+    compiled = query.statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    raw = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+    return (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+
+
+def _nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _nodes(child)
+
+
+def _index_only_scans(db: Any, plan: dict[str, Any], index: str) -> list[str]:
+    """Index Only Scan du plan sur index (ou son equivalent d'une partition)."""
+    family = {
+        index,
+        *db.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:name)"
+            ),
+            {"name": index},
+        ).scalars(),
+    }
+    return [
+        node["Index Name"]
+        for node in _nodes(plan)
+        if node["Node Type"] == "Index Only Scan" and node["Index Name"] in family
+    ]
+
+
+def _scans(plan: dict[str, Any]) -> list[tuple[str, str | None]]:
+    # Message d'echec lisible
+    return [
+        (node["Node Type"], node.get("Index Name"))
+        for node in _nodes(plan)
+        if "Scan" in node["Node Type"]
+    ]
+
+
+@pytest.mark.parametrize("after", [None, (MONTH, CODE, 0)], ids=["page", "suite"])
+def test_list_page_is_index_only(seeded, after):
+    query = _list_query(seeded, None, None, None, None, None, after).limit(DEFAULT_LIST_LIMIT)
+    plan = _plan(seeded, query)
+    assert _index_only_scans(seeded, plan, "ix_bk_daily_reports_list_order"), _scans(plan)
+
+
+def test_existence_check_is_index_only(seeded):
+    # Requete de bk_ingest._existing_report_id
+    query = (
+        seeded.query(BKDailyReport.id, BKDailyReport.content_hash)
+        .filter(BKDailyReport.restaurant_code == CODE, BKDailyReport.report_date == MONTH)
+        .limit(1)
+    )
+    plan = _plan(seeded, query)
+    assert _index_only_scans(seeded, plan, "uq_bk_daily_reports_restaurant_date"), _scans(plan)
+
+
+def test_monthly_n1_is_index_only(seeded):
+    plan = _plan(seeded, recap_query(seeded, MONTH, END, CODE))
+    assert _index_only_scans(seeded, plan, "ix_bk_daily_summaries_n1_lookup"), _scans(plan)
+
+
+def test_monthly_prunes_partitions(seeded):
+    plan = _plan(seeded, recap_query(seeded, MONTH, END))
+    # La periode et son N-1 (364 a 366 jours avant)
+    allowed = {partition_name(month) for month in iter_months(MONTH - timedelta(days=366), END)}
+    scanned = {
+        node["Relation Name"]
+        for node in _nodes(plan)
+        if node.get("Relation Name", "").startswith("bk_daily_summaries")
+    }
+    assert scanned and scanned <= allowed
@@ -0,0 +1,30 @@
+"""API_JSON_DECIMAL s'applique aux endpoints de lecture BK."""
+import random
+from datetime import date
+
+import pytest
+
+from app.core import serialization
+from app.core.bk_ingest import create_bk_report, parse_bk_blobs
+from benchmarks.synthetic_bk import generate_bk_set
+
+
+@pytest.fixture
+def report_id(db) -> int:
+    report = create_bk_report(
+        db, "BK0001", date(2025, 3, 10), parse_bk_blobs(generate_bk_set(random.Random(1)))
+    )
+    db.commit()
+    return report.id
+
+
+@pytest.mark.parametrize("mode, expected", [("float", float), ("str", str)])
+def test_decimal_mode_on_bk_reads(client, report_id, monkeypatch, mode, expected):
+    monkeypatch.setattr(serialization, "DECIMAL_MODE", mode)
+
+    detail = client.get(f"/reports/bk/{report_id}").json()
+    assert isinstance(detail["kpi"]["ca_real"], expected)
+    monthly = client.get(
+        "/reports/bk/monthly", params={"year": 2025, "month": 3, "restaurant_code": "BK0001"}
+    ).json()
+    assert isinstance(monthly[0]["kpi"]["ca_real"], expected)
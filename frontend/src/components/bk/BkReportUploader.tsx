@@ -182,15 +182,12 @@ export function BkReportUploader({ restaurants, onUploaded, canReplace = false }
 
     setUploading(true);
     try {
-      if (replaceMode && replaceMode.code === finalCode) {
-        await apiFetch<{ status: string }>(`/reports/bk/${replaceMode.reportId}`, {
-          method: "DELETE",
-        });
-      }
-
+      const replacing = !!(replaceMode && replaceMode.code === finalCode);
       const fd = new FormData();
-      fd.append("report_date", reportDate);
-      fd.append("restaurant_code", finalCode);
+      if (!replacing) {
+        fd.append("report_date", reportDate);
+        fd.append("restaurant_code", finalCode);
+      }
       fd.append("caparprofit", fileCaparprofit);
       fd.append("consommationparprofit", fileConsommation);
       fd.append("corrections", fileCorrections);
@@ -200,10 +197,16 @@ export function BkReportUploader({ restaurants, onUploaded, canReplace = false }
       fd.append("tva", fileTva);
       fd.append("vente_annexes", fileVenteAnnexes);
 
-      const res = await apiFetch<{ report_id: number }>("/reports/bk/upload", {
-        method: "POST",
-        body: fd,
-      });
+      // Remplacement : mise a jour en place du rapport existant (meme id)
+      const res = replacing
+        ? await apiFetch<{ report_id: number }>(`/reports/bk/${replaceMode!.reportId}`, {
+            method: "PUT",
+            body: fd,
+          })
+        : await apiFetch<{ report_id: number }>("/reports/bk/upload", {
+            method: "POST",
+            body: fd,
+          });
 
       const data = await apiFetch<BKReport>(`/reports/bk/${res.report_id}`);
       onUploaded(data);
@@ -229,10 +232,10 @@ export function BkReportUploader({ restaurants, onUploaded, canReplace = false }
           title="Remplacer l'import existant ?"
           description={
             replaceTarget
-              ? `Cette action supprimera les données déjà importées pour ${replaceTarget.code} (${reportDate}).`
+              ? `Les données déjà importées pour ${replaceTarget.code} (${reportDate}) seront remplacées par les nouveaux fichiers. Les saisies manuelles (N-1, écart caisse...) sont conservées.`
               : undefined
           }
-          confirmLabel="Supprimer et réimporter"
+          confirmLabel="Remplacer"
           onCancel={() => setReplaceTarget(null)}
           onConfirm={() => {
             if (!replaceTarget) return;